@@ -1,11 +1,55 @@
 # ===================================================================================
 # --- MENGIMPOR LIBRARY YANG DIBUTUHKAN ---
 # ===================================================================================
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
 import streamlit as st
+from datetime import datetime
+# numpy, pandas, dan pyarrow dipakai setiap halaman yang memuat ledger (pandas sendiri sudah mengimpor pyarrow).
+# Plotly hanya dibutuhkan halaman bergrafik, jadi diimpor di dalam fungsi grafik.
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
-from supabase import create_client
-import plotly.express as px
+import pyarrow.parquet as pq
+
+from cashflow.cache import CacheFigur, FilterIndex, SearchIndex
+from cashflow.ekspor import FORMAT_EKSPOR, daftar_ekspor
+from cashflow.konstanta import (
+    BATAS_HASIL_PENCARIAN,
+    BATAS_MEMORI_CACHE_FIGUR,
+    BATAS_MEMORI_LEDGER,
+    COL_NOMINAL,
+    COL_PEMILIK,
+    JENIS_PEMASUKAN,
+    JENIS_PENGELUARAN,
+    JUMLAH_WORKER_FETCH,
+    JURNAL_TULIS_PATH,
+    KATEGORI_BIAYA_ADMIN,
+    KATEGORI_PEMASUKAN,
+    KATEGORI_PENGELUARAN,
+    KATEGORI_TOP_UP,
+    KOLOM_EKSPOR,
+    METODE_BIAYA_SUMBER,
+    METODE_BIAYA_TUJUAN,
+    MIRROR_PATH,
+    PILIHAN_AKUN,
+    RUTE_EKSPOR,
+    TABEL_CASHFLOW,
+    UKURAN_HALAMAN_FETCH,
+    UMUR_TOKEN_PEMILIK,
+    pengaturan,
+)
+from cashflow.ledger import ArsipTahunan, LedgerMirror, LedgerSync, ManajerLedger, RollupCube, SaldoIndex
+from cashflow.ledger.muat import _bersihkan_data
+from cashflow.ledger.partisi import _cap_pemilik, _saring_pemilik, _sidik_pemilik
+from cashflow.metrik import metrik, terukur, _eksekusi, _persentil_histogram
+from cashflow.sync import JurnalTulis, PenulisLatar, SumberRealtimeSupabase, UmpanPerubahan
 
 # ===================================================================================
 # --- PENGATURAN AWAL HALAMAN STREAMLIT ---
@@ -24,34 +68,47 @@ PAGE_CATAT_TRANSAKSI = "Catat Transaksi"
 PAGE_LIHAT_SALDO = "Saldo Akun"
 PAGE_DAFTAR_TRANSAKSI = "Daftar Transaksi"
 PAGE_DASHBOARD = "Dashboard"
+PAGE_IMPOR_TRANSAKSI = "Impor Transaksi"
+PAGE_PERIKSA_DATA = "Periksa Data"
 
 # --- Label dan Nama Kolom untuk Data ---
 LABEL_NOMINAL = "Nominal (Rp)"
-COL_NOMINAL = "nominal_(Rp)"  # Sesuai dengan nama kolom di database.
-
-# --- Jenis-Jenis Transaksi ---
-JENIS_PEMASUKAN = "Masuk"
-JENIS_PENGELUARAN = "Keluar"
-KATEGORI_TOP_UP = "Top Up"  # Konstanta untuk kategori "Top Up"
-
-# --- Kategori dan Metode Biaya Admin ---
-KATEGORI_BIAYA_ADMIN = "Biaya Admin"
-METODE_BIAYA_SUMBER = "Dikenakan pada akun sumber"
-METODE_BIAYA_TUJUAN = "Dipotong dari akun tujuan"
-
-# --- Daftar Kategori Transaksi (Update KATEGORI_PENGELUARAN) ---
-KATEGORI_PEMASUKAN = sorted(["Gaji", "Hadiah", "Hibah", "Lainnya", "Reimbursement", KATEGORI_TOP_UP])
-KATEGORI_PENGELUARAN = sorted([
-    "Hobi/Keinginan", "Internet", "Investasi", "Transportasi", "Skin-Hair-Body Care", "Lain-lain",
-    "Entertainment", "Food & Grocery", "Pengembangan Diri", "Reimbursement", "Tak Terduga", "Primary Needs",
-    KATEGORI_TOP_UP,
-    KATEGORI_BIAYA_ADMIN 
-])
 
-# --- Daftar Pilihan Akun ---
-PILIHAN_AKUN = sorted([
-    "BCA", "Cash", "Jago", "GoPay", "ShopeePay", "e-Money"
-])
+# --- Pengaturan Pemantauan Latar ---
+INTERVAL_PANTAU_LATAR = 1  # detik; seberapa sering sesi memeriksa change feed dan antrean tulis.
+
+# --- Pengaturan Tabel Transaksi ---
+PILIHAN_UKURAN_HALAMAN_TABEL = [25, 50, 100, 250]
+KOLOM_URUT_TABEL = {"ID": "id", "Tanggal": "tanggal", LABEL_NOMINAL: COL_NOMINAL, "Jenis": "jenis", "Kategori": "kategori", "Akun": "akun"}
+
+# --- Pengaturan Pemeriksaan Integritas Ledger ---
+# Deskripsi bawaan yang dibuat _prepare_top_up_transactions(); nama akun di dalamnya dipakai untuk memasangkan kaki.
+POLA_TOP_UP_KELUAR = r"^Top Up ke (.+)$"
+POLA_TOP_UP_MASUK = r"^Top Up dari (.+)$"
+POLA_BIAYA_ADMIN = r"^Biaya admin Top Up dari (.+) ke (.+)$"
+MASALAH_TOP_UP_YATIM = "Top Up tanpa pasangan"
+MASALAH_TOP_UP_TIDAK_SEIMBANG = "Top Up tidak seimbang"
+MASALAH_BIAYA_ADMIN_YATIM = "Biaya admin tanpa Top Up"
+MASALAH_DUPLIKAT = "Kemungkinan duplikat"
+URUTAN_MASALAH = [MASALAH_TOP_UP_YATIM, MASALAH_TOP_UP_TIDAK_SEIMBANG, MASALAH_BIAYA_ADMIN_YATIM, MASALAH_DUPLIKAT]
+BATAS_TEMUAN_DITAMPILKAN = 1000  # baris temuan yang ditampilkan di halaman; selebihnya lewat unduhan CSV.
+
+logger = logging.getLogger(__name__)
+
+# --- Pengaturan Impor Transaksi (CSV mutasi rekening / e-wallet) ---
+UKURAN_CHUNK_IMPOR = 5000  # baris CSV per langkah; memori tetap berapa pun ukuran file.
+UKURAN_BATCH_IMPOR = 500  # baris per bulk insert.
+BATAS_CONTOH_TIDAK_VALID = 50  # baris tidak valid yang ditampilkan setelah impor (sisanya hanya dihitung).
+CHECKPOINT_IMPOR_DIR = os.path.join(os.path.dirname(MIRROR_PATH), "impor")
+FORMAT_TANGGAL_IMPOR = {"YYYY-MM-DD": "%Y-%m-%d", "DD/MM/YYYY": "%d/%m/%Y", "DD/MM/YY": "%d/%m/%y", "DD-MM-YYYY": "%d-%m-%Y", "MM/DD/YYYY": "%m/%d/%Y"}
+MODE_JENIS_KOLOM = "Kolom jenis (Masuk/Keluar, CR/DB)"
+MODE_JENIS_TANDA = "Tanda nominal (negatif = Keluar)"
+MODE_JENIS_DEBIT_KREDIT = "Kolom debit & kredit terpisah"
+KATA_JENIS_IMPOR = {  # nilai kolom jenis (huruf kecil) -> jenis transaksi
+    "masuk": JENIS_PEMASUKAN, "cr": JENIS_PEMASUKAN, "kredit": JENIS_PEMASUKAN, "credit": JENIS_PEMASUKAN, "in": JENIS_PEMASUKAN,
+    "keluar": JENIS_PENGELUARAN, "db": JENIS_PENGELUARAN, "debit": JENIS_PENGELUARAN, "debet": JENIS_PENGELUARAN, "out": JENIS_PENGELUARAN,
+}
+KATEGORI_DEFAULT_IMPOR = {JENIS_PEMASUKAN: "Lainnya", JENIS_PENGELUARAN: "Lain-lain"}
 
 # --- Kamus (Dictionary) untuk Logo Akun ---
 LOGO_JAGO = "https://upload.wikimedia.org/wikipedia/commons/c/c0/Logo-jago.svg"
@@ -79,51 +136,218 @@ def custom_divider(margin_top=10, margin_bottom=30, color="#3b3d43", thickness="
 # ===================================================================================
 @st.cache_resource
 def init_connection():
-    """Menginisialisasi koneksi ke Supabase."""
+    """
+    Menginisialisasi koneksi ke Supabase. Klien (dan library supabase) baru dibuat saat pertama kali
+    dibutuhkan, bukan saat modul dimuat.
+    """
+    from supabase import create_client
     url = st.secrets["supabase"]["url"]
     key = st.secrets["supabase"]["key"]
     return create_client(url, key)
 
-supabase = init_connection()
+def _token_pemilik(pemilik):
+    """
+    JWT berumur pendek untuk satu rumah tangga, ditandatangani dengan JWT secret proyek Supabase
+    (`jwt_secret` di bagian [supabase]). Kebijakan RLS dari migrations/002_pemilik.sql membaca klaim
+    `pemilik`, sehingga query dan change feed dengan token ini hanya melihat baris rumah tangga tersebut.
+    """
+    import jwt
+    sekarang = int(time.time())
+    klaim = {
+        'role': "authenticated", 'aud': "authenticated", 'sub': f"rumah-tangga-{_sidik_pemilik(pemilik)}",
+        COL_PEMILIK: pemilik, 'iat': sekarang, 'exp': sekarang + UMUR_TOKEN_PEMILIK,
+    }
+    return jwt.encode(klaim, st.secrets["supabase"]["jwt_secret"], algorithm="HS256")
+
+@st.cache_resource(ttl=UMUR_TOKEN_PEMILIK // 2)
+def _klien_pemilik(pemilik):
+    """
+    Klien Supabase yang mengirim token rumah tangga `pemilik` (lihat `_token_pemilik`). Dibuat ulang
+    setelah separuh umur token, sehingga klien yang masih dipakai request berjalan tidak kedaluwarsa.
+    """
+    from supabase import ClientOptions, create_client
+    opsi = ClientOptions(headers={"Authorization": f"Bearer {_token_pemilik(pemilik)}"})
+    return create_client(st.secrets["supabase"]["url"], st.secrets["supabase"]["key"], options=opsi)
 
-@st.cache_data(ttl=300) # 5 menit
-def get_data():
+def _klien(pemilik=None):
+    """Klien untuk baris milik `pemilik`: klien bersama pada mode satu ledger, klien rumah tangga pada mode multi-pengguna."""
+    return init_connection() if pemilik is None else _klien_pemilik(pemilik)
+
+class _KlienMalas:
+    """
+    Pengganti klien Supabase untuk ledger: klien baru dibuat saat query pertama, sehingga worker yang
+    attach ke mirror yang masih segar tidak perlu membuat klien sama sekali.
     """
-    Mengambil, membersihkan, dan mengembalikan semua data transaksi.
-    Data di-cache untuk mengurangi query berulang ke database.
+    def __init__(self, pemilik=None):
+        self._pemilik = pemilik
+
+    def __getattr__(self, atribut):
+        return getattr(_klien(self._pemilik), atribut)
+
+# --- Partisi Ledger per Pengguna ---
+def _pemilik_aktif():
+    """
+    Kunci partisi ledger untuk sesi ini. Tanpa mode multi-pengguna hasilnya None (satu ledger bersama).
+    Dengan `multi_pengguna = true`, kuncinya adalah rumah tangga pengguna yang login: tabel
+    `[pengaturan.rumah_tangga]` memetakan email ke rumah tangga, tanpa pemetaan dipakai email itu sendiri.
+    """
+    if not pengaturan("multi_pengguna", False):
+        return None
+    if not st.user.is_logged_in or not st.user.get("email"):
+        raise RuntimeError("Mode multi-pengguna membutuhkan pengguna yang sudah login.")
+    return pengaturan("rumah_tangga", {}).get(st.user.email, st.user.email)
+
+def _buat_ledger(pemilik=None):
+    """
+    Membuat LedgerSync untuk satu partisi. Setiap pemilik punya file mirror sendiri; mirror lokal bisa
+    dimatikan dengan `mirror_path = ""` di bagian [pengaturan]. Arsip tahun tertutup disimpan di folder
+    `<mirror>.arsip` di sebelahnya dan bisa dimatikan dengan `arsip_tahunan = false`.
     """
+    mirror_path = pengaturan("mirror_path", MIRROR_PATH)
+    if mirror_path and pemilik is not None:
+        akar, ekstensi = os.path.splitext(mirror_path)
+        mirror_path = f"{akar}.{_sidik_pemilik(pemilik)}{ekstensi}"
+    arsip = None
+    if mirror_path and pengaturan("arsip_tahunan", True):
+        arsip = ArsipTahunan(f"{os.path.splitext(mirror_path)[0]}.arsip")
+    ledger = LedgerSync(
+        _KlienMalas(pemilik),
+        ukuran_halaman=pengaturan("ukuran_halaman", UKURAN_HALAMAN_FETCH),
+        jumlah_worker=pengaturan("jumlah_worker", JUMLAH_WORKER_FETCH),
+        mirror=LedgerMirror(mirror_path) if mirror_path else None,
+        pemilik=pemilik,
+        arsip=arsip,
+    )
+    ledger.tambah_turunan("saldo", SaldoIndex())
+    ledger.tambah_turunan("rollup", RollupCube())
+    return ledger
+
+@st.cache_resource
+def _get_manajer_ledger():
+    """
+    Manajer partisi ledger yang dipakai bersama oleh semua sesi. Batas memori diatur lewat
+    `batas_memori_ledger_mb`. Mode `multi_pengguna = true` membutuhkan migrations/002_pemilik.sql (kolom
+    `pemilik` + RLS) dan `jwt_secret` di bagian [supabase]: setiap partisi membaca dan menulis dengan token
+    rumah tangganya sendiri, sehingga pemisahan data ditegakkan database, bukan hanya filter di aplikasi.
+    """
+    return ManajerLedger(
+        _buat_ledger,
+        batas_byte=pengaturan("batas_memori_ledger_mb", BATAS_MEMORI_LEDGER // 2**20) * 2**20,
+        kolom_pemilik=COL_PEMILIK if pengaturan("multi_pengguna", False) else None,
+    )
+
+def _get_ledger():
+    """LedgerSync partisi milik pengguna sesi ini."""
+    return _get_manajer_ledger().ledger(_pemilik_aktif())
+
+# --- Change Feed (Supabase Realtime) ---
+@st.cache_resource
+def _get_umpan(pemilik=None):
+    """
+    Pelanggan change feed untuk partisi `pemilik`, atau None jika tidak diaktifkan.
+    Aktifkan dengan `realtime = true` di bagian [pengaturan] secrets.toml.
+    Pada mode multi-pengguna setiap rumah tangga punya langganan sendiri dengan token rumah tangganya
+    (RLS) dan filter `pemilik=eq.<rumah tangga>`, jadi baris rumah tangga lain tidak pernah dikirim ke
+    server ini atas namanya. Event hapus hanya membawa id dan tidak bisa difilter; manajer hanya
+    menerapkannya ke partisi yang memuat id tersebut.
+    """
+    if not pengaturan("realtime", False):
+        return None
+    url, key = st.secrets["supabase"]["url"], st.secrets["supabase"]["key"]
+    if pemilik is None:
+        sumber = SumberRealtimeSupabase(url, key)
+    else:
+        sumber = SumberRealtimeSupabase(url, key, filter=f"{COL_PEMILIK}=eq.{pemilik}", token=lambda: _token_pemilik(pemilik))
+    return UmpanPerubahan(_get_manajer_ledger().sasaran_umpan(pemilik), sumber).mulai()
+
+# --- Antrean Tulis (Write-Behind) ---
+@st.cache_resource
+def _get_penulis():
+    """
+    Worker antrean tulis bersama, atau None jika mode write-behind tidak diaktifkan.
+    Aktifkan dengan `tulis_belakang = true` di bagian [pengaturan]; tabel Cashflow harus punya kolom
+    `idempotency_key` yang unik (jalankan migrations/001_idempotency_key.sql lebih dulu).
+    """
+    if not pengaturan("tulis_belakang", False):
+        return None
+    jurnal = JurnalTulis(pengaturan("jurnal_tulis_path", JURNAL_TULIS_PATH))
+    return PenulisLatar(jurnal, init_connection(), _get_manajer_ledger(), klien_pemilik=_klien_pemilik).mulai()
+
+def get_data_versi():
+    """
+    Mengembalikan (versi, df) semua data transaksi yang sudah dibersihkan.
+    Data disimpan di memori dan hanya perubahan (delta) yang diambil dari database.
+    DataFrame yang dikembalikan dipakai bersama, jadi jangan diubah di tempat.
+    Setelah itu batas memori partisi ditegakkan (partisi pengguna ini tidak ikut dikeluarkan).
+    """
+    manajer, pemilik = _get_manajer_ledger(), _pemilik_aktif()
+    ledger = manajer.ledger(pemilik)
     try:
-        response = supabase.table("Cashflow").select("*").order("tanggal", desc=True).execute()
-        df = pd.DataFrame(response.data)
-
-        if df.empty:
-            return df
-
-        # Pembersihan dan konversi tipe data terpusat
-        for col in ['jenis', 'kategori', 'akun']:
-            if col in df.columns:
-                df[col] = df[col].str.strip()
-        df['tanggal'] = pd.to_datetime(df['tanggal'])
-        df[COL_NOMINAL] = pd.to_numeric(df[COL_NOMINAL])
-        
-        return df
+        hasil = ledger.get()
     except Exception as e:
         st.error(f"Gagal mengambil data dari database: {e}")
-        return pd.DataFrame()
+        hasil = ledger.snapshot()
+    manajer.tegakkan_batas(pemilik)
+    return hasil
+
+def get_data():
+    """Mengembalikan DataFrame semua data transaksi (lihat `get_data_versi`)."""
+    return get_data_versi()[1]
+
+def _pastikan_versi(versi):
+    """
+    Dipanggil di awal fragmen yang menerima data sebagai argumen. Saat fragmen dijalankan ulang sendiri,
+    argumennya berasal dari run penuh terakhir; jika ledger sudah berpindah versi (mis. ada transaksi
+    baru dari sesi lain), seluruh app dijalankan ulang agar fragmen tidak menampilkan data basi.
+    """
+    if not _get_ledger().berlaku(versi):
+        st.rerun()
 
 # ===================================================================================
 # --- FUNGSI-FUNGSI PEMBANTU (HELPER FUNCTIONS) ---
 # ===================================================================================
 
 # --- Helper untuk Halaman Dashboard ---
-def _create_date_filters(df):
+@st.cache_resource
+def _get_cache_figur():
+    """Cache figur dashboard untuk semua sesi; batasnya bisa diatur lewat `cache_figur_mb`."""
+    return CacheFigur(int(pengaturan("cache_figur_mb", BATAS_MEMORI_CACHE_FIGUR / 1024 / 1024) * 1024 * 1024))
+
+def _buat_pie_chart(data_per_kategori):
+    import plotly.express as px
+    fig = px.pie(
+        data_per_kategori.rename(COL_NOMINAL).reset_index(),
+        values=COL_NOMINAL,
+        names='kategori',
+        hole=0.38
+    )
+    fig.update_traces(textposition='outside', textinfo='percent+label', textfont_size=12)
+    fig.update_layout(
+        margin={'t': 40, 'b': 60, 'l': 60, 'r': 60},
+        showlegend=False, height=400, width=400
+    )
+    return fig
+
+def _buat_bar_chart(pengeluaran_per_kategori):
+    import plotly.express as px
+    fig_bar = px.bar(
+        pengeluaran_per_kategori.rename(COL_NOMINAL).reset_index(), x='kategori', y=COL_NOMINAL,
+        labels={COL_NOMINAL: 'Jumlah Pengeluaran (Rp)', 'kategori': 'Kategori'},
+        text=COL_NOMINAL
+    )
+    fig_bar.update_traces(texttemplate='Rp %{text:,.0f}', textposition='outside')
+    fig_bar.update_layout(xaxis_tickangle=-45)
+    return fig_bar
+
+def _create_date_filters(rentang_data):
     """
     Membuat dan menampilkan widget filter tanggal dengan logika yang final:
     - Menangani semua kasus khusus untuk tanggal mulai dan selesai.
     - Tampilan default se-fleksibel mungkin sesuai keinginan dan data yang ada.
+    `rentang_data` adalah (tanggal_pertama, tanggal_terakhir) dari data, atau None jika belum ada data.
     """
     with st.expander("Filter Periode", expanded=False):
-        if df.empty:
+        if rentang_data is None:
             st.warning("Belum ada data transaksi untuk difilter.")
             today = datetime.now().date()
             first_day_of_current_month = today.replace(day=1)
@@ -137,8 +361,7 @@ def _create_date_filters(df):
             return tgl_awal, tgl_akhir
 
         # 1. Tentukan batas-batas tanggal dari data dan tanggal hari ini
-        tgl_min_data = df['tanggal'].min().date()
-        tgl_max_data = df['tanggal'].max().date()
+        tgl_min_data, tgl_max_data = rentang_data
         today = datetime.now().date()
         first_day_of_current_month = today.replace(day=1)
 
@@ -173,79 +396,197 @@ def _create_date_filters(df):
 
         return tgl_awal, tgl_akhir
 
-def _display_summary_pie_chart(df, title):
-    """Menampilkan metrik total dan diagram lingkaran untuk data yang diberikan."""
-    if df.empty:
+def _display_summary_pie_chart(data_per_kategori, title, kunci_figur):
+    """
+    Menampilkan metrik total dan diagram lingkaran dari total nominal per kategori.
+    `kunci_figur` mengidentifikasi data grafik (versi, jenis, periode, filter) untuk cache figur.
+    """
+    if data_per_kategori.empty:
         st.info(f"Tidak ada data {title.lower()} pada periode ini.")
         return
 
-    total = df[COL_NOMINAL].sum()
+    total = data_per_kategori.sum()
     formatted_total = f"Rp {total:,.0f}".replace(',', '.')
     st.metric(f"Total {title}", formatted_total)
 
-    data_per_kategori = df.groupby('kategori')[COL_NOMINAL].sum().sort_values(ascending=False)
-    
-    fig = px.pie(
-        data_per_kategori.reset_index(),
-        values=COL_NOMINAL,
-        names='kategori',
-        hole=0.38
-    )
-    fig.update_traces(textposition='outside', textinfo='percent+label', textfont_size=12)
-    fig.update_layout(
-        margin={'t': 40, 'b': 60, 'l': 60, 'r': 60},
-        showlegend=False, height=400, width=400
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    with metrik.ukur("plotly_detik", grafik="pie"):
+        fig = _get_cache_figur().ambil(kunci_figur, lambda: _buat_pie_chart(data_per_kategori))
+        st.plotly_chart(fig, use_container_width=True)
+
+def _get_filter_index(versi, df):
+    """FilterIndex untuk versi data saat ini (dibangun ulang hanya jika versi berubah)."""
+    return _get_ledger().per_versi("filter", versi, df, FilterIndex)
 
-def _apply_detailed_filters(df):
-    """Menerapkan filter detail (tahun, bulan, hari, jenis, dll.) pada DataFrame."""
-    df_display = df.copy()
-    df_display['hari'] = df_display['tanggal'].dt.day
-    df_display['bulan'] = df_display['tanggal'].dt.month
-    df_display['tahun'] = df_display['tanggal'].dt.year
+def _apply_detailed_filters(df, versi, rentang=None):
+    """
+    Menerapkan filter detail (tahun, bulan, hari, jenis, dll.) pada DataFrame ledger versi `versi`.
+    `rentang` (tgl_awal, tgl_akhir) membatasi data lebih dulu, misalnya dari filter periode dashboard.
+    Pilihan dropdown dan hasil filter diambil dari FilterIndex, bukan dari scan ulang DataFrame.
+    """
+    indeks = _get_filter_index(versi, df)
+    opsi = indeks.opsi(rentang)
 
     # Baris Filter 1: Waktu
     col1, col2, col3 = st.columns(3)
-    selected_year = col1.selectbox("Tahun", options=["Semua"] + sorted(df_display['tahun'].unique(), reverse=True))
+    selected_year = col1.selectbox("Tahun", options=["Semua"] + opsi['tahun'])
     month_map = {i: datetime(2000, i, 1).strftime('%B') for i in range(1, 13)}
-    unique_months = sorted(df_display['bulan'].unique())
-    month_options = {num: month_map[num] for num in unique_months}
+    month_options = {num: month_map[num] for num in opsi['bulan']}
     selected_month_name = col2.selectbox("Bulan", options=["Semua"] + list(month_options.values()))
     selected_day = col3.selectbox("Tanggal", options=["Semua"] + list(range(1, 32)))
 
     # Baris Filter 2: Atribut Transaksi
     col4, col5, col6 = st.columns(3)
-    jenis_filter = col4.multiselect("Jenis", options=sorted(df_display['jenis'].unique()))
-    kategori_filter = col5.multiselect("Kategori", options=sorted(df_display['kategori'].unique()))
-    akun_filter = col6.multiselect("Akun", options=sorted(df_display['akun'].unique()))
-
-    # Logika penerapan filter
-    if selected_year != "Semua": df_display = df_display[df_display['tahun'] == selected_year]
-    if selected_month_name != "Semua":
-        month_num = next(num for num, name in month_map.items() if name == selected_month_name)
-        df_display = df_display[df_display['bulan'] == month_num]
-    if selected_day != "Semua": df_display = df_display[df_display['hari'] == selected_day]
-    if jenis_filter: df_display = df_display[df_display['jenis'].isin(jenis_filter)]
-    if kategori_filter: df_display = df_display[df_display['kategori'].isin(kategori_filter)]
-    if akun_filter: df_display = df_display[df_display['akun'].isin(akun_filter)]
-    
-    return df_display
+    jenis_filter = col4.multiselect("Jenis", options=opsi['jenis'])
+    kategori_filter = col5.multiselect("Kategori", options=opsi['kategori'])
+    akun_filter = col6.multiselect("Akun", options=opsi['akun'])
+
+    # Logika penerapan filter (irisan daftar posisi dari indeks)
+    month_num = next((num for num, name in month_map.items() if name == selected_month_name), None)
+    posisi = indeks.cari(
+        rentang=rentang,
+        tahun=None if selected_year == "Semua" else selected_year,
+        bulan=month_num,
+        hari=None if selected_day == "Semua" else selected_day,
+        jenis=jenis_filter, kategori=kategori_filter, akun=akun_filter,
+    )
+    return df if posisi is None else df.iloc[posisi]
+
+# --- Helper untuk Tabel Transaksi Berhalaman ---
+def _kunci_urut(kolom):
+    """Mengubah kolom menjadi array int64 yang urutannya sama dengan urutan nilai kolom."""
+    if isinstance(kolom.dtype, pd.CategoricalDtype):
+        # Kode kategori diurutkan berdasarkan label (alfabetis), NaN paling akhir.
+        peringkat = np.argsort(np.argsort(kolom.cat.categories.astype(str)))
+        kode = kolom.cat.codes.to_numpy()
+        return np.where(kode >= 0, peringkat[kode], len(peringkat)).astype('int64')
+    if pd.api.types.is_datetime64_any_dtype(kolom):
+        return kolom.to_numpy().astype('datetime64[ns]').view('int64')
+    return kolom.to_numpy().astype('int64')
+
+def _posisi_teratas(kunci, pemecah_seri, k):
+    """
+    Posisi k baris dengan (kunci, pemecah_seri) terkecil, sudah terurut.
+    Hanya kandidat di bawah ambang hasil np.partition yang diurutkan (partial sort), bukan seluruh data.
+    """
+    if k < len(kunci):
+        ambang = np.partition(kunci, k - 1)[k - 1]
+        kandidat = np.flatnonzero(kunci <= ambang)
+    else:
+        kandidat = np.arange(len(kunci))
+    urutan = np.lexsort((pemecah_seri[kandidat], kunci[kandidat]))[:k]
+    return kandidat[urutan]
+
+def _ambil_jendela_tabel(df, halaman, ukuran_halaman, kolom_urut, menurun=True):
+    """
+    Mengembalikan baris untuk satu halaman tabel (sudah diurutkan dan diformat).
+    Hanya `halaman * ukuran_halaman` baris teratas yang diurutkan, dan hanya jendela yang diformat,
+    sehingga biaya per halaman dan ukuran payload tidak tumbuh bersama jumlah transaksi.
+    """
+    arah = -1 if menurun else 1
+    kunci = _kunci_urut(df[kolom_urut]) * arah
+    pemecah_seri = df['id'].to_numpy().astype('int64') * arah  # urutan stabil untuk nilai yang sama
+    awal = (halaman - 1) * ukuran_halaman
+    posisi = _posisi_teratas(kunci, pemecah_seri, awal + ukuran_halaman)[awal:]
+
+    jendela = df.iloc[posisi].reset_index(drop=True)
+    jendela.insert(0, 'No.', range(awal + 1, awal + len(jendela) + 1))
+    jendela[COL_NOMINAL] = jendela[COL_NOMINAL].apply(lambda x: f"{x:,.0f}".replace(',', '.'))
+    return jendela
+
+@st.fragment
+@terukur("fragmen_detik")
+def _tampilkan_tabel_berhalaman(versi, df, key, column_config, kolom_urut_default="ID"):
+    """
+    Menampilkan tabel transaksi per halaman dengan pilihan ukuran halaman, kolom urut, dan arah urut.
+    Berupa fragmen: ganti halaman/urutan hanya menjalankan ulang tabel, bukan filter atau grafik di atasnya.
+    """
+    _pastikan_versi(versi)
+    col1, col2, col3, col4 = st.columns(4)
+    ukuran_halaman = col1.selectbox("Baris per halaman", PILIHAN_UKURAN_HALAMAN_TABEL, key=f"{key}_ukuran")
+    label_urut = col2.selectbox(
+        "Urutkan", list(KOLOM_URUT_TABEL), index=list(KOLOM_URUT_TABEL).index(kolom_urut_default), key=f"{key}_urut"
+    )
+    arah = col3.selectbox("Arah", ["Menurun", "Menaik"], key=f"{key}_arah")
+    jumlah_halaman = max(-(-len(df) // ukuran_halaman), 1)
+    # Halaman dibatasi ulang jika filter membuat jumlah halaman menyusut.
+    if st.session_state.get(f"{key}_halaman", 1) > jumlah_halaman:
+        st.session_state[f"{key}_halaman"] = jumlah_halaman
+    halaman = col4.number_input(f"Halaman (dari {jumlah_halaman})", min_value=1, max_value=jumlah_halaman, step=1, key=f"{key}_halaman")
+
+    jendela = _ambil_jendela_tabel(df, int(halaman), ukuran_halaman, KOLOM_URUT_TABEL[label_urut], menurun=(arah == "Menurun"))
+    st.dataframe(jendela, use_container_width=True, hide_index=True, column_config=column_config)
+    awal = (int(halaman) - 1) * ukuran_halaman
+    st.caption(f"Menampilkan {awal + 1:,}–{awal + len(jendela):,} dari {len(df):,} transaksi".replace(',', '.'))
+
+# --- Helper untuk Ekspor Transaksi ---
+def _tulis_ekspor(df, format_ekspor):
+    """
+    Jalur cadangan saat rute streaming tidak terpasang (`streamlit run app.py`): generator ekspor
+    dialirkan ke file sementara di disk dan file tersebut dikembalikan (posisi di awal).
+    Batasan: st.download_button tetap membaca seluruh file ini ke memori server (MediaFileManager
+    menyimpan byte unduhan selama sesi masih merujuknya), jadi puncak memori per unduhan sebesar ukuran
+    file ekspor. Jalankan `streamlit run server.py` agar unduhan dialirkan lewat rute `/ekspor/{token}`.
+    """
+    berkas = tempfile.TemporaryFile()
+    for data in FORMAT_EKSPOR[format_ekspor][0](df):
+        berkas.write(data)
+    berkas.seek(0)
+    return berkas
+
+@st.fragment
+@terukur("fragmen_detik")
+def _tampilkan_tombol_ekspor(versi, df, key, nama_file):
+    """
+    Tombol unduh hasil filter saat ini. Jika rute streaming aktif (server.py), tombol adalah tautan ke
+    `/ekspor/{token}` dan file dibuat potongan demi potongan saat tautan dibuka; token lama milik tombol
+    ini dilepas setiap fragmen digambar ulang. Tanpa rute, file dibuat ketika tombol diklik dan isinya
+    disimpan di memori server selama unduhan berlangsung (lihat `_tulis_ekspor`).
+    """
+    _pastikan_versi(versi)
+    col1, col2 = st.columns([1, 3])
+    format_ekspor = col1.selectbox("Format", list(FORMAT_EKSPOR), key=f"{key}_format", label_visibility="collapsed")
+    _, ekstensi, mime = FORMAT_EKSPOR[format_ekspor]
+    label = f"⬇️ Unduh {len(df):,} transaksi".replace(',', '.')
+    if daftar_ekspor.rute_aktif:
+        token = daftar_ekspor.daftarkan(df, format_ekspor, nama_file, ganti=st.session_state.get(f"{key}_token"))
+        st.session_state[f"{key}_token"] = token
+        col2.link_button(label, f"{RUTE_EKSPOR}/{token}", use_container_width=True)
+        return
+    col2.download_button(
+        label, data=lambda: _tulis_ekspor(df, format_ekspor),
+        file_name=f"{nama_file}.{ekstensi}", mime=mime, key=f"{key}_unduh", on_click="ignore", use_container_width=True,
+    )
 
 # --- Helper untuk Halaman Catat Transaksi (REFAKTORISASI) ---
 
+def _parse_nominal(input_str):
+    """
+    Aturan normalisasi nominal yang dipakai form dan impor CSV: input kosong dianggap 0, spasi dan
+    awalan "Rp" diabaikan, titik adalah separator ribuan dan koma separator desimal, lalu dikonversi
+    ke integer (boleh negatif). Contoh: "Rp 1.500.000" dan "1.500.000,00" menjadi 1500000.
+    Desimal selain nol (mis. "1.500,50") ditolak karena nominal disimpan dalam rupiah penuh.
+    Melempar ValueError/TypeError jika bukan angka.
+    """
+    if not input_str:
+        return 0
+    teks = "".join(input_str.split()).replace('.', '')
+    tanda = ""
+    if teks.startswith('-'):
+        tanda, teks = "-", teks[1:]
+    if teks[:2].lower() == "rp":
+        teks = teks[2:]
+    bulat, koma, desimal = teks.partition(',')
+    if koma and not (desimal.isdigit() and int(desimal) == 0):
+        raise ValueError(f"Nominal tidak boleh berisi sen: {input_str!r}")
+    return int(tanda + bulat)
+
 def _parse_and_validate_nominal(input_str, field_name):
     """
     Membersihkan dan memvalidasi input nominal dari form.
     Mengembalikan integer jika valid, atau None jika tidak.
     """
-    # Jika input kosong atau None, anggap saja 0 dan valid.
-    if not input_str:
-        return 0
-    
     try:
-        # Menghapus titik (separator ribuan) dan spasi, lalu konversi ke integer.
-        nominal_int = int(input_str.replace('.', '').strip())
+        nominal_int = _parse_nominal(input_str)
         if nominal_int < 0:
             st.error(f"Input '{field_name}' tidak boleh negatif.")
             return None
@@ -309,6 +650,16 @@ def _prepare_regular_transaction(form_data, jumlah_int):
         COL_NOMINAL: jumlah_int, "deskripsi": form_data['deskripsi'],
     }]
 
+def _simpan_transaksi(transaksi_list):
+    """
+    Menyimpan semua baris transaksi (mis. kaki keluar, masuk, dan biaya admin Top Up) dengan
+    satu bulk insert. PostgREST menjalankannya sebagai satu statement INSERT, sehingga semua baris
+    tersimpan bersama atau tidak sama sekali, dan hanya butuh satu round trip ke database.
+    Mengembalikan baris yang tersimpan (lengkap dengan `id`).
+    """
+    pemilik = _pemilik_aktif()
+    return _eksekusi(_klien(pemilik).table(TABEL_CASHFLOW).insert(_cap_pemilik(transaksi_list, pemilik)), "insert").data
+
 def _handle_submission(submitted, form_data):
     """
     Memproses logika submit form dengan memanggil helper yang sesuai.
@@ -346,103 +697,505 @@ def _handle_submission(submitted, form_data):
     if not transaksi_to_insert:
         return
 
-    # Eksekusi ke Database (SATU PER SATU untuk keamanan data).
+    # Mode write-behind: catat ke jurnal lokal dan langsung kembali; worker latar yang mengirim.
+    penulis = _get_penulis()
+    if penulis is not None:
+        pemilik = _pemilik_aktif()
+        penulis.antre("insert", _cap_pemilik(transaksi_to_insert, pemilik), pemilik=pemilik)
+        st.success(f"{sukses_message} Sedang dikirim ke database di latar belakang.")
+        return
+
+    # Eksekusi ke Database (semua baris dalam SATU request, berhasil semua atau gagal semua).
     try:
-        for transaksi in transaksi_to_insert:
-            supabase.table("Cashflow").insert(transaksi).execute()
+        tersimpan = _simpan_transaksi(transaksi_to_insert)
         
         st.success(sukses_message)
-        st.cache_data.clear() # Bersihkan cache agar data baru langsung muncul
+        _get_ledger().terapkan_perubahan(baris=tersimpan) # Data baru langsung muncul tanpa query ulang
         st.rerun()
     except Exception as e:
         st.error(f"Gagal menyimpan data: {e}")
 
+# --- Helper untuk Form Edit/Hapus ---
+def _get_search_index(versi, df):
+    """SearchIndex untuk versi data saat ini (dibangun ulang hanya jika versi berubah)."""
+    return _get_ledger().per_versi("cari", versi, df, SearchIndex)
+
+# --- Helper untuk Halaman Impor Transaksi ---
+def _nominal_atau_none(teks):
+    try:
+        return _parse_nominal(teks)
+    except (ValueError, TypeError):
+        return None
+
+def _hash_baris(df):
+    """Hash 64-bit per baris dari (tanggal, jenis, akun, nominal, deskripsi) untuk mendeteksi duplikat."""
+    kunci = pd.DataFrame({
+        'hari': df['tanggal'].to_numpy().astype('datetime64[D]').astype('int64'),
+        'jenis': df['jenis'].astype(str).to_numpy(), 'akun': df['akun'].astype(str).to_numpy(),
+        'nominal': df[COL_NOMINAL].to_numpy().astype('int64'),
+        'deskripsi': df['deskripsi'].fillna("").astype(str).str.strip().to_numpy(),
+    })
+    return pd.util.hash_pandas_object(kunci, index=False).to_numpy()
+
+def _cari_hash(hash_urut, hash_dicari):
+    """(posisi, cocok) setiap `hash_dicari` di array terurut `hash_urut` (binary search)."""
+    if not len(hash_urut):
+        return np.zeros(len(hash_dicari), dtype='int64'), np.zeros(len(hash_dicari), dtype=bool)
+    posisi = np.minimum(np.searchsorted(hash_urut, hash_dicari), len(hash_urut) - 1)
+    return posisi, hash_urut[posisi] == hash_dicari
+
+class IndeksDuplikat:
+    """
+    Indeks hash untuk dedupe impor: hash baris ledger disimpan sebagai array terurut beserta jumlah
+    kemunculannya (lookup dengan binary search, 16 byte per hash unik). Baris identik ke-n dalam file
+    dianggap duplikat hanya jika database sudah punya minimal n salinannya, sehingga dua transaksi
+    kembar yang sah tetap terimpor, sedangkan impor ulang file yang sama tidak menambah apa pun.
+    Kemunculan di file juga disimpan sebagai array terurut, jadi satu chunk diproses tanpa loop per baris.
+    """
+
+    def __init__(self, df):
+        hash_unik, jumlah = np.unique(_hash_baris(df), return_counts=True) if len(df) else (np.array([], dtype='uint64'), np.array([], dtype='int64'))
+        self._hash, self._jumlah = hash_unik, jumlah
+        self._hash_dilihat, self._jumlah_dilihat = np.array([], dtype='uint64'), np.array([], dtype='int64')  # kemunculan di file sejauh ini
+
+    def saring_baru(self, df):
+        """Mengembalikan mask baris `df` yang belum ada di database (dan mencatat kemunculannya)."""
+        hash_baris = _hash_baris(df)
+        unik, kelompok, jumlah = np.unique(hash_baris, return_inverse=True, return_counts=True)
+        # Urutan kemunculan setiap baris di antara baris identik dalam chunk ini (cumcount tervektorisasi).
+        urut = np.argsort(kelompok, kind='stable')
+        ke = np.empty(len(hash_baris), dtype='int64')
+        ke[urut] = np.arange(len(hash_baris)) - np.repeat(np.cumsum(jumlah) - jumlah, jumlah)
+
+        sudah_ada = np.zeros(len(unik), dtype='int64')
+        posisi, cocok = _cari_hash(self._hash, unik)
+        sudah_ada[cocok] = self._jumlah[posisi[cocok]]
+        dilihat = np.zeros(len(unik), dtype='int64')
+        posisi, cocok = _cari_hash(self._hash_dilihat, unik)
+        dilihat[cocok] = self._jumlah_dilihat[posisi[cocok]]
+        baru = dilihat[kelompok] + ke + 1 > sudah_ada[kelompok]
+
+        self._jumlah_dilihat[posisi[cocok]] += jumlah[cocok]
+        sisip = np.searchsorted(self._hash_dilihat, unik[~cocok])
+        self._hash_dilihat = np.insert(self._hash_dilihat, sisip, unik[~cocok])
+        self._jumlah_dilihat = np.insert(self._jumlah_dilihat, sisip, jumlah[~cocok])
+        return baru
+
+class CheckpointImpor:
+    """Menyimpan jumlah baris file yang sudah selesai diproses agar impor yang gagal bisa dilanjutkan."""
+
+    def __init__(self, sidik, folder=CHECKPOINT_IMPOR_DIR):
+        self.path = os.path.join(folder, f"{sidik}.json")
+
+    def baca(self):
+        try:
+            with open(self.path) as f:
+                return int(json.load(f)['baris_selesai'])
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            return 0
+
+    def simpan(self, baris_selesai):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        sementara = f"{self.path}.tmp"
+        with open(sementara, 'w') as f:
+            json.dump({'baris_selesai': baris_selesai, 'waktu': datetime.now().isoformat()}, f)
+        os.replace(sementara, self.path)
+
+    def hapus(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+def _sidik_impor(berkas, peta):
+    """Sidik jari impor: isi awal file, ukurannya, dan pemetaan kolom (impor dengan pemetaan lain dianggap baru)."""
+    sidik = hashlib.sha1(json.dumps(peta, sort_keys=True).encode())
+    berkas.seek(0)
+    sidik.update(berkas.read(1 << 20))
+    sidik.update(str(berkas.seek(0, os.SEEK_END)).encode())
+    berkas.seek(0)
+    return sidik.hexdigest()[:16]
+
+def _hitung_baris_csv(berkas):
+    """Menghitung baris data (tanpa header) dengan membaca file per blok."""
+    berkas.seek(0)
+    jumlah = sum(blok.count(b"\n") for blok in iter(lambda: berkas.read(1 << 20), b""))
+    berkas.seek(0)
+    return max(jumlah - 1, 0)
+
+def _normalisasi_chunk_impor(chunk, peta):
+    """
+    Memetakan satu chunk CSV (semua kolom string) ke skema Cashflow. Nominal memakai aturan yang sama
+    dengan form (`_parse_nominal`). Mengembalikan (DataFrame baris valid, baris mentah chunk yang tidak valid).
+    """
+    def kolom(nama):
+        return chunk[peta[nama]].astype(str).str.strip() if peta.get(nama) else pd.Series("", index=chunk.index)
+
+    if peta['mode_jenis'] == MODE_JENIS_DEBIT_KREDIT:
+        debit = kolom('debit').map(_nominal_atau_none)
+        kredit = kolom('kredit').map(_nominal_atau_none)
+        nominal = debit.where(debit > 0, kredit)
+        jenis = pd.Series(np.where(debit > 0, JENIS_PENGELUARAN, JENIS_PEMASUKAN), index=chunk.index)
+        nominal = nominal.where(~((debit > 0) & (kredit > 0)))  # debit dan kredit terisi bersamaan: ambigu
+    else:
+        nominal = kolom('nominal').map(_nominal_atau_none)
+        if peta['mode_jenis'] == MODE_JENIS_TANDA:
+            jenis = pd.Series(np.where(nominal < 0, JENIS_PENGELUARAN, JENIS_PEMASUKAN), index=chunk.index)
+            nominal = nominal.abs()
+        else:
+            jenis = kolom('jenis').str.lower().map(KATA_JENIS_IMPOR)
+
+    tanggal = pd.to_datetime(kolom('tanggal'), format=FORMAT_TANGGAL_IMPOR[peta['format_tanggal']], errors='coerce')
+    akun = kolom('akun') if peta.get('akun') else pd.Series(peta['akun_default'], index=chunk.index)
+    kategori = kolom('kategori')
+    kategori_valid = (
+        ((jenis == JENIS_PEMASUKAN) & kategori.isin(KATEGORI_PEMASUKAN))
+        | ((jenis == JENIS_PENGELUARAN) & kategori.isin(KATEGORI_PENGELUARAN))
+    )
+    kategori = kategori.where(kategori_valid, jenis.map(KATEGORI_DEFAULT_IMPOR))
+
+    hasil = pd.DataFrame({
+        'tanggal': tanggal, 'jenis': jenis, 'kategori': kategori, 'akun': akun,
+        COL_NOMINAL: nominal, 'deskripsi': kolom('deskripsi'),
+    })
+    valid = hasil['tanggal'].notna() & hasil['jenis'].notna() & hasil['akun'].isin(PILIHAN_AKUN) & (hasil[COL_NOMINAL] > 0)
+    hasil = hasil[valid].astype({COL_NOMINAL: 'int64'})
+    return hasil.reset_index(drop=True), chunk[~valid]
+
+def impor_csv(berkas, peta, indeks, checkpoint=None, simpan=None,
+              ukuran_chunk=UKURAN_CHUNK_IMPOR, ukuran_batch=UKURAN_BATCH_IMPOR):
+    """
+    Generator impor CSV: membaca file per chunk, menormalisasi, membuang duplikat, lalu menyimpan baris
+    baru per batch. Setelah setiap chunk, jumlah baris yang selesai dicatat ke checkpoint dan status
+    (dict) di-yield untuk progress bar. Jika checkpoint ada, baris sebelum titik itu hanya diputar ulang
+    ke indeks duplikat tanpa disimpan; baris dari batch yang sempat tersimpan sebelum gagal tersaring
+    sebagai duplikat. Memori terpakai sebanding dengan ukuran chunk, bukan ukuran file.
+    Baris yang tidak valid tidak disimpan, tetapi dilaporkan: `status['contoh_tidak_valid']` berisi
+    maksimal BATAS_CONTOH_TIDAK_VALID baris mentah beserta nomor barisnya di file (baris 1 = header).
+    """
+    simpan = simpan or _simpan_transaksi
+    mulai_dari = checkpoint.baca() if checkpoint else 0
+    status = {'dibaca': 0, 'disimpan': 0, 'duplikat': 0, 'tidak_valid': 0, 'dilanjutkan_dari': mulai_dari, 'contoh_tidak_valid': []}
+    berkas.seek(0)
+    # Wrapper teks sendiri (di-detach di akhir) agar pandas tidak menutup file unggahan saat impor gagal.
+    teks = io.TextIOWrapper(berkas, encoding="utf-8-sig", newline="")
+    try:
+        for chunk in pd.read_csv(teks, dtype=str, keep_default_na=False, chunksize=ukuran_chunk, on_bad_lines="skip"):
+            valid, tidak_valid = _normalisasi_chunk_impor(chunk, peta)
+            baru = indeks.saring_baru(valid)
+            status['dibaca'] += len(chunk)
+            if status['dibaca'] <= mulai_dari:
+                continue  # sudah tersimpan pada percobaan sebelumnya
+            status['tidak_valid'] += len(tidak_valid)
+            sisa_contoh = BATAS_CONTOH_TIDAK_VALID - len(status['contoh_tidak_valid'])
+            if sisa_contoh > 0 and len(tidak_valid):
+                status['contoh_tidak_valid'] += tidak_valid.head(sisa_contoh).assign(baris=lambda d: d.index + 2).to_dict('records')
+            status['duplikat'] += int((~baru).sum())
+            rows = valid[baru].assign(tanggal=lambda d: d['tanggal'].dt.strftime("%Y-%m-%d")).to_dict('records')
+            for awal in range(0, len(rows), ukuran_batch):
+                simpan(rows[awal:awal + ukuran_batch])
+                status['disimpan'] += len(rows[awal:awal + ukuran_batch])
+            if checkpoint:
+                checkpoint.simpan(status['dibaca'])
+            yield {**status, 'contoh_tidak_valid': list(status['contoh_tidak_valid'])}
+    finally:
+        teks.detach()
+    if checkpoint:
+        checkpoint.hapus()
+
+def _tebak_kolom(kolom, kata_kunci):
+    """Indeks pilihan kolom (dengan opsi kosong di depan) yang namanya mengandung salah satu kata kunci."""
+    for i, nama in enumerate(kolom):
+        if any(kata in nama.lower() for kata in kata_kunci):
+            return i + 1
+    return 0
+
+def _form_pemetaan_impor(kolom):
+    """Menampilkan widget pemetaan kolom CSV ke skema Cashflow dan mengembalikan dict `peta`."""
+    pilihan = [None] + kolom
+    format_kolom = lambda nama: "(tidak ada)" if nama is None else nama
+    col1, col2 = st.columns(2)
+    peta = {
+        'akun_default': col1.selectbox("Akun", PILIHAN_AKUN, help="Dipakai jika kolom akun tidak dipetakan."),
+        'format_tanggal': col2.selectbox("Format Tanggal", list(FORMAT_TANGGAL_IMPOR)),
+        'tanggal': col1.selectbox("Kolom Tanggal", pilihan, index=_tebak_kolom(kolom, ["tanggal", "tgl", "date"]), format_func=format_kolom),
+        'deskripsi': col2.selectbox("Kolom Deskripsi", pilihan, index=_tebak_kolom(kolom, ["deskripsi", "keterangan", "desc"]), format_func=format_kolom),
+        'kategori': col1.selectbox("Kolom Kategori", pilihan, index=_tebak_kolom(kolom, ["kategori", "category"]), format_func=format_kolom),
+        'akun': col2.selectbox("Kolom Akun", pilihan, index=_tebak_kolom(kolom, ["akun", "account"]), format_func=format_kolom),
+        'mode_jenis': st.radio("Penentuan Jenis", [MODE_JENIS_KOLOM, MODE_JENIS_TANDA, MODE_JENIS_DEBIT_KREDIT], horizontal=True),
+    }
+    col1, col2 = st.columns(2)
+    if peta['mode_jenis'] == MODE_JENIS_DEBIT_KREDIT:
+        peta['debit'] = col1.selectbox("Kolom Debit (Keluar)", pilihan, index=_tebak_kolom(kolom, ["debit", "debet", "keluar"]), format_func=format_kolom)
+        peta['kredit'] = col2.selectbox("Kolom Kredit (Masuk)", pilihan, index=_tebak_kolom(kolom, ["kredit", "credit", "masuk"]), format_func=format_kolom)
+    else:
+        peta['nominal'] = col1.selectbox("Kolom Nominal", pilihan, index=_tebak_kolom(kolom, ["nominal", "jumlah", "amount", "mutasi"]), format_func=format_kolom)
+        if peta['mode_jenis'] == MODE_JENIS_KOLOM:
+            peta['jenis'] = col2.selectbox("Kolom Jenis", pilihan, index=_tebak_kolom(kolom, ["jenis", "tipe", "type", "cr/db"]), format_func=format_kolom)
+    return peta
+
 # --- Helper untuk Halaman Daftar Transaksi (Edit/Hapus) ---
 def _handle_edit_form_actions(buttons, id_terpilih, form_values):
     """Menangani aksi update, delete, atau cancel pada form edit."""
-    if buttons['update']:
-        supabase.table("Cashflow").update(form_values).eq("id", id_terpilih).execute()
+    ledger = _get_ledger()
+    penulis = _get_penulis()
+    if penulis is not None and (buttons['update'] or buttons['delete']):
+        # Mode write-behind: perubahan dicatat ke jurnal lokal, worker latar yang mengirim dan menerapkannya.
+        if buttons['update']:
+            penulis.antre("update", form_values, id_target=id_terpilih, pemilik=ledger.pemilik)
+        else:
+            penulis.antre("delete", {}, id_target=id_terpilih, pemilik=ledger.pemilik)
+    elif buttons['update']:
+        query = _klien(ledger.pemilik).table(TABEL_CASHFLOW).update(form_values).eq("id", id_terpilih)
+        diupdate = _eksekusi(_saring_pemilik(query, ledger.pemilik), "update").data
+        if diupdate:
+            ledger.terapkan_perubahan(baris=diupdate)
+        else:
+            ledger.tandai_berubah([id_terpilih])  # Baris hasil update tidak dikembalikan; ambil ulang saat sinkron
         st.success("Transaksi berhasil diupdate!")
     elif buttons['delete']:
-        supabase.table("Cashflow").delete().eq("id", id_terpilih).execute()
+        _eksekusi(_saring_pemilik(_klien(ledger.pemilik).table(TABEL_CASHFLOW).delete().eq("id", id_terpilih), ledger.pemilik), "delete")
+        ledger.terapkan_perubahan(ids_dihapus=[id_terpilih])
         st.warning("Transaksi berhasil dihapus!")
     elif buttons['cancel']:
         st.info("Aksi dibatalkan.")
     
-    # Jika ada aksi, bersihkan cache dan muat ulang
-    st.cache_data.clear()
+    # Cache ledger sudah diperbarui langsung (write-through), cukup muat ulang halaman
     st.rerun()
     
+# --- Helper untuk Halaman Periksa Data (Integritas Ledger) ---
+def _kode_teks(seri):
+    """(kode int64 per baris, Index nilai unik) untuk kolom teks; spasi di tepi diabaikan dan NaN menjadi ""."""
+    kode, unik = pd.factorize(seri, use_na_sentinel=False)
+    bersih = pd.Series(unik, dtype=object).fillna("").astype(str).str.strip()
+    kode_bersih, unik_bersih = pd.factorize(bersih)  # nilai yang sama setelah di-strip digabung
+    return kode_bersih[kode].astype('int64'), pd.Index(unik_bersih)
+
+def _pasangkan_kaki(keluar, masuk, kunci):
+    """
+    Self-join 1:1 kaki Keluar dan Masuk pada kolom `kunci`: kaki ke-n dalam satu kelompok kunci di satu
+    sisi dipasangkan dengan kaki ke-n di sisi lain. Mengembalikan (pasangan, sisa_keluar, sisa_masuk).
+    """
+    if keluar.empty or masuk.empty:
+        return pd.DataFrame(columns=['pos_keluar', 'pos_masuk', 'akun_keluar', 'akun_masuk']), keluar, masuk
+    keluar = keluar.assign(urutan=keluar.groupby(kunci, sort=False).cumcount())
+    masuk = masuk.assign(urutan=masuk.groupby(kunci, sort=False).cumcount())
+    pasangan = keluar.merge(masuk, on=kunci + ['urutan'], suffixes=('_keluar', '_masuk'))
+    sisa_keluar = keluar[~keluar['pos'].isin(pasangan['pos_keluar'])].drop(columns='urutan')
+    sisa_masuk = masuk[~masuk['pos'].isin(pasangan['pos_masuk'])].drop(columns='urutan')
+    return pasangan, sisa_keluar, sisa_masuk
+
+def _format_rupiah(nilai):
+    return f"Rp {nilai:,.0f}".replace(',', '.')
+
+def periksa_integritas(df):
+    """
+    Rekonsiliasi Top Up dan pencarian duplikat yang tervektorisasi (tanpa loop per baris).
+    Kaki Top Up Keluar dan Masuk dipasangkan 1:1 lewat self-join bertahap:
+    1. tanggal + nominal + pola deskripsi (akun tujuan/sumber pada deskripsi bawaan, atau deskripsi kustom yang sama);
+    2. tanggal + pola deskripsi tanpa nominal: pasangan yang nominalnya berbeda (tidak seimbang);
+    3. tanggal + nominal saja, untuk kaki yang deskripsinya diedit (akun kedua kaki harus berbeda).
+    Kaki yang tersisa adalah Top Up tanpa pasangan. Biaya admin dicocokkan dengan Top Up pada tanggal dan
+    pasangan akun yang tertulis di deskripsinya. Baris dengan tanggal, jenis, kategori, akun, nominal, dan
+    deskripsi identik ditandai sebagai kemungkinan duplikat.
+    Mengembalikan (temuan, statistik): satu baris per transaksi per masalah; kolom `grup` menghubungkan
+    baris-baris satu temuan (pasangan tidak seimbang atau kelompok duplikat).
+    """
+    statistik = {'baris': len(df), 'kaki_top_up': 0, 'top_up_berpasangan': 0, 'biaya_admin': 0}
+    if df.empty:
+        return pd.DataFrame(columns=KOLOM_EKSPOR + ['masalah', 'keterangan', 'grup']), statistik
+
+    hari = df['tanggal'].to_numpy().astype('datetime64[D]').astype('int64')
+    nominal = df[COL_NOMINAL].to_numpy().astype('int64')
+    jenis, jenis_unik = pd.factorize(df['jenis'])
+    kategori, kategori_unik = pd.factorize(df['kategori'])
+    akun, akun_unik = pd.factorize(df['akun'])
+    akun_unik = pd.Index(akun_unik).astype(str)
+    deskripsi, deskripsi_unik = _kode_teks(df['deskripsi'])
+    kode = lambda unik, nilai: list(unik).index(nilai) if nilai in list(unik) else -2
+    top_up, biaya = kategori == kode(kategori_unik, KATEGORI_TOP_UP), kategori == kode(kategori_unik, KATEGORI_BIAYA_ADMIN)
+    adalah_keluar, adalah_masuk = jenis == kode(jenis_unik, JENIS_PENGELUARAN), jenis == kode(jenis_unik, JENIS_PEMASUKAN)
+
+    # 1. Pola deskripsi diurai sekali per deskripsi unik (hanya yang dipakai Top Up/biaya admin), lalu disebar per baris.
+    #    Hasilnya kode akun: -1 jika deskripsi bukan deskripsi bawaan, -2 jika nama akunnya tidak dikenal.
+    dipakai = np.unique(deskripsi[top_up | biaya])
+    teks = pd.Series(deskripsi_unik[dipakai], index=dipakai, dtype=object)
+    def akun_pada_deskripsi(pola):
+        hasil = []
+        for _, cocok in teks.str.extract(pola).items():
+            cocok = cocok.dropna()
+            per_deskripsi = np.full(len(deskripsi_unik), -1, dtype='int64')
+            indeks = akun_unik.get_indexer(cocok.to_numpy())
+            per_deskripsi[cocok.index.to_numpy()] = np.where(indeks >= 0, indeks, -2)
+            hasil.append(per_deskripsi[deskripsi])
+        return hasil
+    (tujuan,), (sumber,) = akun_pada_deskripsi(POLA_TOP_UP_KELUAR), akun_pada_deskripsi(POLA_TOP_UP_MASUK)
+    biaya_dari, biaya_ke = akun_pada_deskripsi(POLA_BIAYA_ADMIN)
+
+    # 2. Kaki Top Up: deskripsi bawaan menyebut akun lawan, sehingga kuncinya (dari, ke); deskripsi kustom
+    #    dipakai apa adanya (kedua kaki mendapat deskripsi yang sama dari form).
+    pos = np.flatnonzero(top_up & (adalah_keluar | adalah_masuk))
+    keluar = adalah_keluar[pos]
+    lawan = np.where(keluar, tujuan[pos], sumber[pos])
+    bawaan = lawan != -1
+    kaki = pd.DataFrame({
+        'pos': pos, 'hari': hari[pos], 'nominal': nominal[pos], 'akun': akun[pos],
+        'deskripsi': np.where(bawaan, -1, deskripsi[pos]),
+        'dari': np.where(bawaan, np.where(keluar, akun[pos], lawan), -1),
+        'ke': np.where(bawaan, np.where(keluar, lawan, akun[pos]), -1),
+    })
+    pas_tepat, sisa_keluar, sisa_masuk = _pasangkan_kaki(kaki[keluar], kaki[~keluar], ['hari', 'nominal', 'deskripsi', 'dari', 'ke'])
+    pas_selisih, sisa_keluar, sisa_masuk = _pasangkan_kaki(sisa_keluar, sisa_masuk, ['hari', 'deskripsi', 'dari', 'ke'])
+    pas_longgar, sisa_keluar, sisa_masuk = _pasangkan_kaki(sisa_keluar, sisa_masuk, ['hari', 'nominal'])
+    akun_sama = (pas_longgar['akun_keluar'] == pas_longgar['akun_masuk']).to_numpy(dtype=bool)
+    if akun_sama.any():
+        # Dua kaki di akun yang sama bukan Top Up; keduanya kembali menjadi kaki tanpa pasangan.
+        sisa_keluar = pd.concat([sisa_keluar, kaki[kaki['pos'].isin(pas_longgar['pos_keluar'][akun_sama])]])
+        sisa_masuk = pd.concat([sisa_masuk, kaki[kaki['pos'].isin(pas_longgar['pos_masuk'][akun_sama])]])
+        pas_longgar = pas_longgar[~akun_sama]
+    statistik.update(kaki_top_up=len(kaki), top_up_berpasangan=len(pas_tepat) + len(pas_longgar), biaya_admin=int(biaya.sum()))
+
+    # 3. Biaya admin: harus ada Top Up (berpasangan atau tidak) pada tanggal dan pasangan akun di deskripsinya,
+    #    dan dibebankan ke salah satu dari kedua akun itu.
+    sisa = pd.concat([sisa_keluar, sisa_masuk])
+    sisa_dikenal = sisa[(sisa['dari'] >= 0) & (sisa['ke'] >= 0)]
+    berpasangan = [p for p in (pas_tepat, pas_selisih, pas_longgar) if not p.empty]
+    pos_kejadian = np.concatenate([p['pos_keluar'].to_numpy(dtype='int64') for p in berpasangan] + [np.array([], dtype='int64')])
+    lebar = len(akun_unik) + 2
+    kunci_kejadian = lambda h, d, k: (h * lebar + (d + 2)) * lebar + (k + 2)
+    kejadian = np.concatenate([
+        kunci_kejadian(hari[pos_kejadian], akun[pos_kejadian], np.concatenate(
+            [p['akun_masuk'].to_numpy(dtype='int64') for p in berpasangan] + [np.array([], dtype='int64')])),
+        kunci_kejadian(sisa_dikenal['hari'].to_numpy(), sisa_dikenal['dari'].to_numpy(), sisa_dikenal['ke'].to_numpy()),
+    ])
+    pos_biaya = np.flatnonzero(biaya)
+    dari_b, ke_b = biaya_dari[pos_biaya], biaya_ke[pos_biaya]
+    cocok_biaya = (dari_b >= 0) & (ke_b >= 0) & ((akun[pos_biaya] == dari_b) | (akun[pos_biaya] == ke_b))
+    cocok_biaya &= np.isin(kunci_kejadian(hari[pos_biaya], dari_b, ke_b), kejadian)
+    biaya_yatim = pos_biaya[~cocok_biaya]
+
+    # 4. Kemungkinan duplikat: semua kolom isi identik (double submit, impor ganda). Kandidat disaring dulu
+    #    lewat satu kunci campuran 64-bit, lalu dicek persis hanya pada kandidat.
+    dasar = ((hari * (len(jenis_unik) + 1) + jenis + 1) * (len(kategori_unik) + 1) + kategori + 1) * (len(akun_unik) + 1) + akun + 1
+    campur = (dasar.astype('uint64') * np.uint64(0x9E3779B97F4A7C15)) ^ (nominal.astype('uint64') * np.uint64(0xC2B2AE3D27D4EB4F))
+    campur ^= deskripsi.astype('uint64') * np.uint64(0x165667B19E3779F9)
+    kandidat = np.flatnonzero(pd.Series(campur).duplicated(keep=False).to_numpy())
+    isi = pd.DataFrame({'dasar': dasar[kandidat], 'nominal': nominal[kandidat], 'deskripsi': deskripsi[kandidat]})
+    identik = isi.duplicated(keep=False).to_numpy()
+    pos_duplikat = kandidat[identik]
+    grup_duplikat = isi[identik].groupby(list(isi.columns), sort=False).ngroup().to_numpy()
+    ukuran_duplikat = np.bincount(grup_duplikat)[grup_duplikat] if len(grup_duplikat) else grup_duplikat
+
+    # 5. Temuan: satu baris per transaksi per masalah.
+    n_selisih = len(pas_selisih)
+    keterangan_selisih = [
+        f"Keluar {_format_rupiah(a)} vs Masuk {_format_rupiah(b)} (selisih {_format_rupiah(abs(a - b))})"
+        for a, b in zip(pas_selisih['nominal_keluar'].tolist(), pas_selisih['nominal_masuk'].tolist())
+    ] if n_selisih else []
+    pos_yatim = sisa['pos'].to_numpy(dtype='int64')
+    bagian = [
+        (pos_yatim, MASALAH_TOP_UP_YATIM,
+         np.where(adalah_keluar[pos_yatim], "Tidak ada kaki Masuk yang cocok", "Tidak ada kaki Keluar yang cocok"), None),
+        (np.concatenate([pas_selisih['pos_keluar'].to_numpy(dtype='int64'), pas_selisih['pos_masuk'].to_numpy(dtype='int64')]),
+         MASALAH_TOP_UP_TIDAK_SEIMBANG, keterangan_selisih * 2, np.tile(np.arange(n_selisih), 2)),
+        (biaya_yatim, MASALAH_BIAYA_ADMIN_YATIM, "Tidak ada Top Up dengan tanggal dan akun yang disebut di deskripsi", None),
+        (pos_duplikat, MASALAH_DUPLIKAT, [f"{n} transaksi identik" for n in ukuran_duplikat.tolist()], n_selisih + grup_duplikat),
+    ]
+    temuan = pd.concat([
+        df.iloc[p][KOLOM_EKSPOR].reset_index(drop=True).assign(
+            masalah=masalah, keterangan=keterangan, grup=pd.array(grup if grup is not None else [pd.NA] * len(p), dtype='Int64'),
+        )
+        for p, masalah, keterangan, grup in bagian if len(p)
+    ] or [pd.DataFrame(columns=KOLOM_EKSPOR + ['masalah', 'keterangan', 'grup'])], ignore_index=True)
+    if not temuan.empty:
+        temuan['masalah'] = pd.Categorical(temuan['masalah'], categories=URUTAN_MASALAH, ordered=True)
+        temuan = temuan.sort_values(['masalah', 'grup', 'tanggal', 'id'], ascending=[True, True, False, False]).reset_index(drop=True)
+    return temuan, statistik
+
 # ===================================================================================
 # --- FUNGSI-FUNGSI UTAMA HALAMAN ---
 # ===================================================================================
 
+@st.fragment
+@terukur("halaman_detik")
 def halaman_dashboard():
-    """Menampilkan dashboard analisis visual untuk data pemasukan dan pengeluaran."""
-    df = get_data()
-    if df.empty:
+    """
+    Menampilkan dashboard analisis visual untuk data pemasukan dan pengeluaran.
+    Halaman ini sebuah fragmen: mengubah periode hanya menjalankan ulang dashboard, bukan seluruh app.
+    """
+    get_data_versi()
+    ledger = _get_ledger()
+    rentang_data = ledger.rentang_tanggal()  # termasuk tahun yang sudah diarsipkan
+    if rentang_data is None:
         st.info("Belum ada data transaksi untuk ditampilkan.")
         return
 
     # 1. Filter Tanggal Utama
-    tgl_awal, tgl_akhir = _create_date_filters(df)
+    tgl_awal, tgl_akhir = _create_date_filters(rentang_data)
     if tgl_awal is None:
         return
+    # Hanya partisi tahun yang beririsan dengan periode yang dimuat (periode berjalan: partisi panas saja).
+    versi, df = ledger.lihat(tgl_awal, tgl_akhir)
+    cube = ledger.rollup(versi)
 
     st.markdown(f"###### Periode : &nbsp;&nbsp; {tgl_awal.strftime('%d %B %Y')} — {tgl_akhir.strftime('%d %B %Y')}")
 
-    # 2. Filter data berdasarkan rentang tanggal dan jenis transaksi (kecuali Top Up)
-    mask_tanggal = (df['tanggal'].dt.date >= tgl_awal) & (df['tanggal'].dt.date <= tgl_akhir)
-    mask_bukan_top_up = df['kategori'] != KATEGORI_TOP_UP
-    
-    df_filtered_pengeluaran = df[mask_tanggal & mask_bukan_top_up & (df['jenis'] == JENIS_PENGELUARAN)]
-    df_filtered_pemasukan = df[mask_tanggal & mask_bukan_top_up & (df['jenis'] == JENIS_PEMASUKAN)]
-    df_filtered_semua = df[mask_tanggal]
+    # 2-4. Ringkasan dan diagram hanya dihitung ulang jika periode atau data berubah
+    _ringkasan_dashboard(versi, cube, tgl_awal, tgl_akhir)
+
+    # 5. Tampilkan Tabel Detail Transaksi dengan Filter (fragmen tersendiri)
+    _detail_transaksi_dashboard(versi, df, tgl_awal, tgl_akhir)
+
+def _ringkasan_dashboard(versi, cube, tgl_awal, tgl_akhir):
+    """Ringkasan, diagram pie, dan diagram batang dashboard untuk satu periode."""
+    # 2. Ringkasan per kategori diambil dari rollup cube (kecuali Top Up), bukan dari scan transaksi
+    kecuali = (KATEGORI_TOP_UP,)
+    pengeluaran_per_kategori = cube.total_per_kategori(tgl_awal, tgl_akhir, JENIS_PENGELUARAN, list(kecuali))
+    pemasukan_per_kategori = cube.total_per_kategori(tgl_awal, tgl_akhir, JENIS_PEMASUKAN, list(kecuali))
+    kunci_figur = lambda grafik, jenis: (versi, grafik, jenis, tgl_awal, tgl_akhir, kecuali)
 
     # 3. Tampilkan Ringkasan & Diagram Pie
     col_pengeluaran, col_pemasukan = st.columns(2)
     with col_pengeluaran:
-        _display_summary_pie_chart(df_filtered_pengeluaran, "Pengeluaran")
+        _display_summary_pie_chart(pengeluaran_per_kategori, "Pengeluaran", kunci_figur("pie", JENIS_PENGELUARAN))
     with col_pemasukan:
-        _display_summary_pie_chart(df_filtered_pemasukan, "Pemasukan")
+        _display_summary_pie_chart(pemasukan_per_kategori, "Pemasukan", kunci_figur("pie", JENIS_PEMASUKAN))
     
     custom_divider()
 
     # 4. Tampilkan Diagram Batang Pengeluaran
     st.markdown("##### Nominal Pengeluaran per Kategori")
-    if not df_filtered_pengeluaran.empty:
-        pengeluaran_per_kategori = df_filtered_pengeluaran.groupby('kategori')[COL_NOMINAL].sum().sort_values(ascending=False).reset_index()
-        fig_bar = px.bar(
-            pengeluaran_per_kategori, x='kategori', y=COL_NOMINAL,
-            labels={COL_NOMINAL: 'Jumlah Pengeluaran (Rp)', 'kategori': 'Kategori'},
-            text=COL_NOMINAL
-        )
-        fig_bar.update_traces(texttemplate='Rp %{text:,.0f}', textposition='outside')
-        fig_bar.update_layout(xaxis_tickangle=-45)
-        st.plotly_chart(fig_bar, use_container_width=True)
+    if not pengeluaran_per_kategori.empty:
+        with metrik.ukur("plotly_detik", grafik="bar"):
+            fig_bar = _get_cache_figur().ambil(kunci_figur("bar", JENIS_PENGELUARAN), lambda: _buat_bar_chart(pengeluaran_per_kategori))
+            st.plotly_chart(fig_bar, use_container_width=True)
 
     custom_divider()
 
-    # 5. Tampilkan Tabel Detail Transaksi dengan Filter
+@st.fragment
+@terukur("fragmen_detik")
+def _detail_transaksi_dashboard(versi, df, tgl_awal, tgl_akhir):
+    """
+    Tabel detail transaksi dashboard beserta filter detailnya. Berupa fragmen, sehingga mengubah filter
+    detail tidak menghitung ulang ringkasan maupun menggambar ulang diagram pie dan batang.
+    """
+    _pastikan_versi(versi)
     st.markdown("##### Detail Transaksi")
-    if df_filtered_semua.empty:
+    rentang = (tgl_awal, tgl_akhir)
+    if not len(_get_filter_index(versi, df).cari(rentang=rentang)):
         st.warning("Tidak ada transaksi pada rentang waktu yang dipilih.")
         return
         
     with st.expander("Filter Detail Transaksi"):
-        df_display = _apply_detailed_filters(df_filtered_semua)
+        df_display = _apply_detailed_filters(df, versi, rentang=rentang)
 
     if df_display.empty:
         st.warning("Tidak ada data yang cocok dengan filter detail Anda.")
     else:
-        df_display = df_display.sort_values(by='tanggal', ascending=False).reset_index(drop=True)
-        df_display.insert(0, 'No.', range(1, len(df_display) + 1))
-        df_display[COL_NOMINAL] = df_display[COL_NOMINAL].apply(lambda x: f"{x:,.0f}".replace(',', '.'))
-        
-        st.dataframe(
-            df_display, use_container_width=True, hide_index=True,
+        _tampilkan_tabel_berhalaman(
+            versi, df_display, key="tabel_dashboard", kolom_urut_default="Tanggal",
             column_config={
-                "id": None, "hari": None, "bulan": None, "tahun": None,
+                "id": None,
                 "No.": st.column_config.TextColumn("No."),
                 "tanggal": st.column_config.DateColumn("Tanggal", format="YYYY-MM-DD"),
                 "jenis": st.column_config.TextColumn("Jenis"),
@@ -452,9 +1205,12 @@ def halaman_dashboard():
                 "deskripsi": st.column_config.TextColumn("Deskripsi"),
             }
         )
+        _tampilkan_tombol_ekspor(versi, df_display, key="ekspor_dashboard", nama_file=f"transaksi_{tgl_awal:%Y%m%d}_{tgl_akhir:%Y%m%d}")
 
+@st.fragment
+@terukur("halaman_detik")
 def halaman_catat_transaksi():
-    """Menampilkan form untuk mencatat transaksi baru dengan logika biaya admin."""
+    """Menampilkan form untuk mencatat transaksi baru dengan logika biaya admin (fragmen)."""
     st.session_state.setdefault("jenis", JENIS_PEMASUKAN)
     st.session_state.setdefault("kategori", KATEGORI_PEMASUKAN[0])
     st.session_state.setdefault("akun", PILIHAN_AKUN[0])
@@ -515,25 +1271,18 @@ def halaman_catat_transaksi():
     # Proses submit di luar form untuk menjaga state
     _handle_submission(submitted, form_data)
 
+@st.fragment
+@terukur("halaman_detik")
 def halaman_lihat_saldo():
-    """Menghitung dan menampilkan saldo kumulatif untuk setiap akun."""
+    """Menghitung dan menampilkan saldo kumulatif untuk setiap akun (fragmen)."""
     col1, col2 = st.columns(2)
-    df = get_data()
+    get_data()  # Memastikan ledger (dan indeks saldonya) sudah tersinkron.
     
     tanggal_pilihan = col1.date_input("Lihat Saldo per Tanggal", value=datetime.now().date())
 
-    saldo_akun = {}
-    if not df.empty:
-        df_per_tanggal = df[df['tanggal'].dt.date <= tanggal_pilihan].copy()
-
-        if not df_per_tanggal.empty:
-            pemasukan = df_per_tanggal[df_per_tanggal['jenis'] == JENIS_PEMASUKAN].groupby('akun')[COL_NOMINAL].sum()
-            pengeluaran = df_per_tanggal[df_per_tanggal['jenis'] == JENIS_PENGELUARAN].groupby('akun')[COL_NOMINAL].sum()
-            
-            saldo_df = pd.concat([pemasukan, pengeluaran], axis=1).fillna(0)
-            saldo_df.columns = ['pemasukan', 'pengeluaran']
-            saldo_df['saldo'] = saldo_df['pemasukan'] - saldo_df['pengeluaran']
-            saldo_akun = saldo_df['saldo'].to_dict()
+    # Saldo per tanggal: saldo penutup tahun buku terakhir (dari manifest arsip) ditambah indeks saldo
+    # berjalan (binary search per akun), bukan scan ulang seluruh transaksi.
+    saldo_akun = _get_ledger().saldo_per(tanggal_pilihan)
     
     total_saldo = sum(saldo_akun.values())
     formatted_total = f"Rp {total_saldo:,.0f}".replace(',', '.')
@@ -569,17 +1318,33 @@ def halaman_lihat_saldo():
         custom_divider(margin_top=0, margin_bottom=0)
 
 
-def tampilkan_form_edit_hapus(df_filtered):
-    """Menampilkan expander berisi form untuk mengedit atau menghapus transaksi."""
+@st.fragment
+@terukur("fragmen_detik")
+def tampilkan_form_edit_hapus(versi, df_all, df_filtered):
+    """
+    Menampilkan expander berisi form untuk mengedit atau menghapus transaksi.
+    Berupa fragmen: mengetik kata kunci atau memilih transaksi tidak mengurutkan dan memformat ulang tabel.
+    """
+    _pastikan_versi(versi)
     with st.expander("✏️ Edit / Hapus Transaksi"):
-        pilihan = [f"{row['id']} -- {row['tanggal'].strftime('%d/%m')} -- {row['kategori']} -- Rp {row[COL_NOMINAL]:,.0f} -- {row['deskripsi']}".replace(',', '.') for _, row in df_filtered.iterrows()]
-        transaksi_terpilih_str = st.selectbox("Pilih Transaksi", ["Pilih..."] + pilihan)
+        indeks = _get_search_index(versi, df_all)
+        kata_kunci = st.text_input("Cari Transaksi", placeholder="ID, tanggal (2024-05-01 atau 01/05), deskripsi, atau nominal")
+        # Index df_filtered adalah posisi baris di df_all (ledger selalu ber-RangeIndex).
+        basis = None if df_filtered is df_all else df_filtered.index.to_numpy()
+        hasil = indeks.cari(kata_kunci, basis=basis)
+        if kata_kunci and not hasil:
+            st.caption("Tidak ada transaksi yang cocok.")
+        elif len(hasil) == BATAS_HASIL_PENCARIAN:
+            st.caption(f"Menampilkan {BATAS_HASIL_PENCARIAN} hasil teratas; perjelas kata kunci untuk mempersempit.")
+        id_terpilih = st.selectbox(
+            "Pilih Transaksi", [None] + hasil,
+            format_func=lambda id_transaksi: "Pilih..." if id_transaksi is None else indeks.label(id_transaksi),
+        )
 
-        if transaksi_terpilih_str == "Pilih...":
+        if id_terpilih is None:
             return
 
-        id_terpilih = int(transaksi_terpilih_str.split(" -- ")[0])
-        data_lama = df_filtered[df_filtered['id'] == id_terpilih].iloc[0]
+        data_lama = df_all.iloc[indeks.posisi(id_terpilih)]
 
         with st.form("form_edit"):
             st.info(f"Mengedit Transaksi ID: {id_terpilih}")
@@ -613,26 +1378,35 @@ def tampilkan_form_edit_hapus(df_filtered):
                 _handle_edit_form_actions(button_states, id_terpilih, form_values)
 
 
+@st.fragment
+@terukur("halaman_detik")
 def halaman_daftar_transaksi():
-    """Menampilkan semua data transaksi dalam tabel dengan opsi filter."""
-    df_all = get_data()
+    """Menampilkan semua data transaksi dalam tabel dengan opsi filter (fragmen)."""
+    versi, df_all = get_data_versi()
+    ledger = _get_ledger()
+    tahun_arsip = ledger.tahun_arsip()
+    if tahun_arsip:
+        # Tahun buku yang sudah ditutup hanya dimuat dari arsip jika dipilih.
+        pilihan = ["Tahun berjalan"] + [str(tahun) for tahun in tahun_arsip] + ["Semua tahun"]
+        cakupan = st.selectbox("Cakupan Data", pilihan, key="cakupan_daftar")
+        if cakupan == "Semua tahun":
+            versi, df_all = ledger.lihat()
+        elif cakupan != "Tahun berjalan":
+            tahun = int(cakupan)
+            versi, df_all = ledger.lihat(datetime(tahun, 1, 1).date(), datetime(tahun, 12, 31).date())
     if df_all.empty:
         st.info("Belum ada data transaksi.")
         return
     
     with st.expander("🔍 Filter Transaksi"):
-        df_filtered = _apply_detailed_filters(df_all)
+        df_filtered = _apply_detailed_filters(df_all, versi)
 
     st.subheader("Data Transaksi")
     if df_filtered.empty:
         st.warning("Tidak ada data yang cocok dengan filter Anda.")
         return
     
-    df_display = df_filtered.sort_values(by='id', ascending=False).reset_index(drop=True)
-    df_display.insert(0, 'No.', range(1, len(df_display) + 1))
-    df_display[COL_NOMINAL] = df_display[COL_NOMINAL].apply(lambda x: f"{x:,.0f}".replace(',', '.'))
-    
-    st.dataframe(df_display, use_container_width=True, hide_index=True, column_config={
+    _tampilkan_tabel_berhalaman(versi, df_filtered, key="tabel_daftar", column_config={
         "id": st.column_config.TextColumn("ID"),
         "No.": st.column_config.TextColumn("No."),
         "tanggal": st.column_config.DateColumn("Tanggal", format="YYYY-MM-DD"),
@@ -641,11 +1415,227 @@ def halaman_daftar_transaksi():
         "akun": st.column_config.TextColumn("Akun"),
         COL_NOMINAL: st.column_config.TextColumn(LABEL_NOMINAL),
         "deskripsi": st.column_config.TextColumn("Deskripsi"),
-        "hari": None, "bulan": None, "tahun": None,
     })
+    _tampilkan_tombol_ekspor(versi, df_filtered, key="ekspor_daftar", nama_file="transaksi")
     
     # Fungsi form edit/hapus dipanggil dengan data yang sudah difilter
-    tampilkan_form_edit_hapus(df_filtered)
+    tampilkan_form_edit_hapus(versi, df_all, df_filtered)
+
+def _tampilkan_baris_tidak_valid(status):
+    """Menampilkan baris CSV yang dilewati karena tidak valid (tanggal, jenis, akun, atau nominal tidak terbaca)."""
+    if not status['contoh_tidak_valid']:
+        return
+    with st.expander(f"⚠️ {status['tidak_valid']} baris tidak valid dilewati"):
+        contoh = pd.DataFrame(status['contoh_tidak_valid'])
+        st.dataframe(contoh[['baris'] + [k for k in contoh.columns if k != 'baris']], hide_index=True, use_container_width=True)
+        if status['tidak_valid'] > len(contoh):
+            st.caption(f"Menampilkan {len(contoh)} baris pertama.")
+
+@st.fragment
+@terukur("halaman_detik")
+def halaman_impor_transaksi():
+    """Mengimpor mutasi rekening/e-wallet dari file CSV secara bertahap (chunk), tanpa duplikat."""
+    berkas = st.file_uploader("File CSV Mutasi", type=["csv"])
+    if berkas is None:
+        st.info("Unggah file CSV mutasi rekening atau e-wallet untuk mulai mengimpor.")
+        return
+
+    try:
+        kolom = pd.read_csv(berkas, dtype=str, nrows=0).columns.tolist()
+    except Exception as e:
+        st.error(f"File tidak dapat dibaca sebagai CSV: {e}")
+        return
+    peta = _form_pemetaan_impor(kolom)
+    wajib = ['tanggal'] + (['debit', 'kredit'] if peta['mode_jenis'] == MODE_JENIS_DEBIT_KREDIT else ['nominal'])
+    wajib += ['jenis'] if peta['mode_jenis'] == MODE_JENIS_KOLOM else []
+    if any(peta.get(nama) is None for nama in wajib):
+        st.warning("Lengkapi pemetaan kolom: " + ", ".join(nama.capitalize() for nama in wajib if peta.get(nama) is None))
+        return
+
+    berkas.seek(0)
+    contoh, tidak_valid = _normalisasi_chunk_impor(pd.read_csv(berkas, dtype=str, keep_default_na=False, nrows=5), peta)
+    st.markdown("##### Pratinjau")
+    st.dataframe(contoh, hide_index=True, use_container_width=True)
+    if len(tidak_valid):
+        st.caption(f"{len(tidak_valid)} dari 5 baris pertama tidak valid dan akan dilewati.")
+
+    checkpoint = CheckpointImpor(_sidik_impor(berkas, peta))
+    if checkpoint.baca():
+        st.info(f"Impor file ini sebelumnya terhenti setelah baris ke-{checkpoint.baca():,}. Impor akan dilanjutkan dari sana.".replace(',', '.'))
+
+    if not st.button("📥 Impor Transaksi", use_container_width=True):
+        return
+
+    get_data_versi()
+    _, df = _get_ledger().lihat()  # mutasi lama bisa jatuh di tahun yang sudah diarsipkan
+    indeks = IndeksDuplikat(df)
+    total_baris = _hitung_baris_csv(berkas)
+    progres = st.progress(0.0, text="Mengimpor...")
+    status = None
+    try:
+        for status in impor_csv(berkas, peta, indeks, checkpoint=checkpoint):
+            progres.progress(min(status['dibaca'] / max(total_baris, 1), 1.0), text=f"{status['dibaca']:,} / {total_baris:,} baris".replace(',', '.'))
+    except Exception as e:
+        st.error(f"Impor terhenti: {e}. Jalankan impor lagi untuk melanjutkan; baris yang sudah tersimpan tidak akan digandakan.")
+    else:
+        progres.progress(1.0, text="Selesai")
+        if status:
+            st.success(f"{status['disimpan']} transaksi diimpor, {status['duplikat']} duplikat dan {status['tidak_valid']} baris tidak valid dilewati.")
+            _tampilkan_baris_tidak_valid(status)
+    finally:
+        # Baris baru diambil lewat sinkronisasi delta (id di atas watermark), bukan write-through per batch.
+        _get_ledger().tandai_berubah()
+
+@st.fragment(run_every=INTERVAL_PANTAU_LATAR)
+def _pantau_latar(umpan, penulis):
+    """
+    Menampilkan status change feed dan antrean tulis, serta memeriksa versi ledger di memori (tanpa query)
+    tiap detik. Jika feed atau antrean tulis membawa perubahan sejak run terakhir sesi ini, seluruh app dijalankan ulang.
+    """
+    pemilik = _pemilik_aktif()
+    # Hanya diintip: partisi yang sudah dikeluarkan tidak dimuat ulang oleh sesi yang sekadar terbuka.
+    ledger = _get_manajer_ledger().intip(pemilik)
+    if ledger is not None and ledger.snapshot()[0] != st.session_state.get("versi_terlihat"):
+        st.rerun()
+    if umpan is not None:
+        if umpan.terhubung:
+            st.caption("🟢 Realtime tersambung")
+        else:
+            st.caption("🟡 Realtime terputus, memakai sinkronisasi berkala")
+    if penulis is not None:
+        ringkasan = penulis.jurnal.ringkasan(pemilik)
+        if ringkasan['menunggu'] > ringkasan['ditahan']:
+            st.caption(f"⏳ {ringkasan['menunggu'] - ringkasan['ditahan']} perubahan menunggu dikirim ke database")
+        if ringkasan['ditahan']:
+            st.caption(f"⏸️ {ringkasan['ditahan']} perubahan berikutnya ditahan agar urutannya tetap; coba lagi atau buang yang gagal")
+        if ringkasan['gagal']:
+            with st.expander(f"⚠️ {ringkasan['gagal']} perubahan gagal dikirim"):
+                for mutasi in penulis.jurnal.daftar("gagal", pemilik):
+                    st.caption(f"{mutasi['operasi'].capitalize()} {mutasi['id_target'] or ''} ({mutasi['percobaan']}x): {mutasi['galat']}")
+                col_ulang, col_buang = st.columns(2)
+                if col_ulang.button("🔁 Coba Lagi", use_container_width=True):
+                    penulis.ulangi(pemilik)
+                    st.rerun(scope="fragment")
+                if col_buang.button("🗑️ Buang", use_container_width=True):
+                    penulis.jurnal.buang_gagal(pemilik)
+                    st.rerun(scope="fragment")
+
+def _admin_metrik():
+    """
+    Panel performa menampilkan, mengunduh, dan me-reset metrik seluruh proses (semua sesi), jadi hanya untuk
+    admin: pengguna login yang emailnya ada di daftar `admin` pada bagian [pengaturan]. Tanpa daftar admin,
+    panel hanya tersedia di mode satu rumah tangga, di mana setiap pengunjung memang melihat buku kas yang sama.
+    """
+    admin = pengaturan("admin", [])
+    if admin:
+        return bool(st.user.is_logged_in) and st.user.get("email") in admin
+    return not pengaturan("multi_pengguna", False)
+
+def tampilkan_panel_performa():
+    """Panel debug: ringkasan histogram latensi dan penghitung, plus ekspor JSON/Prometheus."""
+    with st.expander("🩺 Panel Performa", expanded=True):
+        data = metrik.snapshot()
+        st.caption(f"Metrik dikumpulkan sejak {data['sejak']}.")
+        if data['histogram']:
+            st.markdown("##### Latensi")
+            st.dataframe(pd.DataFrame([
+                {
+                    'Metrik': h['nama'],
+                    'Label': ", ".join(f"{k}={v}" for k, v in h['label'].items()),
+                    'Jumlah': h['jumlah'],
+                    'Rata-rata (ms)': round(h['total_detik'] / h['jumlah'] * 1000, 2),
+                    'p50 ≤ (ms)': _persentil_histogram(h, 0.5) * 1000,
+                    'p95 ≤ (ms)': _persentil_histogram(h, 0.95) * 1000,
+                    'Total (s)': round(h['total_detik'], 3),
+                }
+                for h in data['histogram']
+            ]), use_container_width=True, hide_index=True)
+        if data['penghitung']:
+            st.markdown("##### Penghitung")
+            st.dataframe(pd.DataFrame([
+                {'Metrik': p['nama'], 'Label': ", ".join(f"{k}={v}" for k, v in p['label'].items()), 'Nilai': p['nilai']}
+                for p in data['penghitung']
+            ]), use_container_width=True, hide_index=True)
+        if not data['histogram'] and not data['penghitung']:
+            st.info("Belum ada metrik. Jelajahi halaman lain untuk mulai mengumpulkan data.")
+
+        manajer = _get_manajer_ledger()
+        partisi = manajer.statistik()
+        if partisi:
+            total = sum(p['byte'] for p in partisi)
+            st.markdown("##### Partisi Ledger")
+            st.caption(
+                f"{total / 2**20:,.1f} dari {manajer.batas_byte / 2**20:,.0f} MB terpakai oleh {len(partisi)} partisi; "
+                f"{manajer.jumlah_dikeluarkan} partisi pernah dikeluarkan (LRU)."
+            )
+            st.dataframe(pd.DataFrame([
+                {'Pemilik': p['pemilik'], 'Versi': p['versi'], 'Baris': p['baris'], 'Memori (MB)': round(p['byte'] / 2**20, 2)}
+                for p in reversed(partisi)
+            ]), use_container_width=True, hide_index=True)
+
+        col_json, col_prom, col_reset = st.columns(3)
+        col_json.download_button(
+            "⬇️ JSON", data=lambda: json.dumps(metrik.snapshot(), indent=2), file_name="metrik.json",
+            mime="application/json", on_click="ignore", use_container_width=True,
+        )
+        col_prom.download_button(
+            "⬇️ Prometheus", data=lambda: metrik.prometheus(), file_name="metrik.prom",
+            mime="text/plain", on_click="ignore", use_container_width=True,
+        )
+        if col_reset.button("♻️ Reset", use_container_width=True):
+            metrik.reset()
+            st.rerun()
+
+@st.fragment
+@terukur("halaman_detik")
+def halaman_periksa_data():
+    """Memeriksa integritas ledger: pasangan Top Up, biaya admin, dan kemungkinan duplikat (fragmen)."""
+    get_data_versi()
+    ledger = _get_ledger()
+    # Semua tahun ikut diperiksa: kaki Top Up bisa rusak karena edit di tahun yang sudah diarsipkan.
+    versi, df = ledger.lihat()
+    if df.empty:
+        st.info("Belum ada data transaksi.")
+        return
+    temuan, statistik = ledger.per_versi("integritas", versi, df, lambda _, data: periksa_integritas(data))
+
+    angka = {nama: f"{nilai:,}".replace(',', '.') for nama, nilai in statistik.items()}
+    st.caption(
+        f"{angka['baris']} transaksi diperiksa: {angka['top_up_berpasangan']} Top Up berpasangan dari "
+        f"{angka['kaki_top_up']} kaki Top Up, {angka['biaya_admin']} biaya admin."
+    )
+    jumlah = temuan['masalah'].value_counts() if not temuan.empty else pd.Series(dtype='int64')
+    for kolom, masalah in zip(st.columns(len(URUTAN_MASALAH)), URUTAN_MASALAH):
+        kolom.metric(masalah, f"{int(jumlah.get(masalah, 0)):,}".replace(',', '.'))
+    if temuan.empty:
+        st.success("Tidak ada masalah yang ditemukan.")
+        return
+
+    custom_divider()
+    pilihan = st.selectbox(
+        "Jenis Masalah", ["Semua"] + [m for m in URUTAN_MASALAH if jumlah.get(m, 0)], key="masalah_periksa",
+    )
+    terpilih = temuan if pilihan == "Semua" else temuan[temuan['masalah'] == pilihan]
+    tampil = terpilih.head(BATAS_TEMUAN_DITAMPILKAN).copy()
+    tampil[COL_NOMINAL] = tampil[COL_NOMINAL].apply(lambda x: f"{x:,.0f}".replace(',', '.'))
+    st.dataframe(tampil, use_container_width=True, hide_index=True, column_config={
+        "id": st.column_config.TextColumn("ID"),
+        "tanggal": st.column_config.DateColumn("Tanggal", format="YYYY-MM-DD"),
+        "jenis": st.column_config.TextColumn("Jenis"),
+        "kategori": st.column_config.TextColumn("Kategori"),
+        "akun": st.column_config.TextColumn("Akun"),
+        COL_NOMINAL: st.column_config.TextColumn(LABEL_NOMINAL),
+        "deskripsi": st.column_config.TextColumn("Deskripsi"),
+        "masalah": st.column_config.TextColumn("Masalah"),
+        "keterangan": st.column_config.TextColumn("Keterangan"),
+        "grup": st.column_config.NumberColumn("Grup", help="Baris dengan grup yang sama termasuk satu temuan."),
+    })
+    if len(terpilih) > BATAS_TEMUAN_DITAMPILKAN:
+        st.caption(f"Menampilkan {BATAS_TEMUAN_DITAMPILKAN:,} dari {len(terpilih):,} temuan; unduh CSV untuk daftar lengkap.".replace(',', '.'))
+    st.download_button(
+        f"⬇️ Unduh {len(terpilih):,} temuan".replace(',', '.'), data=lambda: terpilih.to_csv(index=False, date_format="%Y-%m-%d").encode(),
+        file_name="temuan_integritas.csv", mime="text/csv", key="unduh_periksa", on_click="ignore", use_container_width=True,
+    )
 
 # ===================================================================================
 # --- STRUKTUR UTAMA APLIKASI (ROUTER) ---
@@ -662,22 +1652,43 @@ def main():
     <div class="judul-bawah">✨ <em>Financial Freedom</em> ✨</div>
     """, unsafe_allow_html=True)
 
+    # Mode multi-pengguna: setiap rumah tangga hanya melihat partisi ledgernya sendiri, jadi wajib login.
+    if pengaturan("multi_pengguna", False) and not st.user.is_logged_in:
+        st.info("Masuk terlebih dahulu untuk membuka buku kas rumah tangga Anda.")
+        st.button("🔑 Masuk", on_click=st.login, use_container_width=True)
+        st.stop()
+
     # Menu navigasi utama
     menu_options = {
         PAGE_DASHBOARD: "📊 Dashboard",
         PAGE_LIHAT_SALDO: "💰 Saldo Akun",
         PAGE_CATAT_TRANSAKSI: "📝 Catat Transaksi",
-        PAGE_DAFTAR_TRANSAKSI: "🧾 Daftar Transaksi"
+        PAGE_DAFTAR_TRANSAKSI: "🧾 Daftar Transaksi",
+        PAGE_IMPOR_TRANSAKSI: "📥 Impor Transaksi",
+        PAGE_PERIKSA_DATA: "🩹 Periksa Data",
     }
     menu = st.selectbox(
         "📌 Menu",
         options=list(menu_options.keys()),
         format_func=lambda key: menu_options[key],
+        key="menu",
     )
     
     custom_divider(margin_top=10, margin_bottom=20)
 
-    # Router untuk menampilkan halaman yang sesuai
+    # Full reload hanya dilakukan atas permintaan; selebihnya cukup sinkronisasi delta.
+    if st.sidebar.button("🔄 Muat Ulang Semua Data", use_container_width=True):
+        try:
+            _get_ledger().full_reload()
+        except Exception as e:
+            st.sidebar.error(f"Gagal memuat ulang data: {e}")
+
+    # Instrumentasi dinyalakan operator lewat pengaturan, bukan dari sesi, karena registry-nya dipakai semua
+    # sesi. Toggle ini hanya menampilkan panel di sesi ini, dan hanya untuk admin.
+    panel_performa = metrik.aktif and _admin_metrik() and st.sidebar.toggle("🩺 Panel Performa", key="panel_performa")
+
+    # Router untuk menampilkan halaman yang sesuai. Setiap halaman adalah fragmen (dengan fragmen
+    # bersarang untuk tabel, ekspor, dan form edit), sehingga interaksi hanya menjalankan ulang bagiannya.
     if menu == PAGE_DASHBOARD:
         halaman_dashboard()
     elif menu == PAGE_CATAT_TRANSAKSI:
@@ -686,9 +1697,73 @@ def main():
         halaman_lihat_saldo()
     elif menu == PAGE_DAFTAR_TRANSAKSI:
         halaman_daftar_transaksi()
+    elif menu == PAGE_IMPOR_TRANSAKSI:
+        halaman_impor_transaksi()
+    elif menu == PAGE_PERIKSA_DATA:
+        halaman_periksa_data()
+
+    if panel_performa:
+        tampilkan_panel_performa()
+
+    # Change feed dan antrean tulis (opsional): versi yang sudah ditampilkan dicatat agar sesi ini
+    # dijalankan ulang hanya saat pekerjaan latar membawa perubahan data.
+    umpan, penulis = _get_umpan(_pemilik_aktif()), _get_penulis()
+    if umpan is not None or penulis is not None:
+        st.session_state["versi_terlihat"] = _get_ledger().snapshot()[0]
+        with st.sidebar:
+            _pantau_latar(umpan, penulis)
+
+# ===================================================================================
+# --- ALAT BARIS PERINTAH ---
+# ===================================================================================
+def main_cli(argv=None):
+    """
+    Titik masuk baris perintah (saat app.py dijalankan langsung, bukan lewat `streamlit run`):
+        python app.py periksa [--file transaksi.parquet|.csv] [--pemilik RUMAH_TANGGA] [--output temuan.csv]
+    Tanpa --file, ledger dimuat seperti di aplikasi (mirror dan arsip lokal, delta dari Supabase dengan
+    kredensial di .streamlit/secrets.toml). Exit code 1 jika ada temuan, sehingga bisa dipakai di cron.
+    """
+    parser = argparse.ArgumentParser(prog="python app.py", description="Alat baris perintah Cashflow.")
+    sub = parser.add_subparsers(dest="perintah", required=True)
+    p_periksa = sub.add_parser("periksa", help="Rekonsiliasi Top Up, biaya admin, dan kemungkinan duplikat.")
+    p_periksa.add_argument("--file", help="File ekspor CSV/Parquet dari aplikasi sebagai pengganti database.")
+    p_periksa.add_argument("--pemilik", help="Partisi ledger yang diperiksa (mode multi-pengguna).")
+    p_periksa.add_argument("--output", help="Simpan semua temuan ke file CSV.")
+    p_periksa.add_argument("--tampilkan", type=int, default=20, help="Jumlah temuan yang dicetak (default 20).")
+    args = parser.parse_args(argv)
+
+    if args.file:
+        if args.file.endswith(".parquet"):
+            mentah = pq.read_table(args.file).to_pandas()
+        else:
+            mentah = pd.read_csv(args.file, dtype={'deskripsi': str})
+        df = _bersihkan_data(mentah)
+    else:
+        ledger = _buat_ledger(args.pemilik)
+        ledger.get()
+        _, df = ledger.lihat()
+    mulai = time.perf_counter()
+    temuan, statistik = periksa_integritas(df)
+    detik = time.perf_counter() - mulai
+
+    print(f"{statistik['baris']:,} transaksi diperiksa dalam {detik:.2f} detik: {statistik['top_up_berpasangan']:,} Top Up "
+          f"berpasangan dari {statistik['kaki_top_up']:,} kaki, {statistik['biaya_admin']:,} biaya admin.")
+    jumlah = temuan['masalah'].value_counts() if not temuan.empty else {}
+    for masalah in URUTAN_MASALAH:
+        print(f"  {masalah:<28}{int(jumlah.get(masalah, 0)):>10,}")
+    if not temuan.empty and args.tampilkan:
+        print()
+        print(temuan.head(args.tampilkan).to_string(index=False))
+    if args.output:
+        temuan.to_csv(args.output, index=False, date_format="%Y-%m-%d")
+        print(f"{len(temuan):,} temuan disimpan ke {args.output}")
+    return 1 if not temuan.empty else 0
 
 # ===================================================================================
 # --- TITIK MASUK EKSEKUSI PROGRAM ---
 # ===================================================================================
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if st.runtime.exists():
+        main()
+    else:
+        sys.exit(main_cli())
\ No newline at end of file
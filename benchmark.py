@@ -0,0 +1,1302 @@
+# ===================================================================================
+# --- BENCHMARK & LEDGER SINTETIS ---
+# ===================================================================================
+# Alat ukur performa aplikasi tanpa perlu proyek Supabase sungguhan.
+# Contoh pemakaian:
+#   python benchmark.py memori --baris 1000000
+#   python benchmark.py tabel --baris 10000 100000 1000000
+#   python benchmark.py kueri --baris 100000 1000000 10000000
+#   python benchmark.py ekspor --baris 1000000
+#   python benchmark.py partisi --pengguna 10 --baris-per-pengguna 50000
+#   python benchmark.py bersama --baris 100000 --worker 4
+#   python benchmark.py startup --baris 100000
+#   python benchmark.py tahunan --baris 1000000
+#   python benchmark.py integritas --baris 1000000 --kesalahan 500
+#   python benchmark.py suite --baris 10000 100000 1000000 --output hasil.json [--bandingkan dasar.json]
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import platform
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import app
+from cashflow.cache import CacheFigur, FilterIndex, SearchIndex
+from cashflow.ekspor import ekspor_csv, ekspor_parquet
+from cashflow.konstanta import (
+    COL_KUNCI_IDEMPOTEN,
+    COL_NOMINAL,
+    COL_PEMILIK,
+    INTERVAL_SINKRONISASI,
+    JENIS_PEMASUKAN,
+    JENIS_PENGELUARAN,
+    KATEGORI_BIAYA_ADMIN,
+    KATEGORI_PEMASUKAN,
+    KATEGORI_PENGELUARAN,
+    KATEGORI_TOP_UP,
+    KOLOM_EKSPOR,
+    KOLOM_WAJIB,
+    METODE_BIAYA_SUMBER,
+    PILIHAN_AKUN,
+    TABEL_CASHFLOW,
+    UKURAN_HALAMAN_FETCH,
+)
+from cashflow.ledger import (
+    ArsipTahunan,
+    KueriLedger,
+    LedgerMirror,
+    LedgerSync,
+    ManajerLedger,
+    RollupCube,
+    SaldoIndex,
+)
+from cashflow.ledger.indeks import _duckdb
+from cashflow.ledger.muat import _bersihkan_data
+from cashflow.ledger.sinkron import _ukuran_byte
+from cashflow.sync import JurnalTulis, PenulisLatar, UmpanPerubahan
+
+# ===================================================================================
+# --- GENERATOR LEDGER SINTETIS ---
+# ===================================================================================
+TANGGAL_MULAI = "2021-01-01"
+JUMLAH_HARI = 5 * 365
+PORSI_TOP_UP = 0.1  # perkiraan porsi baris yang berasal dari Top Up (keluar + masuk + biaya admin)
+DESKRIPSI_CONTOH = ["Makan siang", "Belanja bulanan", "Bensin", "Langganan", "Gaji bulanan", "Kopi", "Parkir", "Bayar tagihan"]
+
+def buat_ledger_sintetis(jumlah_baris, seed=0):
+    """
+    Membuat DataFrame mentah (seperti `response.data` dari Supabase) secara deterministik.
+    Memakai konstanta kategori & akun dari cashflow.konstanta, termasuk Top Up lengkap dengan kaki keluar,
+    kaki masuk, dan (sebagian) biaya admin. Baris diurutkan per tanggal dan diberi id berurutan.
+    """
+    rng = np.random.default_rng(seed)
+    akun = np.array(PILIHAN_AKUN)
+
+    # 1. Top Up: setiap kejadian menghasilkan 2 baris, ditambah biaya admin untuk ~separuhnya.
+    jumlah_top_up = int(jumlah_baris * PORSI_TOP_UP / 2.5)
+    ada_biaya = rng.random(jumlah_top_up) < 0.5
+    hari_top_up = rng.integers(0, JUMLAH_HARI, jumlah_top_up)
+    dari = rng.integers(0, len(akun), jumlah_top_up)
+    ke = (dari + rng.integers(1, len(akun), jumlah_top_up)) % len(akun)  # selalu berbeda dari akun sumber
+    nominal_top_up = rng.integers(1, 200, jumlah_top_up) * 10_000
+    dari_akun, ke_akun = akun[dari], akun[ke]
+    keluar = pd.DataFrame({
+        'hari': hari_top_up, 'jenis': JENIS_PENGELUARAN, 'kategori': KATEGORI_TOP_UP,
+        'akun': dari_akun, COL_NOMINAL: nominal_top_up, 'deskripsi': np.char.add("Top Up ke ", ke_akun),
+    })
+    masuk = pd.DataFrame({
+        'hari': hari_top_up, 'jenis': JENIS_PEMASUKAN, 'kategori': KATEGORI_TOP_UP,
+        'akun': ke_akun, COL_NOMINAL: nominal_top_up, 'deskripsi': np.char.add("Top Up dari ", dari_akun),
+    })
+    biaya = pd.DataFrame({
+        'hari': hari_top_up[ada_biaya], 'jenis': JENIS_PENGELUARAN, 'kategori': KATEGORI_BIAYA_ADMIN,
+        'akun': dari_akun[ada_biaya], COL_NOMINAL: 2_500,
+        'deskripsi': np.char.add(np.char.add(np.char.add("Biaya admin Top Up dari ", dari_akun[ada_biaya]), " ke "), ke_akun[ada_biaya]),
+    })
+
+    # 2. Transaksi reguler mengisi sisa baris.
+    sisa = max(jumlah_baris - len(keluar) - len(masuk) - len(biaya), 0)
+    pengeluaran = rng.random(sisa) < 0.7
+    kategori_keluar = np.array([k for k in KATEGORI_PENGELUARAN if k not in (KATEGORI_TOP_UP, KATEGORI_BIAYA_ADMIN)])
+    kategori_masuk = np.array([k for k in KATEGORI_PEMASUKAN if k != KATEGORI_TOP_UP])
+    reguler = pd.DataFrame({
+        'hari': rng.integers(0, JUMLAH_HARI, sisa),
+        'jenis': np.where(pengeluaran, JENIS_PENGELUARAN, JENIS_PEMASUKAN),
+        'kategori': np.where(pengeluaran, rng.choice(kategori_keluar, sisa), rng.choice(kategori_masuk, sisa)),
+        'akun': rng.choice(akun, sisa),
+        COL_NOMINAL: (rng.lognormal(10.5, 1.0, sisa) // 500 * 500).astype('int64') + 500,
+        'deskripsi': np.char.add(rng.choice(DESKRIPSI_CONTOH, sisa), rng.integers(0, 1000, sisa).astype(str)),
+    })
+
+    df = pd.concat([keluar, masuk, biaya, reguler], ignore_index=True).iloc[:jumlah_baris]
+    df = df.sort_values('hari', kind='stable').reset_index(drop=True)
+    tanggal = pd.Timestamp(TANGGAL_MULAI) + pd.to_timedelta(df.pop('hari'), unit='D')
+    df.insert(0, 'tanggal', tanggal.dt.strftime('%Y-%m-%d'))
+    df.insert(0, 'id', np.arange(1, len(df) + 1))
+    return df
+
+# ===================================================================================
+# --- FAKE SUPABASE CLIENT (DI MEMORI) ---
+# ===================================================================================
+class _Respons:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+class _FakeQuery:
+    """Query builder tiruan: subset PostgREST yang dipakai aplikasi (select/insert/upsert/update/delete + filter)."""
+
+    def __init__(self, klien, nama):
+        self._klien, self._nama = klien, nama
+        self._aksi, self._kolom, self._count, self._head = "select", "*", None, False
+        self._saring, self._urut, self._batas, self._isi = [], [], None, None
+
+    def select(self, kolom="*", count=None, head=False):
+        self._kolom, self._count, self._head = kolom, count, head
+        return self
+
+    def _filter(self, kolom, op, nilai):
+        self._saring.append((kolom, op, nilai))
+        return self
+
+    def eq(self, kolom, nilai):
+        return self._filter(kolom, "eq", nilai)
+
+    def gt(self, kolom, nilai):
+        return self._filter(kolom, "gt", nilai)
+
+    def gte(self, kolom, nilai):
+        return self._filter(kolom, "gte", nilai)
+
+    def lt(self, kolom, nilai):
+        return self._filter(kolom, "lt", nilai)
+
+    def lte(self, kolom, nilai):
+        return self._filter(kolom, "lte", nilai)
+
+    def in_(self, kolom, nilai):
+        return self._filter(kolom, "in", list(nilai))
+
+    def order(self, kolom, desc=False):
+        self._urut.append((kolom, desc))
+        return self
+
+    def limit(self, n):
+        self._batas = n
+        return self
+
+    def insert(self, baris):
+        self._aksi, self._isi = "insert", baris if isinstance(baris, list) else [baris]
+        return self
+
+    def upsert(self, baris, on_conflict="", ignore_duplicates=False):
+        # Hanya mode yang dipakai antrean tulis: baris dengan nilai `on_conflict` yang sudah ada diabaikan.
+        if not ignore_duplicates:
+            raise NotImplementedError("FakeSupabase hanya mendukung upsert ignore_duplicates=True")
+        self.insert(baris)
+        self._aksi, self._konflik = "upsert", on_conflict
+        return self
+
+    def update(self, nilai):
+        self._aksi, self._isi = "update", nilai
+        return self
+
+    def delete(self):
+        self._aksi = "delete"
+        return self
+
+    def execute(self):
+        return self._klien._jalankan(self)
+
+class FakeSupabase:
+    """
+    Pengganti klien `supabase` (hasil `init_connection()`) yang menyimpan tabel sebagai DataFrame terurut id.
+    Filter rentang id memakai binary search sehingga fetch berhalaman tetap murah pada jutaan baris,
+    `max_rows` meniru batas baris per response PostgREST, dan `latensi` (detik) meniru round trip jaringan.
+    `peluang_gagal` meniru jaringan tidak stabil pada request tulis: separuh kegagalan terjadi sebelum
+    data tersimpan, separuh lagi setelahnya (response hilang), seperti timeout sungguhan.
+    """
+    OPERASI = {
+        "eq": lambda s, v: s == v, "gt": lambda s, v: s > v, "gte": lambda s, v: s >= v,
+        "lt": lambda s, v: s < v, "lte": lambda s, v: s <= v, "in": lambda s, v: s.isin(v),
+    }
+
+    def __init__(self, baris=None, max_rows=1000, latensi=0.0, peluang_gagal=0.0, seed=0):
+        df = pd.DataFrame(baris if baris is not None else [], columns=None if baris is not None else KOLOM_WAJIB)
+        # Kolom teks disimpan sebagai object (seperti hasil decode JSON) agar to_dict() per response murah.
+        df = df.astype({kolom: object for kolom in df.columns if not pd.api.types.is_numeric_dtype(df[kolom])})
+        self._tabel = {TABEL_CASHFLOW: df.sort_values('id').reset_index(drop=True)}
+        self.max_rows = max_rows
+        self.latensi = latensi
+        self.peluang_gagal = peluang_gagal
+        self._acak = np.random.default_rng(seed)
+        self.jumlah_request = 0
+        self._lock = threading.Lock()
+
+    def table(self, nama):
+        return _FakeQuery(self, nama)
+
+    def _potong(self, df, saring):
+        """Menerapkan filter: rentang id lewat searchsorted, sisanya lewat mask vektor."""
+        kiri, kanan = 0, len(df)
+        ids = df['id'].to_numpy()
+        sisa = []
+        for kolom, op, nilai in saring:
+            if kolom not in df:
+                raise RuntimeError(f"column {TABEL_CASHFLOW}.{kolom} does not exist")
+            if kolom == 'id' and op in ("gt", "gte"):
+                kiri = max(kiri, int(np.searchsorted(ids, nilai, side='right' if op == "gt" else 'left')))
+            elif kolom == 'id' and op in ("lt", "lte"):
+                kanan = min(kanan, int(np.searchsorted(ids, nilai, side='left' if op == "lt" else 'right')))
+            else:
+                sisa.append((kolom, op, nilai))
+        posisi = np.arange(kiri, max(kiri, kanan))
+        for kolom, op, nilai in sisa:
+            posisi = posisi[self.OPERASI[op](df[kolom].iloc[posisi], nilai).to_numpy()]
+        return posisi
+
+    def _jalankan(self, q):
+        self.jumlah_request += 1
+        if self.latensi:
+            time.sleep(self.latensi)
+        gagal = None
+        if q._aksi != "select" and self._acak.random() < self.peluang_gagal:
+            gagal = "sebelum" if self._acak.random() < 0.5 else "sesudah"
+            if gagal == "sebelum":
+                raise ConnectionError("koneksi terputus (request tidak sampai)")
+        respons = self._jalankan_di_tabel(q)
+        if gagal == "sesudah":
+            raise TimeoutError("timeout (data tersimpan, response hilang)")
+        return respons
+
+    def _jalankan_di_tabel(self, q):
+        with self._lock:
+            df = self._tabel[q._nama]
+            if q._aksi == "upsert" and q._konflik in df:
+                sudah = set(df[q._konflik].dropna())
+                q._isi = [b for b in q._isi if b.get(q._konflik) not in sudah]
+                if not q._isi:
+                    return _Respons([])
+            if q._aksi in ("insert", "upsert"):
+                baru = pd.DataFrame(q._isi)
+                mulai = int(df['id'].max()) + 1 if len(df) else 1
+                baru.insert(0, 'id', np.arange(mulai, mulai + len(baru)))
+                self._tabel[q._nama] = pd.concat([df, baru], ignore_index=True) if len(df) else baru
+                return _Respons(baru.to_dict('records'))
+            posisi = self._potong(df, q._saring)
+            if q._aksi == "update":
+                for kolom, nilai in q._isi.items():
+                    df.loc[posisi, kolom] = nilai
+                return _Respons(df.iloc[posisi].to_dict('records'))
+            if q._aksi == "delete":
+                terhapus = df.iloc[posisi].to_dict('records')
+                self._tabel[q._nama] = df.drop(index=df.index[posisi]).reset_index(drop=True)
+                return _Respons(terhapus)
+            count = len(posisi) if q._count else None
+            if q._head:
+                return _Respons([], count)
+            hasil = df.iloc[posisi]
+            for kolom, desc in reversed(q._urut):
+                if kolom != 'id' or desc:  # data sudah terurut id menaik
+                    hasil = hasil.sort_values(kolom, ascending=not desc, kind='stable')
+            hasil = hasil.head(min(n for n in (q._batas, self.max_rows) if n) if (q._batas or self.max_rows) else len(hasil))
+            if q._kolom != "*":
+                hasil = hasil[[kolom.strip() for kolom in q._kolom.split(",")]]
+            return _Respons(hasil.to_dict('records'), count)
+
+def pasang_fake_supabase(klien, interval=float("inf")):
+    """
+    Mengganti klien global app.py dengan `klien` dan memasang ManajerLedger dengan satu LedgerSync baru
+    (tanpa mirror disk) sebagai pengganti `_get_manajer_ledger()`. Mengembalikan ledger tersebut.
+    """
+    ledger = _buat_ledger_fake(klien, interval)
+    manajer = ManajerLedger(lambda pemilik: ledger)
+    app.init_connection = lambda: klien
+    app._get_manajer_ledger = lambda: manajer
+    return ledger
+
+def _buat_ledger_fake(klien, interval=float("inf"), pemilik=None, mirror=None, arsip=None):
+    ledger = LedgerSync(
+        klien, interval=interval, ukuran_halaman=klien.max_rows or UKURAN_HALAMAN_FETCH, mirror=mirror, pemilik=pemilik, arsip=arsip,
+    )
+    ledger.tambah_turunan("saldo", SaldoIndex())
+    ledger.tambah_turunan("rollup", RollupCube())
+    return ledger
+
+# ===================================================================================
+# --- LAPORAN MEMORI ---
+# ===================================================================================
+def _bersihkan_data_lama(df):
+    """Pembersihan versi lama (string object + `pd.to_numeric` tanpa tipe eksplisit) sebagai pembanding."""
+    for col in ['jenis', 'kategori', 'akun']:
+        df[col] = df[col].astype(object).str.strip()
+    df['deskripsi'] = df['deskripsi'].astype(object)
+    df['tanggal'] = pd.to_datetime(df['tanggal'])
+    df[COL_NOMINAL] = pd.to_numeric(df[COL_NOMINAL])
+    # Dulu _apply_detailed_filters() menambah tiga kolom int64 pada salinan penuh.
+    df['hari'] = df['tanggal'].dt.day
+    df['bulan'] = df['tanggal'].dt.month
+    df['tahun'] = df['tanggal'].dt.year
+    return df
+
+def laporan_memori(jumlah_baris, seed=0):
+    """Mengembalikan byte per baris (total dan per kolom) untuk skema lama dan skema ringkas."""
+    mentah = buat_ledger_sintetis(jumlah_baris, seed)
+    hasil = {}
+    for nama, bersihkan in [("sebelum", _bersihkan_data_lama), ("sesudah", _bersihkan_data)]:
+        df = bersihkan(mentah.copy())
+        per_kolom = df.memory_usage(deep=True, index=False)
+        hasil[nama] = {
+            'byte_per_baris': round(per_kolom.sum() / len(df), 1),
+            'per_kolom': {kolom: round(nilai / len(df), 1) for kolom, nilai in per_kolom.items()},
+        }
+    return hasil
+
+def _cetak_laporan_memori(hasil, jumlah_baris):
+    print(f"Memori ledger untuk {jumlah_baris:,} baris (byte per baris)")
+    kolom = list(dict.fromkeys(list(hasil['sebelum']['per_kolom']) + list(hasil['sesudah']['per_kolom'])))
+    print(f"{'kolom':<16}{'sebelum':>10}{'sesudah':>10}")
+    for k in kolom:
+        print(f"{k:<16}{hasil['sebelum']['per_kolom'].get(k, 0):>10}{hasil['sesudah']['per_kolom'].get(k, 0):>10}")
+    print(f"{'TOTAL':<16}{hasil['sebelum']['byte_per_baris']:>10}{hasil['sesudah']['byte_per_baris']:>10}")
+
+# ===================================================================================
+# --- TABEL TRANSAKSI BERHALAMAN ---
+# ===================================================================================
+def _ledger_bersih(jumlah_baris, seed=0):
+    df = _bersihkan_data(buat_ledger_sintetis(jumlah_baris, seed))
+    return df.sort_values(['tanggal', 'id'], ascending=False).reset_index(drop=True)
+
+def _ukuran_payload(df):
+    """Ukuran byte tabel saat diserialisasi ke Arrow IPC (format yang dikirim st.dataframe ke browser)."""
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+def _waktu(fungsi, ulang=5):
+    """Median waktu (detik) dari beberapa kali pemanggilan."""
+    hasil = []
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        fungsi()
+        hasil.append(time.perf_counter() - mulai)
+    return float(np.median(hasil))
+
+def bench_tabel(jumlah_baris, ukuran_halaman=50):
+    """Waktu dan payload satu halaman tabel: cara lama (urut + format semua baris) vs jendela berhalaman."""
+    df = _ledger_bersih(jumlah_baris)
+
+    def lama():
+        tampil = df.sort_values(by='id', ascending=False).reset_index(drop=True)
+        tampil.insert(0, 'No.', range(1, len(tampil) + 1))
+        tampil[COL_NOMINAL] = tampil[COL_NOMINAL].apply(lambda x: f"{x:,.0f}".replace(',', '.'))
+        return tampil
+
+    halaman_tengah = max(len(df) // ukuran_halaman // 2, 1)
+    return {
+        'baris': jumlah_baris,
+        'lama_detik': _waktu(lama, ulang=3),
+        'lama_payload_byte': _ukuran_payload(lama()),
+        'halaman_1_detik': _waktu(lambda: app._ambil_jendela_tabel(df, 1, ukuran_halaman, 'id')),
+        'halaman_tengah_detik': _waktu(lambda: app._ambil_jendela_tabel(df, halaman_tengah, ukuran_halaman, 'id')),
+        'halaman_payload_byte': _ukuran_payload(app._ambil_jendela_tabel(df, 1, ukuran_halaman, 'id')),
+    }
+
+# Urutan ketikan di kotak "Cari Transaksi": setiap prefiks adalah satu kali rerun fragmen.
+KETIKAN_PENCARIAN = ["m", "ma", "mak", "maka", "makan", "makan s", "makan si", "5", "50", "500", "5000", "50000",
+                     "2024-0", "2024-03", "gopay", "top up bca"]
+
+def bench_pencarian(jumlah_baris, deskripsi="biasa"):
+    """
+    Bangun SearchIndex dan latensi per ketikan vs memindai teks semua baris (str.contains).
+    `deskripsi`: "biasa" (deskripsi sintetis berulang), "kombinasi" (dua kata acak dari 20.000 kata, hampir
+    unik per baris), atau "unik" (setiap deskripsi memuat kata unik, kasus terburuk kosakata).
+    """
+    df = _ledger_bersih(jumlah_baris)
+    rng = np.random.default_rng(0)
+    if deskripsi == "kombinasi":
+        kamus = np.array([f"kata{i}" for i in range(20_000)])
+        df['deskripsi'] = df['deskripsi'] + " " + kamus[rng.integers(0, len(kamus), len(df))] + " " + kamus[rng.integers(0, len(kamus), len(df))]
+    elif deskripsi == "unik":
+        df['deskripsi'] = df['deskripsi'] + " #" + df['id'].astype(str)
+    teks = (df['id'].astype(str) + " " + df['tanggal'].dt.strftime('%Y-%m-%d %d/%m/%Y') + " " + df['kategori'].astype(str)
+            + " " + df[COL_NOMINAL].astype(str) + " " + df['deskripsi'].fillna("")).str.lower()
+    mulai = time.perf_counter()
+    indeks = SearchIndex(1, df)
+    hasil = {'baris': jumlah_baris, 'deskripsi': deskripsi, 'deskripsi_unik': int(df['deskripsi'].nunique()),
+             'bangun_detik': round(time.perf_counter() - mulai, 3)}
+    basis = np.flatnonzero((df['akun'] == PILIHAN_AKUN[0]).to_numpy())
+    for nama, cari in [('pindai', lambda k: teks[teks.str.contains(k, regex=False)]),
+                       ('indeks', lambda k: indeks.cari(k)), ('indeks_basis', lambda k: indeks.cari(k, basis=basis))]:
+        latensi = np.array([_waktu(lambda: cari(k), ulang=3) for k in KETIKAN_PENCARIAN]) * 1000
+        hasil[f"{nama}_median_ms"], hasil[f"{nama}_maks_ms"] = round(float(np.median(latensi)), 1), round(float(latensi.max()), 1)
+    return hasil
+
+# ===================================================================================
+# --- LAPISAN KUERI ANALITIK (PANDAS VS DUCKDB) ---
+# ===================================================================================
+def _kueri_contoh(df):
+    """Kueri yang mewakili halaman aplikasi: nama -> argumen KueriLedger.agregasi()."""
+    akhir = df['tanggal'].max().date()
+    return {
+        'dashboard_pie': dict(tgl_awal=akhir - pd.Timedelta(days=365), tgl_akhir=akhir,
+                              saring={'jenis': [JENIS_PENGELUARAN]}, kelompok=['kategori'], ukuran=['total']),
+        'saldo_per_akun': dict(tgl_akhir=akhir, saring={'jenis': [JENIS_PEMASUKAN, JENIS_PENGELUARAN]},
+                               kelompok=['akun'], ukuran=['mutasi']),
+        'filter_detail': dict(saring={'tahun': [akhir.year], 'akun': PILIHAN_AKUN[:2]},
+                              kelompok=['bulan'], ukuran=['total', 'jumlah', 'rata_rata']),
+        'rollup_cube': dict(kelompok=RollupCube.DIMENSI, ukuran=['total', 'jumlah']),
+    }
+
+def bench_kueri(jumlah_baris):
+    """Waktu median per kueri untuk mesin pandas dan DuckDB; hasil kedua mesin wajib identik."""
+    df = _ledger_bersih(jumlah_baris)
+    mesin = {"pandas": KueriLedger(df, "pandas")}
+    if _duckdb() is not None:
+        mesin["duckdb"] = KueriLedger(df, "duckdb")
+        mesin["duckdb"].agregasi()  # registrasi DataFrame tidak ikut diukur
+    hasil = {'baris': jumlah_baris}
+    for nama, argumen in _kueri_contoh(df).items():
+        acuan = mesin["pandas"].agregasi(**argumen)
+        for nama_mesin, kueri in mesin.items():
+            pd.testing.assert_frame_equal(kueri.agregasi(**argumen), acuan)
+            hasil[f"{nama}_{nama_mesin}_detik"] = round(_waktu(lambda: kueri.agregasi(**argumen), ulang=3), 4)
+    return hasil
+
+# ===================================================================================
+# --- EKSPOR TRANSAKSI ---
+# ===================================================================================
+def _ukur_ekspor(buat_potongan):
+    """
+    Menjalankan generator ekspor sampai habis: detik, total byte, potongan terbesar, sha256, dan puncak
+    alokasi Python (diukur pada putaran kedua karena tracemalloc memperlambat eksekusi).
+    """
+    sidik, total, terbesar = hashlib.sha256(), 0, 0
+    mulai = time.perf_counter()
+    for potongan in buat_potongan():
+        sidik.update(potongan)
+        total += len(potongan)
+        terbesar = max(terbesar, len(potongan))
+    detik = time.perf_counter() - mulai
+    tracemalloc.start()
+    for _ in buat_potongan():
+        pass
+    puncak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'detik': round(detik, 3), 'byte': total, 'potongan_terbesar_byte': terbesar,
+            'puncak_alokasi_python_byte': puncak, 'sha256': sidik.hexdigest()[:16]}
+
+def bench_ekspor(jumlah_baris):
+    """Ekspor satu string CSV raksasa (cara naif) vs generator CSV/Parquet; output generator wajib stabil."""
+    df = _ledger_bersih(jumlah_baris)
+    hasil = {
+        'baris': jumlah_baris,
+        'csv_satu_string': _ukur_ekspor(lambda: [df.sort_values('id')[KOLOM_EKSPOR].to_csv(index=False).encode()]),
+        'csv_generator': _ukur_ekspor(lambda: ekspor_csv(df)),
+        'parquet_generator': _ukur_ekspor(lambda: ekspor_parquet(df)),
+    }
+    acak = df.sample(frac=1, random_state=0)
+    for nama, fungsi in [('csv_generator', ekspor_csv), ('parquet_generator', ekspor_parquet)]:
+        hasil[nama]['stabil'] = _ukur_ekspor(lambda: fungsi(acak))['sha256'] == hasil[nama]['sha256']
+    return hasil
+
+# ===================================================================================
+# --- CHANGE FEED (SUMBER EVENT PALSU) ---
+# ===================================================================================
+class SumberPerubahanPalsu:
+    """
+    Sumber event lokal untuk UmpanPerubahan (pengganti Supabase Realtime): event dikirim manual
+    lewat kirim(), dan koneksi bisa diputus/disambung lagi untuk menguji fallback ke polling.
+    """
+
+    def __init__(self):
+        self._antrean = queue.Queue()
+        self._putus = threading.Event()
+        self.jumlah_koneksi = 0
+
+    def kirim(self, jenis, baris):
+        self._antrean.put((jenis, baris))
+
+    def putuskan(self):
+        self._putus.set()
+
+    def sambungkan(self):
+        self._putus.clear()
+
+    def dengarkan(self, saat_event, saat_terhubung, berhenti):
+        if self._putus.is_set():
+            raise ConnectionError("sumber palsu terputus")
+        self.jumlah_koneksi += 1
+        saat_terhubung()
+        while not berhenti.is_set():
+            if self._putus.is_set():
+                raise ConnectionError("sumber palsu terputus")
+            try:
+                saat_event(*self._antrean.get(timeout=0.01))
+            except queue.Empty:
+                pass
+
+def _tunggu(kondisi, batas_detik=10):
+    mulai = time.perf_counter()
+    while not kondisi():
+        if time.perf_counter() - mulai > batas_detik:
+            raise TimeoutError("kondisi tidak terpenuhi")
+        time.sleep(0.001)
+    return time.perf_counter() - mulai
+
+def _request_saat_idle(klien, ledger, detik, jeda=0.1):
+    """Jumlah request ke database selama `detik` ketika sesi terus memanggil get() tanpa ada perubahan data."""
+    awal = klien.jumlah_request
+    selesai = time.perf_counter() + detik
+    while time.perf_counter() < selesai:
+        ledger.get()
+        time.sleep(jeda)
+    return klien.jumlah_request - awal
+
+def bench_umpan(jumlah_baris, interval_polling=1.0, detik_idle=3.0, jumlah_event=20):
+    """
+    Polling berkala vs change feed: request ke database saat idle, latensi event -> ledger (kesegaran),
+    fallback ke polling saat feed putus, dan konsistensi akhir ledger terhadap tabel.
+    """
+    klien = FakeSupabase(buat_ledger_sintetis(jumlah_baris).to_dict('records'))
+    ledger = pasang_fake_supabase(klien, interval=interval_polling)
+    ledger.get()
+    hasil = {'baris': jumlah_baris, 'interval_polling_detik': interval_polling, 'detik_idle': detik_idle}
+    hasil['request_idle_polling'] = _request_saat_idle(klien, ledger, detik_idle)
+
+    sumber = SumberPerubahanPalsu()
+    umpan = UmpanPerubahan(ledger, sumber, jeda_ulang=0.2).mulai()
+    _tunggu(lambda: umpan.terhubung)
+    ledger.get()  # sinkronisasi penutup celah saat feed tersambung
+    hasil['request_idle_umpan'] = _request_saat_idle(klien, ledger, detik_idle)
+
+    # Perangkat lain menulis langsung ke database; feed mengirim event yang sama ke ledger.
+    latensi = []
+    tabel = lambda: klien.table(TABEL_CASHFLOW)
+    for i, baris in enumerate(buat_ledger_sintetis(jumlah_event, seed=1).drop(columns='id').to_dict('records')):
+        versi = ledger.snapshot()[0]
+        if i % 4 == 3:
+            jenis, data = "DELETE", [{'id': r['id']} for r in tabel().delete().eq('id', int(ledger.snapshot()[1]['id'].iloc[-1])).execute().data]
+        elif i % 4 == 2:
+            jenis, data = "UPDATE", tabel().update({'deskripsi': f"Diubah {i}"}).eq('id', int(ledger.snapshot()[1]['id'].iloc[0])).execute().data
+        else:
+            jenis, data = "INSERT", tabel().insert([baris]).execute().data
+        mulai = time.perf_counter()
+        sumber.kirim(jenis, data[0])
+        _tunggu(lambda: ledger.snapshot()[0] != versi)
+        latensi.append(time.perf_counter() - mulai)
+    hasil['latensi_event_median_detik'] = round(float(np.median(latensi)), 4)
+    hasil['latensi_event_maks_detik'] = round(max(latensi), 4)
+
+    sumber.putuskan()
+    _tunggu(lambda: not umpan.terhubung)
+    hasil['request_idle_setelah_putus'] = _request_saat_idle(klien, ledger, detik_idle)
+    sumber.sambungkan()
+    _tunggu(lambda: umpan.terhubung)
+    hasil['koneksi_ulang'] = sumber.jumlah_koneksi
+    umpan.berhenti()
+
+    df = ledger.get()[1]
+    tabel_server = _bersihkan_data(klien._tabel[TABEL_CASHFLOW].copy())
+    kolom = ['id', 'tanggal', 'jenis', 'kategori', 'akun', COL_NOMINAL, 'deskripsi']
+    urut = lambda d: d.sort_values('id')[kolom].reset_index(drop=True).astype(object)
+    hasil['konsisten'] = urut(df).equals(urut(tabel_server))
+    return hasil
+
+# ===================================================================================
+# --- ANTREAN TULIS (WRITE-BEHIND) ---
+# ===================================================================================
+def bench_tulis(jumlah_submit=200, latensi=0.05, peluang_gagal=0.2, seed=0):
+    """
+    Submit sinkron vs antrean tulis pada jaringan lambat dan tidak stabil: lama UI terblokir per submit,
+    input yang gagal di layar, waktu sampai antrean kosong, serta jumlah baris dan duplikat di database.
+    """
+    transaksi = buat_ledger_sintetis(jumlah_submit, seed=seed + 1).drop(columns='id').to_dict('records')
+    awal = buat_ledger_sintetis(1000, seed=seed).to_dict('records')
+    hasil = {'submit': jumlah_submit, 'latensi_detik': latensi, 'peluang_gagal': peluang_gagal}
+
+    # 1. Sinkron (jalur lama _handle_submission): UI menunggu round trip, kegagalan langsung terlihat pengguna.
+    klien = FakeSupabase(awal, latensi=latensi, peluang_gagal=peluang_gagal, seed=seed)
+    ledger = pasang_fake_supabase(klien)
+    ledger.get()
+    blokir, gagal = [], 0
+    for baris in transaksi:
+        mulai = time.perf_counter()
+        try:
+            ledger.terapkan_perubahan(baris=app._simpan_transaksi([baris]))
+        except Exception:
+            gagal += 1
+        blokir.append(time.perf_counter() - mulai)
+    hasil['sinkron_blokir_median_ms'] = round(float(np.median(blokir)) * 1000, 2)
+    hasil['sinkron_gagal_di_layar'] = gagal
+    hasil['sinkron_baris_baru_di_db'] = len(klien._tabel[TABEL_CASHFLOW]) - len(awal)
+
+    # 2. Write-behind: UI hanya menulis ke jurnal SQLite; worker mengirim dengan retry dan kunci idempoten.
+    klien = FakeSupabase(awal, latensi=latensi, peluang_gagal=peluang_gagal, seed=seed)
+    ledger = pasang_fake_supabase(klien)
+    ledger.get()
+    with tempfile.TemporaryDirectory() as folder:
+        jurnal = JurnalTulis(os.path.join(folder, "jurnal_tulis.sqlite3"))
+        penulis = PenulisLatar(jurnal, klien, ledger, maks_percobaan=100, jeda_awal=0.01, jeda_maks=0.2).mulai()
+        blokir = []
+        mulai_total = time.perf_counter()
+        for baris in transaksi:
+            mulai = time.perf_counter()
+            penulis.antre("insert", [baris])
+            blokir.append(time.perf_counter() - mulai)
+        _tunggu(lambda: not any(jurnal.ringkasan().values()), batas_detik=600)
+        hasil['antrean_sampai_kosong_detik'] = round(time.perf_counter() - mulai_total, 3)
+        penulis.berhenti()
+    tabel = klien._tabel[TABEL_CASHFLOW]
+    hasil['antrean_blokir_median_ms'] = round(float(np.median(blokir)) * 1000, 2)
+    hasil['antrean_baris_baru_di_db'] = len(tabel) - len(awal)
+    hasil['antrean_duplikat_di_db'] = int(tabel[COL_KUNCI_IDEMPOTEN].dropna().duplicated().sum())
+    hasil['antrean_request'] = klien.jumlah_request
+    hasil['antrean_ledger_sama_dengan_db'] = len(ledger.get()[1]) == len(tabel)
+    return hasil
+
+# ===================================================================================
+# --- PARTISI LEDGER PER PENGGUNA ---
+# ===================================================================================
+def bench_partisi(jumlah_pengguna=10, baris_per_pengguna=50_000, jumlah_request=200, batas_mb=None, seed=0):
+    """
+    Banyak rumah tangga pada satu proses: memori menetap per partisi dan total terhadap batas (LRU),
+    hit rate partisi untuk pola akses condong (sebagian pengguna jauh lebih aktif), serta isolasi tulis
+    (insert/hapus satu pengguna tidak mengubah versi maupun cache turunan pengguna lain).
+    Tanpa `batas_mb`, batas diatur ke ~40% total semua partisi agar LRU benar-benar bekerja.
+    """
+    pengguna = [f"rumah-{i}" for i in range(jumlah_pengguna)]
+    mentah = buat_ledger_sintetis(jumlah_pengguna * baris_per_pengguna, seed)
+    mentah[COL_PEMILIK] = np.array(pengguna)[np.arange(len(mentah)) % jumlah_pengguna]
+    klien = FakeSupabase(mentah.to_dict('records'))
+    hasil = {'pengguna': jumlah_pengguna, 'baris_per_pengguna': baris_per_pengguna}
+
+    def layani(manajer, pemilik):
+        """Satu request halaman: get(), indeks filter per versi, lalu penegakan batas memori."""
+        ledger = manajer.ledger(pemilik)
+        versi, df = ledger.get()
+        ledger.per_versi("filter", versi, df, FilterIndex)
+        return manajer.tegakkan_batas(pemilik)
+
+    # 1. Ukuran satu partisi vs satu salinan tabel penuh (yang dulu disimpan tanpa kunci pengguna).
+    manajer = ManajerLedger(lambda p: _buat_ledger_fake(klien, pemilik=p), batas_byte=float("inf"), kolom_pemilik=COL_PEMILIK)
+    for p in pengguna:
+        layani(manajer, p)
+    per_partisi = {s['pemilik']: s['byte'] for s in manajer.statistik()}
+    tabel_penuh = _buat_ledger_fake(klien)
+    versi, df = tabel_penuh.get()
+    tabel_penuh.per_versi("filter", versi, df, FilterIndex)
+    hasil['mb_salinan_tabel_penuh'] = round(tabel_penuh.ukuran_byte() / 2**20, 1)
+    hasil['mb_per_partisi_median'] = round(float(np.median(list(per_partisi.values()))) / 2**20, 1)
+    hasil['mb_semua_partisi_tanpa_batas'] = round(sum(per_partisi.values()) / 2**20, 1)
+
+    # 2. Pola akses condong (Zipf) dengan batas memori: partisi LRU dikeluarkan, pengguna aktif tetap hangat.
+    #    Seperti di aplikasi, setiap partisi punya mirror disk sehingga partisi yang dimuat ulang cukup ambil delta.
+    batas = batas_mb * 2**20 if batas_mb else int(sum(per_partisi.values()) * 0.4)
+    rng = np.random.default_rng(seed)
+    bobot = 1 / np.arange(1, jumlah_pengguna + 1)
+    urutan = rng.choice(jumlah_pengguna, jumlah_request, p=bobot / bobot.sum())
+    total_maks, miss, waktu, waktu_miss = 0, 0, [], []
+    with tempfile.TemporaryDirectory() as folder:
+        buat = lambda p: _buat_ledger_fake(klien, pemilik=p, mirror=LedgerMirror(os.path.join(folder, f"{p}.arrow")))
+        manajer = ManajerLedger(buat, batas_byte=batas, kolom_pemilik=COL_PEMILIK)
+        pernah = set()
+        for i in urutan:
+            meleset = manajer.intip(pengguna[i]) is None
+            mulai = time.perf_counter()
+            total_maks = max(total_maks, layani(manajer, pengguna[i]))
+            waktu.append(time.perf_counter() - mulai)
+            miss += meleset
+            if meleset and i in pernah:  # dimuat ulang setelah dikeluarkan
+                waktu_miss.append(waktu[-1])
+            pernah.add(i)
+    hasil['batas_mb'] = round(batas / 2**20, 1)
+    hasil['mb_menetap_maks'] = round(total_maks / 2**20, 1)
+    hasil['partisi_menetap_akhir'] = len(manajer.statistik())
+    hasil['partisi_dikeluarkan'] = manajer.jumlah_dikeluarkan
+    hasil['hit_rate_partisi'] = round(1 - miss / jumlah_request, 3)
+    hasil['request_median_ms'] = round(float(np.median(waktu)) * 1000, 2)
+    hasil['request_p95_ms'] = round(float(np.percentile(waktu, 95)) * 1000, 2)
+    hasil['muat_ulang_dari_mirror_median_ms'] = round(float(np.median(waktu_miss)) * 1000, 2) if waktu_miss else None
+
+    # 3. Isolasi tulis: insert lalu hapus milik satu pengguna lewat write-through manajer (jalur change feed
+    #    dan antrean tulis); versi dan cache turunan pengguna lain harus tetap sama.
+    aktif = [p for p in pengguna if manajer.intip(p) is not None]
+    penulis, lain = aktif[0], aktif[1:]
+    versi_lain = {p: manajer.intip(p).snapshot()[0] for p in lain}
+    baris = buat_ledger_sintetis(1, seed + 1).drop(columns='id').assign(**{COL_PEMILIK: penulis}).to_dict('records')
+    tersimpan = klien.table(TABEL_CASHFLOW).insert(baris).execute().data
+    manajer.terapkan_perubahan(baris=tersimpan)
+    manajer.terapkan_perubahan(ids_dihapus=[tersimpan[0]['id']])
+    hasil['tulis_versi_penulis_berubah'] = manajer.intip(penulis).snapshot()[0] != versi_lain.get(penulis)
+    hasil['tulis_versi_pengguna_lain_berubah'] = sum(manajer.intip(p).snapshot()[0] != v for p, v in versi_lain.items())
+    return hasil
+
+# ===================================================================================
+# --- CACHE BERSAMA ANTAR PROSES ---
+# ===================================================================================
+def bench_bersama(jumlah_baris=100_000, jumlah_worker=4, tulis_per_worker=25, seed=0):
+    """
+    Beberapa worker (masing-masing satu LedgerSync, seperti satu proses Streamlit) berbagi satu mirror:
+    request database dan waktu attach worker dingin, overhead pemeriksaan mirror per request, waktu sampai
+    tulisan satu worker terlihat di worker lain, tulis paralel dari semua worker (tidak ada yang hilang),
+    dan event change feed yang sama di semua worker (mirror hanya ditulis sekali).
+    """
+    klien = FakeSupabase(buat_ledger_sintetis(jumlah_baris, seed).to_dict('records'))
+    baru = buat_ledger_sintetis(jumlah_worker * tulis_per_worker + 1, seed + 1).drop(columns='id').to_dict('records')
+    hasil = {'baris': jumlah_baris, 'worker': jumlah_worker}
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "cashflow_ledger.arrow")
+        buat = lambda: _buat_ledger_fake(klien, interval=60, mirror=LedgerMirror(path))
+
+        # 1. Worker pertama memuat dari database; worker berikutnya attach ke mirror bersama.
+        worker = [buat()]
+        mulai = time.perf_counter()
+        worker[0].get()
+        hasil['worker_pertama_detik'] = round(time.perf_counter() - mulai, 3)
+        hasil['worker_pertama_request'] = klien.jumlah_request
+        awal, mulai = klien.jumlah_request, time.perf_counter()
+        for _ in range(jumlah_worker - 1):
+            worker.append(buat())
+            worker[-1].get()
+        hasil['attach_dingin_detik'] = round((time.perf_counter() - mulai) / (jumlah_worker - 1), 3)
+        hasil['attach_dingin_request'] = klien.jumlah_request - awal
+
+        # 2. Request tanpa perubahan: hanya satu stat ke file mirror.
+        tanpa_mirror = _buat_ledger_fake(klien, interval=60)
+        tanpa_mirror.get()
+        hasil['get_hit_tanpa_mirror_us'] = round(_waktu(tanpa_mirror.get) * 1e6, 1)
+        hasil['get_hit_dengan_mirror_us'] = round(_waktu(worker[0].get) * 1e6, 1)
+
+        # 3. Submit di worker terakhir, lalu request berikutnya di worker pertama.
+        tersimpan = klien.table(TABEL_CASHFLOW).insert([baru.pop()]).execute().data
+        worker[-1].terapkan_perubahan(baris=tersimpan)
+        awal, mulai = klien.jumlah_request, time.perf_counter()
+        _, df = worker[0].get()
+        hasil['propagasi_tulis_ms'] = round((time.perf_counter() - mulai) * 1000, 2)
+        hasil['propagasi_tulis_request'] = klien.jumlah_request - awal
+        hasil['propagasi_tulis_terlihat'] = tersimpan[0]['id'] in set(df['id'])
+
+        # 4. Semua worker menulis bersamaan (thread), lalu setiap worker melayani satu request.
+        def tulis(ledger, potongan):
+            for baris in potongan:
+                ledger.terapkan_perubahan(baris=klien.table(TABEL_CASHFLOW).insert([baris]).execute().data)
+        thread = [
+            threading.Thread(target=tulis, args=(ledger, baru[i * tulis_per_worker:(i + 1) * tulis_per_worker]))
+            for i, ledger in enumerate(worker)
+        ]
+        mulai = time.perf_counter()
+        for t in thread:
+            t.start()
+        for t in thread:
+            t.join()
+        hasil['tulis_paralel_per_tulis_ms'] = round((time.perf_counter() - mulai) / len(baru) * 1000, 2)
+        id_db = set(klien._tabel[TABEL_CASHFLOW]['id'])
+        hasil['tulis_paralel_semua_worker_konsisten'] = all(set(ledger.get()[1]['id']) == id_db for ledger in worker)
+
+        # 5. Event change feed yang sama diterapkan semua worker: mirror cukup ditulis sekali.
+        generasi = max(ledger._generasi for ledger in worker)
+        diubah = klien.table(TABEL_CASHFLOW).update({'deskripsi': "Diubah feed"}).eq('id', 1).execute().data
+        for ledger in worker:
+            ledger.terapkan_perubahan(baris=diubah)
+        hasil['event_feed_generasi_ditulis'] = max(ledger._generasi for ledger in worker) - generasi
+    return hasil
+
+# ===================================================================================
+# --- WAKTU STARTUP PER HALAMAN ---
+# ===================================================================================
+MODUL_BERAT = ("numpy", "pandas", "pyarrow", "plotly.express", "supabase", "duckdb")
+
+# Dijalankan di proses Python baru (dengan -X importtime) agar setiap halaman diukur dari cold start.
+# Klien Supabase asli dibuat ke alamat yang tidak bisa dihubungi; mirror yang baru disinkronkan
+# membuat halaman data tidak perlu query, jadi query apa pun akan muncul sebagai exception.
+_SKRIP_STARTUP = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+path_app, halaman, mirror_path, modul_berat = sys.argv[1], sys.argv[2], sys.argv[3], sys.argv[4].split(",")
+at = AppTest.from_file(path_app, default_timeout=300)
+at.secrets["supabase"] = {"url": "http://127.0.0.1:9", "key": "bukan.kunci.asli"}
+at.secrets["pengaturan"] = {"mirror_path": mirror_path}
+at.session_state["menu"] = halaman
+print("--- render ---", file=sys.stderr, flush=True)
+mulai = time.perf_counter()
+at.run()
+detik = time.perf_counter() - mulai
+print("--- selesai ---", file=sys.stderr, flush=True)
+print(json.dumps({
+    "render_pertama_detik": round(detik, 3),
+    "modul_berat": [m for m in modul_berat if m in sys.modules],
+    "exception": [e.value for e in at.exception],
+}))
+"""
+
+def _detik_impor(stderr):
+    """Jumlah waktu impor (kumulatif, level teratas) dari keluaran -X importtime di antara penanda render."""
+    total, aktif = 0, False
+    for baris in stderr.splitlines():
+        if baris.startswith("--- "):
+            aktif = baris == "--- render ---"
+        elif aktif and baris.startswith("import time:"):
+            _, kumulatif, nama = baris.split("|")
+            if kumulatif.strip().isdigit() and len(nama) - len(nama.lstrip()) == 1:
+                total += int(kumulatif)
+    return total / 1e6
+
+def _startup_halaman(path_app, halaman, mirror_path, folder):
+    proses = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _SKRIP_STARTUP, path_app, halaman, mirror_path, ",".join(MODUL_BERAT)],
+        capture_output=True, text=True, cwd=folder,
+    )
+    if proses.returncode != 0:
+        raise RuntimeError(f"Startup halaman {halaman} gagal:\n{proses.stderr[-2000:]}")
+    ukuran = json.loads(proses.stdout.strip().splitlines()[-1])
+    ukuran['impor_detik'] = round(_detik_impor(proses.stderr), 3)
+    return ukuran
+
+def bench_startup(jumlah_baris=100_000, path_app=None, ulang=3, seed=0):
+    """
+    Waktu impor dan waktu render pertama (median dari `ulang` cold start) setiap halaman di router.
+    Ledger sintetis disimpan dulu sebagai mirror yang baru disinkronkan, seperti worker yang attach ke cache
+    bersama; tanggalnya digeser agar berakhir hari ini sehingga Dashboard menggambar grafik bulan berjalan.
+    """
+    path_app = path_app or app.__file__
+    df = buat_ledger_sintetis(jumlah_baris, seed)
+    tanggal = pd.to_datetime(df['tanggal'])
+    df['tanggal'] = (tanggal + (pd.Timestamp.today().normalize() - tanggal.max())).dt.strftime('%Y-%m-%d')
+    hasil = {'baris': jumlah_baris}
+    with tempfile.TemporaryDirectory() as folder:
+        mirror_path = os.path.join(folder, "cashflow_ledger.arrow")
+        klien = FakeSupabase(df.to_dict('records'))
+        _buat_ledger_fake(klien, interval=INTERVAL_SINKRONISASI, mirror=LedgerMirror(mirror_path)).get()
+        for halaman in (app.PAGE_DASHBOARD, app.PAGE_LIHAT_SALDO, app.PAGE_CATAT_TRANSAKSI,
+                        app.PAGE_DAFTAR_TRANSAKSI, app.PAGE_IMPOR_TRANSAKSI):
+            ukuran = [_startup_halaman(path_app, halaman, mirror_path, folder) for _ in range(ulang)]
+            hasil[halaman] = {
+                'impor_detik': float(np.median([u['impor_detik'] for u in ukuran])),
+                'render_pertama_detik': float(np.median([u['render_pertama_detik'] for u in ukuran])),
+                'modul_berat': ukuran[-1]['modul_berat'],
+                'exception': ukuran[-1]['exception'],
+            }
+    return hasil
+
+# ===================================================================================
+# --- PARTISI TAHUNAN & ARSIP ---
+# ===================================================================================
+def _ukuran_folder(folder):
+    return sum(os.path.getsize(os.path.join(folder, nama)) for nama in os.listdir(folder) if nama.endswith(".parquet"))
+
+def bench_tahunan(jumlah_baris=1_000_000, seed=0):
+    """
+    Ledger dengan arsip tahun tertutup dibandingkan ledger penuh tanpa arsip (tanggal sintetis digeser agar
+    berakhir hari ini, jadi hanya tahun berjalan yang panas): baris dan waktu cold start dari database,
+    memori, query dashboard bulan berjalan dan satu tahun lama (partisi yang dimuat), saldo per tanggal,
+    ukuran arsip di disk, dan edit transaksi di tahun tertutup. Hasil arsip dicek sama dengan ledger penuh.
+    """
+    df = buat_ledger_sintetis(jumlah_baris, seed)
+    tanggal = pd.to_datetime(df['tanggal'])
+    df['tanggal'] = (tanggal + (pd.Timestamp.today().normalize() - tanggal.max())).dt.strftime('%Y-%m-%d')
+    klien = FakeSupabase(df.to_dict('records'))
+    hasil = {'baris': jumlah_baris}
+    with tempfile.TemporaryDirectory() as folder:
+        buat_arsip = lambda: ArsipTahunan(os.path.join(folder, "cashflow_ledger.arsip"))
+
+        # 1. Cold start: ledger penuh vs partisi panas (arsip dibuat sekali oleh worker pertama).
+        penuh = _buat_ledger_fake(klien)
+        mulai = time.perf_counter()
+        penuh.get()
+        hasil['cold_start_penuh_detik'] = round(time.perf_counter() - mulai, 3)
+        mulai = time.perf_counter()
+        _buat_ledger_fake(klien, arsip=buat_arsip()).get()
+        hasil['arsip_pertama_dibuat_detik'] = round(time.perf_counter() - mulai, 3)
+        ledger = _buat_ledger_fake(klien, arsip=buat_arsip())
+        awal, mulai = klien.jumlah_request, time.perf_counter()
+        ledger.get()
+        hasil['cold_start_panas_detik'] = round(time.perf_counter() - mulai, 3)
+        hasil['cold_start_panas_request'] = klien.jumlah_request - awal
+        hasil['baris_panas'] = len(ledger.snapshot()[1])
+        hasil['tahun_diarsipkan'] = ledger.tahun_arsip()
+
+        # 2. Memori: data + indeks turunan.
+        hasil['mb_penuh'] = round(penuh.ukuran_byte() / 2**20, 1)
+        hasil['mb_panas'] = round(ledger.ukuran_byte() / 2**20, 1)
+        hasil['arsip_mb_disk'] = round(_ukuran_folder(ledger._arsip.folder) / 2**20, 1)
+        hasil['arsip_mb_memori_jika_dimuat'] = round(
+            sum(_ukuran_byte(ledger._arsip.muat(t), set()) for t in ledger.tahun_arsip()) / 2**20, 1
+        )
+
+        # 3. Dashboard bulan berjalan: tidak ada partisi tahun yang dimuat.
+        hari_ini = pd.Timestamp.today().date()
+        awal_bulan = hari_ini.replace(day=1)
+        hasil['dashboard_bulan_ini_us'] = round(_waktu(lambda: ledger.lihat(awal_bulan, hari_ini)) * 1e6, 1)
+        hasil['dashboard_bulan_ini_partisi_dimuat'] = len(ledger._tahun)
+
+        # 4. Satu tahun lama: hanya partisi tahun itu yang dimuat (pertama kali dari snapshot, lalu dari memori).
+        tahun = ledger.tahun_arsip()[1]
+        rentang = (datetime(tahun, 1, 1).date(), datetime(tahun, 12, 31).date())
+        mulai = time.perf_counter()
+        versi, df_tahun = ledger.lihat(*rentang)
+        hasil['tahun_lama_pertama_ms'] = round((time.perf_counter() - mulai) * 1000, 1)
+        hasil['tahun_lama_berikutnya_us'] = round(_waktu(lambda: ledger.lihat(*rentang)) * 1e6, 1)
+        hasil['tahun_lama_partisi_dimuat'] = list(ledger._tahun)
+        total = lambda cube: cube.total_per_kategori(*rentang, JENIS_PENGELUARAN).sort_index()
+        hasil['tahun_lama_sama'] = bool(total(ledger.rollup(versi)).equals(total(penuh.turunan("rollup"))))
+
+        # 5. Saldo per tanggal: saldo penutup + indeks panas vs indeks saldo seluruh riwayat.
+        saldo_penuh = penuh.turunan("saldo")
+        tanggal_uji = [hari_ini, datetime(tahun, 6, 30).date()]
+        hasil['saldo_hari_ini_us'] = round(_waktu(lambda: ledger.saldo_per(hari_ini)) * 1e6, 1)
+        hasil['saldo_hari_ini_penuh_us'] = round(_waktu(lambda: saldo_penuh.saldo_per(hari_ini)) * 1e6, 1)
+        hasil['saldo_sama'] = all(
+            {a: int(n) for a, n in ledger.saldo_per(t).items() if n} == {a: int(n) for a, n in saldo_penuh.saldo_per(t).items() if n}
+            for t in tanggal_uji
+        )
+
+        # 6. Edit transaksi di tahun tertutup: hanya snapshot tahun itu yang ditulis ulang.
+        generasi = {t: e['generasi'] for t, e in ledger._arsip.manifest()['tahun'].items()}
+        id_lama = int(df_tahun['id'].iloc[0])
+        diubah = klien.table(TABEL_CASHFLOW).update({'deskripsi': "Koreksi"}).eq('id', id_lama).execute().data
+        versi_panas, mulai = ledger.snapshot()[0], time.perf_counter()
+        ledger.terapkan_perubahan(baris=diubah)
+        hasil['edit_tahun_tertutup_ms'] = round((time.perf_counter() - mulai) * 1000, 1)
+        hasil['edit_tahun_ditulis_ulang'] = [
+            t for t, e in ledger._arsip.manifest()['tahun'].items() if e['generasi'] != generasi.get(t)
+        ]
+        hasil['edit_partisi_panas_tetap'] = ledger.snapshot()[0] == versi_panas
+        _, semua = ledger.lihat()
+        hasil['edit_terlihat'] = semua.loc[semua['id'] == id_lama, 'deskripsi'].iloc[0] == "Koreksi"
+    return hasil
+
+# ===================================================================================
+# --- PEMERIKSAAN INTEGRITAS LEDGER ---
+# ===================================================================================
+def _sisipkan_kesalahan(df, jumlah, seed=0):
+    """
+    Menyisipkan kesalahan yang diketahui ke ledger sintetis mentah: kaki masuk Top Up dihapus, nominal kaki
+    masuk diubah, kedua kaki Top Up berbiaya admin dihapus (biaya admin yatim), dan transaksi reguler
+    disubmit dua kali. Hanya Top Up yang kuncinya unik yang dipilih agar setiap kesalahan punya jawaban pasti.
+    Mengembalikan (df_rusak, {masalah: set id yang wajib ditemukan}).
+    """
+    rng = np.random.default_rng(seed)
+    top_up = df['kategori'] == KATEGORI_TOP_UP
+    kunci = ['tanggal', COL_NOMINAL, 'dari', 'ke']
+    keluar = df[top_up & (df['jenis'] == JENIS_PENGELUARAN)]
+    keluar = keluar.assign(dari=keluar['akun'], ke=keluar['deskripsi'].str.removeprefix("Top Up ke "))
+    masuk = df[top_up & (df['jenis'] == JENIS_PEMASUKAN)]
+    masuk = masuk.assign(dari=masuk['deskripsi'].str.removeprefix("Top Up dari "), ke=masuk['akun'])
+    keluar = keluar[~keluar.duplicated(kunci, keep=False)]
+    masuk = masuk[~masuk.duplicated(kunci, keep=False)]
+    pasangan = keluar.reset_index().merge(masuk.reset_index(), on=kunci, suffixes=('_keluar', '_masuk'))
+
+    # Biaya admin dipilih hanya jika rute (tanggal, dari, ke) miliknya tidak dipakai Top Up lain.
+    biaya = df[df['kategori'] == KATEGORI_BIAYA_ADMIN]
+    kunci_biaya = biaya['tanggal'] + "|" + biaya['akun'] + "|" + biaya['deskripsi'].str.rsplit(" ke ", n=1).str[-1]
+    semua_top_up = pd.concat([keluar, masuk])
+    kunci_rute = semua_top_up['tanggal'] + "|" + semua_top_up['dari'] + "|" + semua_top_up['ke']
+    kunci_pasangan = pasangan['tanggal'] + "|" + pasangan['dari'] + "|" + pasangan['ke']
+    rute_tunggal = kunci_rute.value_counts().eq(2)
+    berbiaya = (
+        kunci_pasangan.isin(kunci_biaya[~kunci_biaya.duplicated(keep=False)])
+        & kunci_pasangan.map(rute_tunggal).fillna(False).astype(bool)
+    )
+
+    acak = rng.permutation(len(pasangan))
+    pilih_biaya = acak[berbiaya.to_numpy()[acak]][:jumlah]
+    sisa = acak[~np.isin(acak, pilih_biaya)]
+    pilih_yatim, pilih_selisih = sisa[:jumlah], sisa[jumlah:2 * jumlah]
+    reguler = df.index[~df['kategori'].isin([KATEGORI_TOP_UP, KATEGORI_BIAYA_ADMIN])]
+    pilih_duplikat = rng.choice(reguler, jumlah, replace=False)
+
+    df = df.copy()
+    harapan = {}
+    yatim = pasangan.iloc[pilih_yatim]
+    harapan[app.MASALAH_TOP_UP_YATIM] = set(yatim['id_keluar'])
+    selisih = pasangan.iloc[pilih_selisih]
+    df.loc[selisih['index_masuk'], COL_NOMINAL] += 5_000
+    harapan[app.MASALAH_TOP_UP_TIDAK_SEIMBANG] = set(selisih['id_keluar']) | set(selisih['id_masuk'])
+    tanpa_top_up = pasangan.iloc[pilih_biaya]
+    kunci_dihapus = tanpa_top_up['tanggal'] + "|" + tanpa_top_up['dari'] + "|" + tanpa_top_up['ke']
+    harapan[app.MASALAH_BIAYA_ADMIN_YATIM] = set(biaya.loc[kunci_biaya.isin(kunci_dihapus), 'id'])
+    duplikat = df.loc[pilih_duplikat].assign(id=np.arange(len(pilih_duplikat)) + int(df['id'].max()) + 1)
+    harapan[app.MASALAH_DUPLIKAT] = set(df.loc[pilih_duplikat, 'id']) | set(duplikat['id'])
+
+    dihapus = np.concatenate([yatim['index_masuk'], tanpa_top_up['index_keluar'], tanpa_top_up['index_masuk']])
+    df = pd.concat([df.drop(index=dihapus), duplikat], ignore_index=True)
+    return df, harapan
+
+def bench_integritas(jumlah_baris=1_000_000, jumlah_kesalahan=500, seed=0):
+    """
+    Waktu pemeriksaan integritas pada ledger bersih dan ledger dengan kesalahan yang disisipkan, plus recall
+    per jenis masalah (porsi id rusak yang ditemukan dengan label yang benar). Temuan di ledger bersih adalah
+    kebetulan alami data sintetis (mis. dua transaksi reguler identik di hari yang sama), bukan kesalahan.
+    Recall Top Up sedikit di bawah 1 karena pasangan longgar (hari + nominal) kadang menunjuk kaki lain di
+    hari yang sama; jumlah temuan tetap sama dengan jumlah kesalahan yang disisipkan.
+    """
+    mentah = buat_ledger_sintetis(jumlah_baris, seed)
+    bersih = _bersihkan_data(mentah.copy())
+    hasil = {'baris': jumlah_baris, 'kesalahan_per_jenis': jumlah_kesalahan}
+    hasil['detik_ledger_bersih'] = round(_waktu(lambda: app.periksa_integritas(bersih), ulang=3), 3)
+    temuan, statistik = app.periksa_integritas(bersih)
+    hasil['temuan_ledger_bersih'] = {m: int(n) for m, n in temuan['masalah'].value_counts().items() if n}
+    hasil['top_up_berpasangan_bersih'] = f"{statistik['top_up_berpasangan']}/{statistik['kaki_top_up'] // 2}"
+
+    rusak, harapan = _sisipkan_kesalahan(mentah, jumlah_kesalahan, seed)
+    rusak = _bersihkan_data(rusak)
+    hasil['detik_ledger_rusak'] = round(_waktu(lambda: app.periksa_integritas(rusak), ulang=3), 3)
+    temuan, _ = app.periksa_integritas(rusak)
+    hasil['recall'] = {
+        masalah: round(len(set(temuan.loc[temuan['masalah'] == masalah, 'id']) & ids) / max(len(ids), 1), 4)
+        for masalah, ids in harapan.items()
+    }
+    hasil['temuan_ledger_rusak'] = {m: int(n) for m, n in temuan['masalah'].value_counts().items() if n}
+    return hasil
+
+# ===================================================================================
+# --- SUITE BENCHMARK (HASIL JSON) ---
+# ===================================================================================
+FORM_REGULER = {
+    'jenis': JENIS_PENGELUARAN, 'kategori': "Food & Grocery", 'akun': PILIHAN_AKUN[0],
+    'jumlah_input': "25.000", 'biaya_admin_input': "0", 'deskripsi': "Benchmark",
+}
+FORM_TOP_UP = {
+    'jenis': JENIS_PENGELUARAN, 'kategori': KATEGORI_TOP_UP, 'dari_akun': PILIHAN_AKUN[0],
+    'ke_akun': PILIHAN_AKUN[1], 'jumlah_input': "100.000", 'biaya_admin_input': "2.500",
+    'metode_biaya': METODE_BIAYA_SUMBER, 'deskripsi': "",
+}
+FRAGMEN_APP = (
+    "halaman_daftar_transaksi", "_tampilkan_tabel_berhalaman", "_tampilkan_tombol_ekspor",
+    "tampilkan_form_edit_hapus", "_detail_transaksi_dashboard",
+)
+
+@contextlib.contextmanager
+def _fragmen_langsung():
+    """
+    Di luar `streamlit run`, fungsi ber-@st.fragment tidak menjalankan apa pun. Selama blok ini,
+    fragmen di app.py diganti sementara dengan fungsi aslinya agar badannya (termasuk fragmen bersarang) ikut terukur.
+    """
+    asli = {nama: getattr(app, nama) for nama in FRAGMEN_APP}
+    for nama, fungsi in asli.items():
+        setattr(app, nama, fungsi.__wrapped__)
+    try:
+        yield
+    finally:
+        for nama, fungsi in asli.items():
+            setattr(app, nama, fungsi)
+
+def bench_suite(jumlah_baris, seed=0):
+    """
+    Mengukur jalur utama aplikasi terhadap FakeSupabase berisi `jumlah_baris` transaksi sintetis:
+    pemuatan awal get_data() (fetch berhalaman + pembersihan), filter detail, saldo, agregasi dashboard,
+    jalur submit (reguler & Top Up), dan sinkronisasi delta. Semua waktu dalam detik (median).
+    """
+    mentah = buat_ledger_sintetis(jumlah_baris, seed)
+    klien = FakeSupabase(mentah.to_dict('records'))
+    hasil = {'baris': jumlah_baris}
+
+    # 1. get_data(): pemuatan awal lewat fetch berhalaman, lalu pembersihan saja.
+    ledger = pasang_fake_supabase(klien)
+    mulai = time.perf_counter()
+    versi, df = app.get_data_versi()
+    hasil['get_data_awal'] = time.perf_counter() - mulai
+    hasil['get_data_request'] = klien.jumlah_request
+    hasil['bersihkan_data'] = _waktu(lambda: _bersihkan_data(mentah.copy()), ulang=3)
+
+    # 2. Filter detail: bangun indeks, kueri tipikal, dan _apply_detailed_filters() (widget bernilai default).
+    hasil['filter_bangun_indeks'] = _waktu(lambda: FilterIndex(versi, df), ulang=3)
+    indeks = app._get_filter_index(versi, df)
+    tahun = sorted(indeks.opsi()['tahun'])[-1]
+    kombinasi = [
+        dict(tahun=tahun), dict(tahun=tahun, bulan=3, akun=PILIHAN_AKUN[:2]),
+        dict(jenis=[JENIS_PENGELUARAN], kategori=["Food & Grocery", "Transportasi"]),
+    ]
+
+    def cari_semua(kosongkan_memo):
+        for k in kombinasi:
+            if kosongkan_memo:
+                indeks._memo.clear()
+            indeks.cari(**k)
+
+    hasil['filter_cari'] = _waktu(lambda: cari_semua(True)) / len(kombinasi)
+    hasil['filter_cari_memo'] = _waktu(lambda: cari_semua(False)) / len(kombinasi)
+    hasil['filter_apply_detailed'] = _waktu(lambda: app._apply_detailed_filters(df, versi))
+
+    # 3. Saldo: bangun indeks saldo berjalan dan query per tanggal.
+    hasil['saldo_bangun'] = _waktu(lambda: SaldoIndex().bangun(df), ulang=3)
+    saldo = ledger.turunan("saldo")
+    hasil['saldo_per_tanggal'] = _waktu(lambda: saldo.saldo_per(df['tanggal'].max().date()))
+
+    # 4. Dashboard: bangun rollup cube dan agregasi pie/bar untuk satu tahun.
+    hasil['dashboard_bangun_cube'] = _waktu(lambda: RollupCube().bangun(df), ulang=3)
+    cube = ledger.turunan("rollup")
+    akhir = df['tanggal'].max().date()
+    awal = akhir - pd.Timedelta(days=365)
+    hasil['dashboard_agregasi'] = _waktu(lambda: [
+        cube.total_per_kategori(awal, akhir, jenis, [KATEGORI_TOP_UP]) for jenis in (JENIS_PEMASUKAN, JENIS_PENGELUARAN)
+    ])
+
+    # Grafik ringkasan (agregasi + 2 pie + 1 bar): cache figur kosong (bangun plotly.express) vs cache terisi.
+    def ringkasan(cache):
+        app._get_cache_figur = lambda: cache
+        app._ringkasan_dashboard(versi, cube, awal, akhir)
+    hasil['dashboard_grafik_tanpa_cache'] = _waktu(lambda: ringkasan(CacheFigur()))
+    cache_figur = CacheFigur()
+    ringkasan(cache_figur)
+    hasil['dashboard_grafik_cache'] = _waktu(lambda: ringkasan(cache_figur))
+
+    # 5. Submit: jalur _handle_submission() penuh (validasi, bulk insert, write-through ke ledger).
+    tanggal = {'tanggal': df['tanggal'].max().date()}
+    hasil['submit_reguler'] = _waktu(lambda: app._handle_submission(True, {**FORM_REGULER, **tanggal}), ulang=3)
+    hasil['submit_top_up'] = _waktu(lambda: app._handle_submission(True, {**FORM_TOP_UP, **tanggal}), ulang=3)
+
+    # 6. Sinkronisasi delta setelah perangkat lain menambah 10 transaksi.
+    klien.table(TABEL_CASHFLOW).insert(buat_ledger_sintetis(10, seed + 1).drop(columns='id').to_dict('records')).execute()
+    ledger.tandai_berubah()
+    hasil['sinkron_delta'] = _waktu(lambda: ledger.get(), ulang=1)
+
+    # 7. Waktu server per interaksi: sebelum fragmen, setiap interaksi menjalankan ulang seluruh halaman;
+    #    sekarang hanya fragmen yang widget-nya disentuh.
+    versi, df = ledger.get()
+    cube = ledger.turunan("rollup")
+    with _fragmen_langsung():
+        hasil['interaksi_daftar_halaman_penuh'] = _waktu(app.halaman_daftar_transaksi, ulang=3)
+        hasil['interaksi_daftar_fragmen_tabel'] = _waktu(lambda: app._tampilkan_tabel_berhalaman(versi, df, "tabel_daftar", {}), ulang=3)
+        hasil['interaksi_daftar_fragmen_edit'] = _waktu(lambda: app.tampilkan_form_edit_hapus(versi, df, df), ulang=3)
+        hasil['interaksi_dashboard_halaman_penuh'] = _waktu(lambda: (
+            app._ringkasan_dashboard(versi, cube, awal, akhir), app._detail_transaksi_dashboard(versi, df, awal, akhir)
+        ), ulang=3)
+        hasil['interaksi_dashboard_fragmen_detail'] = _waktu(lambda: app._detail_transaksi_dashboard(versi, df, awal, akhir), ulang=3)
+    return {k: round(v, 6) if isinstance(v, float) else v for k, v in hasil.items()}
+
+def _meta_benchmark():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'waktu': datetime.now().isoformat(timespec='seconds'), 'commit': commit, 'python': platform.python_version(),
+        'pandas': pd.__version__, 'numpy': np.__version__, 'pyarrow': pa.__version__,
+        'duckdb': _duckdb().__version__ if _duckdb() is not None else None, 'mesin': platform.machine(),
+    }
+
+def _bandingkan(hasil, path_dasar):
+    """
+    Mencetak rasio waktu terhadap hasil JSON sebelumnya (>1 berarti lebih lambat). Regresi ditandai jika
+    lebih lambat >20% dan selisihnya >1 ms (selisih mikrodetik hanyalah noise pengukuran).
+    """
+    with open(path_dasar) as f:
+        dasar = {baris['baris']: baris for baris in json.load(f)['hasil']}
+    for baris in hasil:
+        pembanding = dasar.get(baris['baris'])
+        if pembanding is None:
+            continue
+        print(f"--- {baris['baris']:,} baris (vs {path_dasar}) ---")
+        for kunci, nilai in baris.items():
+            lama = pembanding.get(kunci)
+            if isinstance(nilai, float) and isinstance(lama, (int, float)) and lama > 0:
+                tanda = "  << REGRESI" if nilai / lama > 1.2 and nilai - lama > 0.001 else ""
+                print(f"{kunci:<26}{lama:>12.4f}{nilai:>12.4f}{nilai / lama:>8.2f}x{tanda}")
+
+# ===================================================================================
+# --- TITIK MASUK ---
+# ===================================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark aplikasi Cashflow dengan ledger sintetis.")
+    sub = parser.add_subparsers(dest="perintah", required=True)
+
+    p_memori = sub.add_parser("memori", help="Laporan byte per baris skema lama vs skema ringkas.")
+    p_memori.add_argument("--baris", type=int, default=1_000_000)
+    p_memori.add_argument("--seed", type=int, default=0)
+
+    p_tabel = sub.add_parser("tabel", help="Latensi & payload tabel transaksi: semua baris vs satu halaman.")
+    p_tabel.add_argument("--baris", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    p_tabel.add_argument("--ukuran-halaman", type=int, default=50)
+
+    p_pencarian = sub.add_parser("pencarian", help="Latensi per ketikan picker Edit/Hapus: SearchIndex vs memindai semua baris.")
+    p_pencarian.add_argument("--baris", type=int, nargs="+", default=[1_000_000])
+    p_pencarian.add_argument("--deskripsi", nargs="+", choices=["biasa", "kombinasi", "unik"], default=["biasa", "kombinasi", "unik"])
+
+    p_kueri = sub.add_parser("kueri", help="Latensi lapisan kueri analitik: pandas vs DuckDB.")
+    p_kueri.add_argument("--baris", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000])
+
+    p_ekspor = sub.add_parser("ekspor", help="Waktu, ukuran, dan memori ekspor CSV/Parquet berbasis generator.")
+    p_ekspor.add_argument("--baris", type=int, nargs="+", default=[1_000_000])
+
+    p_umpan = sub.add_parser("umpan", help="Change feed vs polling: request saat idle, kesegaran data, dan fallback.")
+    p_umpan.add_argument("--baris", type=int, nargs="+", default=[100_000])
+    p_umpan.add_argument("--interval-polling", type=float, default=1.0)
+    p_umpan.add_argument("--detik-idle", type=float, default=3.0)
+
+    p_tulis = sub.add_parser("tulis", help="Submit sinkron vs antrean tulis (write-behind) pada jaringan tidak stabil.")
+    p_tulis.add_argument("--submit", type=int, default=200)
+    p_tulis.add_argument("--latensi", type=float, default=0.05)
+    p_tulis.add_argument("--peluang-gagal", type=float, default=0.2)
+
+    p_partisi = sub.add_parser("partisi", help="Partisi ledger per pengguna: memori per partisi, batas LRU, dan isolasi tulis.")
+    p_partisi.add_argument("--pengguna", type=int, default=10)
+    p_partisi.add_argument("--baris-per-pengguna", type=int, default=50_000)
+    p_partisi.add_argument("--request", type=int, default=200)
+    p_partisi.add_argument("--batas-mb", type=float)
+
+    p_bersama = sub.add_parser("bersama", help="Cache bersama antar proses: attach dingin, propagasi tulis, dan tulis paralel.")
+    p_bersama.add_argument("--baris", type=int, nargs="+", default=[100_000])
+    p_bersama.add_argument("--worker", type=int, default=4)
+
+    p_startup = sub.add_parser("startup", help="Waktu impor dan render pertama setiap halaman dari cold start.")
+    p_startup.add_argument("--baris", type=int, nargs="+", default=[100_000])
+    p_startup.add_argument("--app", help="Path app.py lain untuk dibandingkan (default: app.py di repo ini).")
+    p_startup.add_argument("--ulang", type=int, default=3)
+
+    p_tahunan = sub.add_parser("tahunan", help="Partisi tahunan: arsip tahun tertutup vs ledger penuh.")
+    p_tahunan.add_argument("--baris", type=int, nargs="+", default=[1_000_000])
+
+    p_integritas = sub.add_parser("integritas", help="Pemeriksaan integritas ledger: waktu dan recall kesalahan yang disisipkan.")
+    p_integritas.add_argument("--baris", type=int, nargs="+", default=[1_000_000])
+    p_integritas.add_argument("--kesalahan", type=int, default=500)
+
+    p_suite = sub.add_parser("suite", help="Benchmark jalur utama aplikasi dengan FakeSupabase; hasil disimpan sebagai JSON.")
+    p_suite.add_argument("--baris", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    p_suite.add_argument("--seed", type=int, default=0)
+    p_suite.add_argument("--output", default="benchmark_hasil.json")
+    p_suite.add_argument("--bandingkan", help="File JSON hasil sebelumnya untuk dibandingkan.")
+
+    args = parser.parse_args()
+    if args.perintah == "memori":
+        _cetak_laporan_memori(laporan_memori(args.baris, args.seed), args.baris)
+    elif args.perintah == "tabel":
+        for n in args.baris:
+            print(bench_tabel(n, args.ukuran_halaman))
+    elif args.perintah == "pencarian":
+        for n in args.baris:
+            for deskripsi in args.deskripsi:
+                print(bench_pencarian(n, deskripsi))
+    elif args.perintah == "kueri":
+        for n in args.baris:
+            print(bench_kueri(n))
+    elif args.perintah == "ekspor":
+        for n in args.baris:
+            print(bench_ekspor(n))
+    elif args.perintah == "umpan":
+        for n in args.baris:
+            print(bench_umpan(n, args.interval_polling, args.detik_idle))
+    elif args.perintah == "tulis":
+        print(bench_tulis(args.submit, args.latensi, args.peluang_gagal))
+    elif args.perintah == "partisi":
+        print(bench_partisi(args.pengguna, args.baris_per_pengguna, args.request, args.batas_mb))
+    elif args.perintah == "bersama":
+        for n in args.baris:
+            print(bench_bersama(n, args.worker))
+    elif args.perintah == "startup":
+        for n in args.baris:
+            print(json.dumps(bench_startup(n, args.app, args.ulang), indent=2))
+    elif args.perintah == "tahunan":
+        for n in args.baris:
+            print(json.dumps(bench_tahunan(n), indent=2))
+    elif args.perintah == "integritas":
+        for n in args.baris:
+            print(json.dumps(bench_integritas(n, args.kesalahan), indent=2))
+    elif args.perintah == "suite":
+        hasil = []
+        for n in args.baris:
+            hasil.append(bench_suite(n, args.seed))
+            print(hasil[-1])
+        with open(args.output, 'w') as f:
+            json.dump({'meta': _meta_benchmark(), 'hasil': hasil}, f, indent=2)
+        print(f"Hasil disimpan ke {args.output}")
+        if args.bandingkan:
+            _bandingkan(hasil, args.bandingkan)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+# ===================================================================================
+# --- PAKET CASHFLOW ---
+# ===================================================================================
+# Lapisan data di belakang app.py (UI Streamlit, router, dan CLI):
+#   konstanta  - konstanta dan pengaturan bersama ([pengaturan] di secrets.toml)
+#   metrik     - instrumentasi performa (histogram latensi, penghitung hit/miss)
+#   ledger/    - pengambilan data, mirror disk, arsip tahunan, ledger tersinkron, partisi, indeks agregat
+#   cache/     - struktur turunan per versi data untuk halaman (filter, pencarian, figur)
+#   ekspor     - generator ekspor CSV/Parquet dan rute unduhan streaming (server.py)
+#   sync/      - change feed realtime dan antrean tulis (write-behind)
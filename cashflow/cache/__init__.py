@@ -0,0 +1,5 @@
+from cashflow.cache.figur import CacheFigur
+from cashflow.cache.filter import FilterIndex
+from cashflow.cache.pencarian import SearchIndex
+
+__all__ = ["CacheFigur", "FilterIndex", "SearchIndex"]
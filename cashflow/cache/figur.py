@@ -0,0 +1,57 @@
+# ===================================================================================
+# --- CACHE FIGUR DASHBOARD ---
+# ===================================================================================
+import json
+import threading
+from collections import OrderedDict
+
+from cashflow.konstanta import BATAS_MEMORI_CACHE_FIGUR
+from cashflow.metrik import metrik
+
+class CacheFigur:
+    """
+    Cache LRU figur Plotly dalam bentuk JSON terserialisasi, dipakai bersama oleh semua sesi.
+    Kunci memuat versi data, jenis grafik, periode, dan filter, sehingga figur yang datanya tidak
+    berubah tidak perlu dibangun ulang lewat plotly.express. Total ukuran JSON dibatasi `batas_byte`;
+    entri yang paling lama tidak dipakai dibuang lebih dulu.
+    """
+
+    def __init__(self, batas_byte=BATAS_MEMORI_CACHE_FIGUR):
+        self.batas_byte = batas_byte
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  # kunci -> JSON figur
+        self._byte = 0
+
+    def ambil(self, kunci, bangun):
+        """Mengembalikan figur untuk `kunci`; `bangun()` hanya dipanggil jika belum ada di cache."""
+        with self._lock:
+            spec = self._data.get(kunci)
+            if spec is not None:
+                self._data.move_to_end(kunci)
+        import plotly.graph_objects as go
+        import plotly.io as pio
+        if spec is not None:
+            metrik.hitung("cache_total", lapisan="figur", hasil="hit")
+            # JSON berasal dari figur yang sudah tervalidasi saat dibangun, jadi validasi ulang dilewati.
+            return go.Figure(json.loads(spec), _validate=False)
+        metrik.hitung("cache_total", lapisan="figur", hasil="miss")
+        fig = bangun()
+        self._simpan(kunci, pio.to_json(fig, validate=False))
+        return fig
+
+    def _simpan(self, kunci, spec):
+        if len(spec) > self.batas_byte:
+            return
+        with self._lock:
+            lama = self._data.pop(kunci, None)
+            if lama is not None:
+                self._byte -= len(lama)
+            self._data[kunci] = spec
+            self._byte += len(spec)
+            while self._byte > self.batas_byte:
+                _, dibuang = self._data.popitem(last=False)
+                self._byte -= len(dibuang)
+
+    def statistik(self):
+        with self._lock:
+            return {'entri': len(self._data), 'byte': self._byte, 'batas_byte': self.batas_byte}
@@ -0,0 +1,119 @@
+# ===================================================================================
+# --- INDEKS FILTER TRANSAKSI ---
+# ===================================================================================
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from cashflow.konstanta import UKURAN_MEMO_FILTER
+from cashflow.metrik import metrik
+
+def _posisi_per_nilai(nilai):
+    """Mengembalikan {nilai: array posisi terurut} untuk satu kolom dengan satu kali argsort."""
+    kode, unik = pd.factorize(nilai, sort=True)
+    urutan = np.argsort(kode, kind='stable')  # posisi dalam satu nilai tetap terurut naik
+    jumlah = np.bincount(kode + 1, minlength=len(unik) + 1)  # +1 agar kode -1 (NaN) ada di kelompok pertama
+    kelompok = np.split(urutan, np.cumsum(jumlah)[:-1])
+    return {nilai_unik: kelompok[i + 1] for i, nilai_unik in enumerate(unik)}
+
+def _irisan_posisi(himpunan):
+    """Irisan beberapa array posisi terurut, dimulai dari yang terkecil."""
+    himpunan = sorted(himpunan, key=len)
+    hasil = himpunan[0]
+    for posisi in himpunan[1:]:
+        if not len(hasil):
+            break
+        hasil = np.intersect1d(hasil, posisi, assume_unique=True)
+    return hasil
+
+class FilterIndex:
+    """
+    Indeks untuk filter detail transaksi, dibangun sekali per versi data:
+    - tanggal terurut (rentang tanggal/tahun menjadi potongan kontinu lewat binary search),
+    - daftar posisi per nilai untuk bulan, hari, jenis, kategori, dan akun.
+    Hasil filter adalah irisan daftar posisi dan diingat per (versi, kombinasi filter).
+    """
+
+    def __init__(self, versi, df):
+        self.versi = versi
+        self.df = df
+        hari = df['tanggal'].to_numpy().astype('datetime64[D]')
+        self._urutan_tanggal = np.argsort(hari, kind='stable')
+        self._hari_terurut = hari[self._urutan_tanggal]
+        tanggal = df['tanggal'].dt
+        self._posisi = {
+            'bulan': _posisi_per_nilai(tanggal.month.to_numpy()),
+            'hari': _posisi_per_nilai(tanggal.day.to_numpy()),
+            'jenis': _posisi_per_nilai(df['jenis']),
+            'kategori': _posisi_per_nilai(df['kategori']),
+            'akun': _posisi_per_nilai(df['akun']),
+        }
+        self._memo = OrderedDict()
+
+    def _ingat(self, kunci, hitung):
+        if kunci in self._memo:
+            metrik.hitung("cache_total", lapisan="memo_filter", hasil="hit")
+            self._memo.move_to_end(kunci)
+            return self._memo[kunci]
+        metrik.hitung("cache_total", lapisan="memo_filter", hasil="miss")
+        hasil = self._memo[kunci] = hitung()
+        if len(self._memo) > UKURAN_MEMO_FILTER:
+            self._memo.popitem(last=False)
+        return hasil
+
+    def _batas_rentang(self, awal, akhir):
+        """Batas [kiri, kanan) pada urutan tanggal untuk awal <= tanggal <= akhir (binary search)."""
+        kiri = np.searchsorted(self._hari_terurut, np.datetime64(awal, 'D'), side='left')
+        kanan = np.searchsorted(self._hari_terurut, np.datetime64(akhir, 'D'), side='right')
+        return kiri, kanan
+
+    def _posisi_rentang(self, awal, akhir):
+        """Posisi (terurut) semua baris dengan awal <= tanggal <= akhir."""
+        kiri, kanan = self._batas_rentang(awal, akhir)
+        return np.sort(self._urutan_tanggal[kiri:kanan])
+
+    def opsi(self, rentang=None):
+        """Pilihan dropdown (tahun, bulan, jenis, kategori, akun) untuk seluruh data atau satu rentang tanggal."""
+        def hitung():
+            if rentang is None:
+                hari = self._hari_terurut
+                hasil = {kolom: sorted(self._posisi[kolom]) for kolom in ('jenis', 'kategori', 'akun')}
+            else:
+                kiri, kanan = self._batas_rentang(*rentang)
+                hari = self._hari_terurut[kiri:kanan]
+                baris = self.df.iloc[self._urutan_tanggal[kiri:kanan]]
+                hasil = {kolom: sorted(baris[kolom].dropna().unique()) for kolom in ('jenis', 'kategori', 'akun')}
+            tanggal = pd.DatetimeIndex(hari)
+            hasil['tahun'] = sorted((int(t) for t in tanggal.year.unique()), reverse=True)
+            hasil['bulan'] = sorted(int(b) for b in tanggal.month.unique())
+            return hasil
+        return self._ingat(('opsi', self.versi, rentang), hitung)
+
+    def cari(self, rentang=None, tahun=None, bulan=None, hari=None, jenis=(), kategori=(), akun=()):
+        """
+        Mengembalikan array posisi baris yang lolos semua filter (terurut naik),
+        atau None jika tidak ada filter sama sekali (semua baris).
+        """
+        kunci = ('cari', self.versi, rentang, tahun, bulan, hari, tuple(jenis), tuple(kategori), tuple(akun))
+
+        def hitung():
+            himpunan = []
+            # Rentang tanggal dan tahun digabung menjadi satu potongan kontinu pada urutan tanggal.
+            if rentang is not None or tahun is not None:
+                awal, akhir = rentang if rentang is not None else (datetime(tahun, 1, 1), datetime(tahun, 12, 31))
+                if rentang is not None and tahun is not None:
+                    awal = max(np.datetime64(awal, 'D'), np.datetime64(f"{tahun}-01-01"))
+                    akhir = min(np.datetime64(akhir, 'D'), np.datetime64(f"{tahun}-12-31"))
+                himpunan.append(self._posisi_rentang(awal, akhir))
+            kosong = np.array([], dtype=np.intp)
+            if bulan is not None:
+                himpunan.append(self._posisi['bulan'].get(bulan, kosong))
+            if hari is not None:
+                himpunan.append(self._posisi['hari'].get(hari, kosong))
+            for kolom, pilihan in (('jenis', jenis), ('kategori', kategori), ('akun', akun)):
+                if pilihan:
+                    himpunan.append(np.sort(np.concatenate([self._posisi[kolom].get(p, kosong) for p in pilihan])))
+            return _irisan_posisi(himpunan) if himpunan else None
+        return self._ingat(kunci, hitung)
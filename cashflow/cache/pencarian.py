@@ -0,0 +1,128 @@
+# ===================================================================================
+# --- INDEKS PENCARIAN EDIT/HAPUS ---
+# ===================================================================================
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from cashflow.konstanta import BATAS_HASIL_PENCARIAN, COL_NOMINAL
+
+def _posting(peringkat, kode, kosakata):
+    """
+    Posting list satu kolom dalam bentuk CSR: (kosakata huruf kecil, peringkat baris per kode, offset).
+    Peringkat baris untuk kode ke-i adalah urutan[offset[i]:offset[i + 1]]; kode -1 (NaN) diberi teks kosong.
+    """
+    kosakata = pd.Index(np.append(np.asarray(kosakata, dtype=object), ""), dtype=str).str.lower()
+    kode = np.where(kode < 0, len(kosakata) - 1, kode)
+    urutan = peringkat[np.argsort(kode, kind='stable')]
+    offset = np.concatenate(([0], np.cumsum(np.bincount(kode, minlength=len(kosakata)))))
+    return kosakata, urutan, offset
+
+def _ambil_potongan(urutan, mulai, akhir):
+    """Menggabungkan urutan[mulai[i]:akhir[i]] untuk semua i tanpa loop Python."""
+    panjang = akhir - mulai
+    if not panjang.sum():
+        return np.array([], dtype=urutan.dtype)
+    geser = np.repeat(mulai - np.concatenate(([0], np.cumsum(panjang)[:-1])), panjang)
+    return urutan[np.arange(panjang.sum()) + geser]
+
+class SearchIndex:
+    """
+    Indeks pencarian untuk picker Edit/Hapus, dibangun sekali per versi data:
+    - posting list per kolom (tanggal, kategori, nominal, dan kata-kata deskripsi): kata kunci dicocokkan
+      dengan nilai unik kolom (jauh lebih sedikit dari jumlah baris), lalu baris yang cocok diambil dari
+      posting list tanpa memindai teks setiap baris;
+    - id terurut untuk pencarian awalan id lewat binary search;
+    - indeks hash id -> posisi untuk mengambil baris terpilih tanpa boolean mask.
+    Posting list menyimpan peringkat baris (0 = id terbesar), sehingga N hasil terbaru cukup diambil dari
+    awal bitmap hasil tanpa mengurutkan semua baris yang cocok.
+    Label hanya diformat untuk hasil yang ditampilkan, bukan untuk seluruh data.
+    """
+
+    def __init__(self, versi, df):
+        self.df = df
+        self._id = df['id'].to_numpy()
+        self._posisi_id = pd.Index(self._id)
+        self._urutan = np.argsort(-self._id, kind='stable')  # peringkat -> posisi baris
+        self._peringkat = np.empty_like(self._urutan)  # posisi baris -> peringkat
+        self._peringkat[self._urutan] = np.arange(len(self._urutan))
+        self._id_naik = self._id[self._urutan[::-1]]  # id terurut naik untuk pencarian awalan id
+        # Tanggal hanya punya beberapa ribu nilai unik: format sekali per nilai (dua format yang bisa diketik).
+        kode_tanggal, tanggal = pd.factorize(df['tanggal'])
+        kode_nominal, nominal = pd.factorize(df[COL_NOMINAL])
+        kode_deskripsi, deskripsi = pd.factorize(df['deskripsi'])
+        self._kolom = [
+            _posting(self._peringkat, kode_tanggal, tanggal.strftime('%Y-%m-%d %d/%m/%Y')),
+            _posting(self._peringkat, df['kategori'].cat.codes.to_numpy(), df['kategori'].cat.categories.astype(str)),
+            _posting(self._peringkat, kode_nominal, nominal.astype(str)),
+        ]
+        # Deskripsi bisa hampir unik per baris, jadi dipecah dua tingkat: kata -> deskripsi unik -> baris.
+        # Kata kunci tanpa spasi selalu berada di dalam satu kata deskripsi, sehingga cukup mencocokkan kosakata kata.
+        kosakata, self._urutan_deskripsi, self._offset_deskripsi = _posting(self._peringkat, kode_deskripsi, deskripsi.astype(str))
+        kata = pc.utf8_split_whitespace(pa.array(kosakata.to_numpy(dtype=object), type=pa.string()))
+        kode_kata = pc.list_flatten(kata).dictionary_encode()
+        self._kata_deskripsi = _posting(
+            pc.list_parent_indices(kata).to_numpy(), kode_kata.indices.to_numpy(), kode_kata.dictionary.to_numpy(zero_copy_only=False),
+        )
+
+    def posisi(self, id_transaksi):
+        """Posisi baris untuk id tertentu (lookup hash)."""
+        return self._posisi_id.get_loc(id_transaksi)
+
+    def label(self, id_transaksi):
+        row = self.df.iloc[self.posisi(id_transaksi)]
+        return f"{row['id']} -- {row['tanggal'].strftime('%d/%m')} -- {row['kategori']} -- Rp {row[COL_NOMINAL]:,.0f} -- {row['deskripsi']}".replace(',', '.')
+
+    def _tandai_awalan_id(self, cocok, angka):
+        """Menandai peringkat baris yang id-nya diawali `angka`: satu rentang id [a * 10^k, (a + 1) * 10^k) per panjang id."""
+        if angka.startswith('0') or not len(self._id):
+            return
+        # Id menurun menurut peringkat, jadi setiap rentang id adalah satu potongan peringkat yang kontinu.
+        id_naik = self._id_naik
+        awal, lebar = int(angka), 10 ** np.arange(max(len(str(id_naik[-1])) - len(angka) + 1, 1), dtype=np.int64)
+        kiri = np.searchsorted(id_naik, awal * lebar, side='left')
+        kanan = np.searchsorted(id_naik, (awal + 1) * lebar, side='left')
+        for k, n in zip(kiri, kanan):
+            cocok[len(id_naik) - n:len(id_naik) - k] = True
+
+    def _bitmap_kata(self, kata):
+        """Bitmap per peringkat untuk satu kata: awalan id, atau bagian dari salah satu kolom."""
+        cocok = np.zeros(len(self._id), dtype=bool)
+        if kata.isdigit():
+            self._tandai_awalan_id(cocok, kata)
+        for kosakata, urutan, offset in self._kolom:
+            kode = np.flatnonzero(kosakata.str.contains(kata, regex=False))
+            if len(kode):
+                cocok[_ambil_potongan(urutan, offset[kode], offset[kode + 1])] = True
+        kosakata, urutan, offset = self._kata_deskripsi
+        kode = np.flatnonzero(kosakata.str.contains(kata, regex=False))
+        if len(kode):
+            deskripsi = _ambil_potongan(urutan, offset[kode], offset[kode + 1])
+            cocok[_ambil_potongan(self._urutan_deskripsi, self._offset_deskripsi[deskripsi], self._offset_deskripsi[deskripsi + 1])] = True
+        return cocok
+
+    def cari(self, kata_kunci, basis=None, batas=BATAS_HASIL_PENCARIAN):
+        """
+        Mengembalikan id transaksi (maksimal `batas`, terbaru lebih dulu) yang cocok dengan kata kunci,
+        dibatasi pada posisi `basis` (mis. hasil filter). Setiap kata (dipisah spasi) harus cocok dengan
+        awalan id, atau menjadi bagian dari tanggal, kategori, nominal, atau deskripsi. Nominal boleh
+        diketik dengan titik ribuan ("50.000"). Id yang sama persis ditaruh paling atas.
+        """
+        kata = [k.replace('.', '') if k.replace('.', '').isdigit() else k for k in kata_kunci.lower().split()]
+        if not kata and basis is None:
+            return self._id[self._urutan[:batas]].tolist()
+        cocok = None
+        if basis is not None:
+            cocok = np.zeros(len(self._id), dtype=bool)
+            cocok[self._peringkat[basis]] = True
+        for k in kata:
+            bitmap = self._bitmap_kata(k)
+            cocok = bitmap if cocok is None else cocok & bitmap
+        persis = []
+        if len(kata) == 1 and kata[0].isdigit() and int(kata[0]) in self._posisi_id:
+            peringkat = self._peringkat[self.posisi(int(kata[0]))]
+            if cocok[peringkat]:
+                persis, cocok[peringkat] = [int(kata[0])], False
+                batas -= 1
+        return persis + self._id[self._urutan[np.flatnonzero(cocok)[:batas]]].tolist()
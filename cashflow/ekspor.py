@@ -0,0 +1,123 @@
+# ===================================================================================
+# --- EKSPOR TRANSAKSI (CSV / PARQUET) ---
+# ===================================================================================
+# Generator ekspor dipakai dua jalur:
+#   - rute `/ekspor/{token}` (server.py, `streamlit run server.py`): generator dialirkan langsung ke
+#     klien lewat StreamingResponse, sehingga memori server per unduhan hanya sebesar satu potongan;
+#   - st.download_button (`streamlit run app.py`): Streamlit menyimpan seluruh byte unduhan di memori.
+import functools
+import io
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from cashflow.konstanta import BATAS_TAUTAN_EKSPOR, COL_NOMINAL, KOLOM_EKSPOR, UKURAN_CHUNK_EKSPOR, UMUR_TAUTAN_EKSPOR
+
+@functools.cache
+def _skema_ekspor():
+    """Skema Arrow tetap untuk ekspor Parquet."""
+    return pa.schema([
+        ('id', pa.int64()), ('tanggal', pa.date32()), ('jenis', pa.string()), ('kategori', pa.string()),
+        ('akun', pa.string()), (COL_NOMINAL, pa.int64()), ('deskripsi', pa.string()),
+    ])
+
+def _potongan_ekspor(df, ukuran_chunk):
+    """Memotong df menjadi beberapa frame kecil terurut id menaik, sehingga isi file ekspor selalu sama untuk data yang sama."""
+    urutan = np.argsort(df['id'].to_numpy(), kind='stable')
+    for awal in range(0, len(urutan), ukuran_chunk):
+        yield df.iloc[urutan[awal:awal + ukuran_chunk]][KOLOM_EKSPOR]
+
+def ekspor_csv(df, ukuran_chunk=UKURAN_CHUNK_EKSPOR):
+    """Generator byte CSV (UTF-8, pemisah koma, tanggal YYYY-MM-DD), satu potongan per yield."""
+    yield (",".join(KOLOM_EKSPOR) + "\n").encode()
+    for potongan in _potongan_ekspor(df, ukuran_chunk):
+        yield potongan.to_csv(header=False, index=False, date_format="%Y-%m-%d", lineterminator="\n").encode()
+
+class _PenampungByte(io.RawIOBase):
+    """Sink tulis-saja untuk ParquetWriter; byte yang terkumpul diambil (dan dikosongkan) setiap potongan."""
+
+    def __init__(self):
+        self._potongan, self._posisi = [], 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._potongan.append(bytes(data))
+        self._posisi += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._posisi
+
+    def ambil(self):
+        data, self._potongan = b"".join(self._potongan), []
+        return data
+
+def ekspor_parquet(df, ukuran_chunk=UKURAN_CHUNK_EKSPOR):
+    """Generator byte Parquet (zstd, skema tetap _skema_ekspor()), satu row group per potongan."""
+    penampung, skema = _PenampungByte(), _skema_ekspor()
+    with pq.ParquetWriter(penampung, skema, compression="zstd") as writer:
+        for potongan in _potongan_ekspor(df, ukuran_chunk):
+            writer.write_table(pa.Table.from_pandas(potongan, schema=skema, preserve_index=False))
+            yield penampung.ambil()
+    yield penampung.ambil()  # footer
+
+FORMAT_EKSPOR = {"CSV": (ekspor_csv, "csv", "text/csv"), "Parquet": (ekspor_parquet, "parquet", "application/octet-stream")}
+
+class DaftarEkspor:
+    """
+    Tautan unduhan sekali-buat untuk rute `/ekspor/{token}`. Setiap entri hanya menyimpan referensi ke
+    frame hasil filter (snapshot ledger yang tidak diubah), bukan file; byte ekspor baru dibuat saat
+    tautan dibuka. Token acak (tidak bisa ditebak) sehingga tautan hanya berguna bagi sesi yang
+    membuatnya; entri kedaluwarsa setelah `umur` detik dan jumlahnya dibatasi `batas` (terlama dibuang).
+    `rute_aktif` dinyalakan server.py saat rute tersedia; jika mati, app.py memakai st.download_button.
+    """
+
+    def __init__(self, umur=UMUR_TAUTAN_EKSPOR, batas=BATAS_TAUTAN_EKSPOR):
+        self.umur, self.batas = umur, batas
+        self.rute_aktif = False
+        self._lock = threading.Lock()
+        self._entri = OrderedDict()  # token -> (kedaluwarsa, df, format_ekspor, nama_file)
+
+    def daftarkan(self, df, format_ekspor, nama_file, ganti=None):
+        """Mendaftarkan ekspor dan mengembalikan tokennya; token lama `ganti` (milik tombol yang sama) dilepas."""
+        token = secrets.token_urlsafe(24)
+        sekarang = time.monotonic()
+        with self._lock:
+            self._entri.pop(ganti, None)
+            while self._entri and (len(self._entri) >= self.batas or next(iter(self._entri.values()))[0] < sekarang):
+                self._entri.popitem(last=False)
+            self._entri[token] = (sekarang + self.umur, df, format_ekspor, nama_file)
+        return token
+
+    def ambil(self, token):
+        """Mengembalikan (df, format_ekspor, nama_file) untuk token yang masih berlaku, atau None."""
+        with self._lock:
+            entri = self._entri.get(token)
+            if entri is None or entri[0] < time.monotonic():
+                self._entri.pop(token, None)
+                return None
+            return entri[1:]
+
+daftar_ekspor = DaftarEkspor()
+
+def unduh_ekspor(request):
+    """Rute Starlette `/ekspor/{token}`: mengalirkan generator ekspor potongan demi potongan ke klien."""
+    from starlette.responses import PlainTextResponse, StreamingResponse
+
+    entri = daftar_ekspor.ambil(request.path_params["token"])
+    if entri is None:
+        return PlainTextResponse("Tautan ekspor tidak ditemukan atau sudah kedaluwarsa.", status_code=404)
+    df, format_ekspor, nama_file = entri
+    buat, ekstensi, mime = FORMAT_EKSPOR[format_ekspor]
+    # Generator sinkron diiterasi Starlette di threadpool, jadi event loop tidak terblokir oleh pandas/pyarrow.
+    return StreamingResponse(
+        buat(df), media_type=mime,
+        headers={"Content-Disposition": f'attachment; filename="{nama_file}.{ekstensi}"', "Cache-Control": "no-store"},
+    )
@@ -0,0 +1,97 @@
+# ===================================================================================
+# --- KONSTANTA & PENGATURAN BERSAMA ---
+# ===================================================================================
+# Konstanta yang dipakai bersama oleh lapisan ledger, cache, sinkronisasi, dan halaman di app.py.
+import os
+
+import streamlit as st
+
+AKAR_PROYEK = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # folder app.py
+
+def pengaturan(nama, default):
+    """Membaca pengaturan opsional dari bagian [pengaturan] di secrets.toml."""
+    try:
+        return st.secrets.get("pengaturan", {}).get(nama, default)
+    except Exception:  # secrets.toml tidak tersedia
+        return default
+
+# --- Label dan Nama Kolom untuk Data ---
+TABEL_CASHFLOW = "Cashflow"  # Nama tabel transaksi di Supabase.
+COL_NOMINAL = "nominal_(Rp)"  # Sesuai dengan nama kolom di database.
+COL_UPDATED_AT = "updated_at"  # Opsional: jika ada, dipakai untuk mendeteksi baris yang diedit.
+COL_PEMILIK = "pemilik"  # Rumah tangga pemilik baris; wajib jika mode multi-pengguna aktif.
+UMUR_TOKEN_PEMILIK = 3600  # detik; umur JWT per rumah tangga yang dibaca kebijakan RLS (mode multi-pengguna).
+
+# --- Pengaturan Sinkronisasi Data ---
+INTERVAL_SINKRONISASI = 60  # detik; jeda minimum antar sinkronisasi delta ke database.
+UKURAN_HALAMAN_FETCH = 1000  # baris per request; jangan melebihi batas max-rows PostgREST.
+JUMLAH_WORKER_FETCH = 4  # jumlah jalur keyset (rentang id) yang dibaca bersamaan.
+UKURAN_BATCH_ID = 200  # jumlah id per filter `in` agar URL tidak terlalu panjang.
+UKURAN_MEMO_FILTER = 64  # jumlah kombinasi filter yang hasilnya diingat per versi data.
+BATAS_MEMORI_LEDGER = 512 * 1024 * 1024  # byte; total data + indeks turunan semua partisi ledger di memori.
+JEDA_ULANG_UMPAN = 5  # detik; jeda sebelum mencoba menyambung ulang change feed yang terputus.
+JENDELA_BATCH_UMPAN = 0.05  # detik; event change feed yang datang beruntun digabung menjadi satu merge.
+BATAS_HASIL_PENCARIAN = 50  # jumlah maksimum transaksi yang ditampilkan di picker Edit/Hapus.
+
+# --- Pengaturan Lapisan Kueri Analitik ---
+AMBANG_DUCKDB = 50_000  # baris; di bawah ini overhead DuckDB lebih besar dari groupby pandas.
+
+# --- Pengaturan Cache Figur Dashboard ---
+BATAS_MEMORI_CACHE_FIGUR = 16 * 1024 * 1024  # byte JSON figur yang disimpan untuk semua sesi.
+
+# --- Pengaturan Ekspor Transaksi ---
+UKURAN_CHUNK_EKSPOR = 50_000  # baris per potongan (juga ukuran row group Parquet).
+KOLOM_EKSPOR = ['id', 'tanggal', 'jenis', 'kategori', 'akun', COL_NOMINAL, 'deskripsi']
+RUTE_EKSPOR = "/ekspor"  # rute unduhan streaming yang dipasang server.py.
+UMUR_TAUTAN_EKSPOR = 15 * 60  # detik; tautan unduhan berlaku selama ini sejak tombol terakhir digambar.
+BATAS_TAUTAN_EKSPOR = 256  # tautan aktif di semua sesi; yang terlama dibuang lebih dulu.
+
+# --- Pengaturan Instrumentasi Performa ---
+BATAS_HISTOGRAM_DETIK = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PREFIKS_METRIK = "cashflow_"
+
+# --- Pengaturan Mirror Lokal (cache di disk untuk cold start, dipakai bersama semua proses) ---
+MIRROR_PATH = os.path.join(AKAR_PROYEK, ".cache", "cashflow_ledger.arrow")
+MIRROR_SCHEMA_VERSION = 3  # Naikkan jika format kolom/tipe mirror berubah agar mirror lama dibangun ulang.
+MIRROR_UMUR_MAKS = 7 * 24 * 3600  # detik; mirror yang lebih tua dianggap basi dan dibangun ulang.
+PANJANG_RIWAYAT_MIRROR = 64  # generasi terakhir yang id-nya dicatat, agar proses lain bisa menyusul per delta.
+BATAS_ID_RIWAYAT = 1000  # perubahan lebih besar dari ini dicatat sebagai "semua" (penyusul memuat ulang penuh).
+KOLOM_WAJIB = ['id', 'tanggal', 'jenis', 'kategori', 'akun', COL_NOMINAL, 'deskripsi']
+
+# --- Pengaturan Arsip Tahunan (partisi tahun buku yang sudah ditutup) ---
+ARSIP_SCHEMA_VERSION = 1  # Naikkan jika format manifest/snapshot berubah agar arsip lama dibangun ulang.
+HARI_TENGGANG_TUTUP_BUKU = 31  # hari setelah akhir tahun sebelum tahun itu ditutup dan diarsipkan.
+JUMLAH_TAHUN_DIMUAT = 4  # partisi tahun tertutup yang disimpan di memori per ledger (LRU).
+UKURAN_CACHE_TAMPILAN = 8  # gabungan partisi per rentang tanggal yang diingat per ledger (LRU).
+
+# --- Pengaturan Antrean Tulis (write-behind) ---
+JURNAL_TULIS_PATH = os.path.join(os.path.dirname(MIRROR_PATH), "jurnal_tulis.sqlite3")
+COL_KUNCI_IDEMPOTEN = "idempotency_key"  # kolom text unik di Cashflow (migrations/001_idempotency_key.sql); wajib jika antrean tulis aktif.
+UKURAN_BATCH_TULIS = 50  # mutasi insert berurutan yang dikirim dalam satu request.
+MAKS_PERCOBAAN_TULIS = 8  # setelah ini mutasi ditandai gagal dan menunggu tindakan pengguna.
+JEDA_AWAL_TULIS = 1  # detik; jeda coba ulang pertama, berlipat dua setiap kegagalan.
+JEDA_MAKS_TULIS = 300  # detik; batas atas jeda coba ulang.
+
+# --- Jenis-Jenis Transaksi ---
+JENIS_PEMASUKAN = "Masuk"
+JENIS_PENGELUARAN = "Keluar"
+KATEGORI_TOP_UP = "Top Up"  # Konstanta untuk kategori "Top Up"
+
+# --- Kategori dan Metode Biaya Admin ---
+KATEGORI_BIAYA_ADMIN = "Biaya Admin"
+METODE_BIAYA_SUMBER = "Dikenakan pada akun sumber"
+METODE_BIAYA_TUJUAN = "Dipotong dari akun tujuan"
+
+# --- Daftar Kategori Transaksi (Update KATEGORI_PENGELUARAN) ---
+KATEGORI_PEMASUKAN = sorted(["Gaji", "Hadiah", "Hibah", "Lainnya", "Reimbursement", KATEGORI_TOP_UP])
+KATEGORI_PENGELUARAN = sorted([
+    "Hobi/Keinginan", "Internet", "Investasi", "Transportasi", "Skin-Hair-Body Care", "Lain-lain",
+    "Entertainment", "Food & Grocery", "Pengembangan Diri", "Reimbursement", "Tak Terduga", "Primary Needs",
+    KATEGORI_TOP_UP,
+    KATEGORI_BIAYA_ADMIN 
+])
+
+# --- Daftar Pilihan Akun ---
+PILIHAN_AKUN = sorted([
+    "BCA", "Cash", "Jago", "GoPay", "ShopeePay", "e-Money"
+])
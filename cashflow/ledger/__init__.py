@@ -0,0 +1,7 @@
+from cashflow.ledger.arsip import ArsipTahunan
+from cashflow.ledger.indeks import KueriLedger, RollupCube, SaldoIndex
+from cashflow.ledger.mirror import LedgerMirror
+from cashflow.ledger.partisi import ManajerLedger
+from cashflow.ledger.sinkron import LedgerSync
+
+__all__ = ["ArsipTahunan", "KueriLedger", "LedgerMirror", "LedgerSync", "ManajerLedger", "RollupCube", "SaldoIndex"]
@@ -0,0 +1,163 @@
+# ===================================================================================
+# --- ARSIP TAHUNAN (PARTISI TAHUN BUKU TERTUTUP) ---
+# ===================================================================================
+import contextlib
+import json
+import logging
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from cashflow.konstanta import (
+    ARSIP_SCHEMA_VERSION,
+    COL_NOMINAL,
+    COL_PEMILIK,
+    JENIS_PEMASUKAN,
+    JENIS_PENGELUARAN,
+)
+from cashflow.ledger.mirror import _identitas_file, _kunci_file, _sama_isi
+from cashflow.ledger.muat import _gabung_frame
+
+logger = logging.getLogger(__name__)
+
+class ArsipTahunan:
+    """
+    Partisi tahun buku yang sudah ditutup, masing-masing berupa snapshot Parquet (zstd) yang tidak pernah
+    diubah: perubahan pada tahun tertutup (jarang, mis. koreksi transaksi lama) ditulis sebagai generasi
+    file baru. Manifest JSON mencatat tahun pertama yang masih terbuka (`batas`) dan, per tahun, file,
+    generasi, jumlah baris, id terbesar, rentang tanggal, serta mutasi bersih per akun, sehingga saldo
+    penutup setiap tahun didapat tanpa membuka snapshot. Dipakai bersama antar proses (kunci file, manifest
+    ditulis atomik); setiap pembacaan manifest hanya butuh satu stat jika file tidak berubah.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.path_manifest = os.path.join(folder, "manifest.json")
+        self._manifest = (None, {'batas': None, 'tahun': {}})  # (identitas file, isi)
+
+    def kunci(self, eksklusif=False):
+        return _kunci_file(self.path_manifest, eksklusif)
+
+    def manifest(self):
+        """{'batas': tahun pertama yang terbuka atau None, 'tahun': {tahun: entri}}; jangan diubah di tempat."""
+        identitas = _identitas_file(self.path_manifest)
+        if identitas != self._manifest[0]:
+            isi = {'batas': None, 'tahun': {}}
+            if identitas is not None:
+                try:
+                    with open(self.path_manifest) as f:
+                        data = json.load(f)
+                    if data.get('schema_version') == ARSIP_SCHEMA_VERSION:
+                        isi = {'batas': data['batas'], 'tahun': {int(t): e for t, e in data['tahun'].items()}}
+                    else:
+                        logger.warning("Arsip %s berbeda versi dan akan dibangun ulang", self.folder)
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning("Manifest arsip %s tidak bisa dibaca: %s", self.path_manifest, e)
+            self._manifest = (identitas, isi)
+        return self._manifest[1]
+
+    def awal_panas(self):
+        """Tanggal pertama tahun buku yang masih terbuka, atau None jika belum ada tahun yang ditutup."""
+        batas = self.manifest()['batas']
+        return None if batas is None else datetime(batas, 1, 1).date()
+
+    def jumlah_baris(self):
+        return sum(entri['jumlah_baris'] for entri in self.manifest()['tahun'].values())
+
+    def id_maks(self):
+        return max((entri['id_maks'] for entri in self.manifest()['tahun'].values()), default=0)
+
+    def saldo_penutup(self, tahun):
+        """{akun: saldo} pada akhir `tahun`: jumlah mutasi bersih semua tahun tertutup sampai `tahun`."""
+        saldo = {}
+        for t, entri in self.manifest()['tahun'].items():
+            if t <= tahun:
+                for akun, mutasi in entri['mutasi'].items():
+                    saldo[akun] = saldo.get(akun, 0) + mutasi
+        return saldo
+
+    def muat(self, tahun, kolom=None):
+        """DataFrame satu tahun tertutup (atau hanya `kolom`), atau None jika tidak ada, hilang, atau rusak."""
+        entri = self.manifest()['tahun'].get(tahun)
+        if entri is None:
+            return None
+        try:
+            table = pq.read_table(os.path.join(self.folder, entri['file']), columns=kolom)
+        except (pa.ArrowException, OSError) as e:
+            logger.warning("Snapshot arsip %s tidak bisa dibaca: %s", entri['file'], e)
+            return None
+        if table.num_rows != entri['jumlah_baris']:
+            logger.warning("Snapshot arsip %s berisi %d baris, manifest %d", entri['file'], table.num_rows, entri['jumlah_baris'])
+            return None
+        return table.to_pandas()
+
+    def perbarui(self, perubahan, batas=None, ganti=False, ambil_ulang=None):
+        """
+        Menerapkan {tahun: (upserts, ids_buang)} ke partisi tahun tertutup lalu mengganti manifest secara atomik.
+        Isi terbaru setiap tahun dibaca di dalam kunci, sehingga perubahan proses lain tidak tertimpa; tahun
+        yang isinya tidak berubah tidak ditulis ulang, dan tahun yang menjadi kosong dihapus dari arsip.
+        `ganti=True` mengabaikan isi lama (upserts adalah isi lengkap tahun itu). Jika snapshot lama rusak,
+        isinya diambil dengan `ambil_ulang(tahun)`. `batas` memajukan tahun pertama yang masih terbuka.
+        """
+        with self.kunci(eksklusif=True):
+            manifest = self.manifest()
+            entri_baru, dibuang = dict(manifest['tahun']), []
+            for tahun, (upserts, ids_buang) in sorted(perubahan.items()):
+                lama = self.muat(tahun) if tahun in manifest['tahun'] else None
+                if lama is None and tahun in manifest['tahun'] and not ganti and ambil_ulang is not None:
+                    lama = ambil_ulang(tahun)
+                if COL_PEMILIK in upserts.columns:
+                    upserts = upserts.drop(columns=COL_PEMILIK)
+                id_upsert = set(upserts['id']) if not upserts.empty else set()
+                if lama is not None and not ganti:
+                    mask_buang = lama['id'].isin(list(set(ids_buang) | id_upsert)).to_numpy()
+                    # Tidak berubah jika tidak ada yang dihapus dan setiap upsert sama persis dengan baris lamanya.
+                    dihapus = lama['id'][mask_buang].isin(list(set(ids_buang) - id_upsert)).any()
+                    if not dihapus and _sama_isi(lama[mask_buang], upserts):
+                        continue
+                    sisa = lama[~mask_buang]
+                else:
+                    sisa = None
+                baru = _gabung_frame([f for f in (sisa, upserts) if f is not None])
+                if not baru.empty:
+                    baru = baru.sort_values(['tanggal', 'id'], ascending=False).reset_index(drop=True)
+                if ganti and lama is not None and _sama_isi(lama, baru):
+                    continue
+                if tahun in manifest['tahun']:
+                    dibuang.append(manifest['tahun'][tahun]['file'])
+                    del entri_baru[tahun]
+                if not baru.empty:
+                    generasi = manifest['tahun'].get(tahun, {}).get('generasi', 0) + 1
+                    entri_baru[tahun] = self._tulis_snapshot(tahun, baru, generasi)
+            batas_baru = max(b for b in (batas, manifest['batas'], 0) if b is not None) or None
+            if entri_baru == manifest['tahun'] and batas_baru == manifest['batas']:
+                return
+            data = {'schema_version': ARSIP_SCHEMA_VERSION, 'batas': batas_baru, 'tahun': {str(t): e for t, e in sorted(entri_baru.items())}}
+            sementara = f"{self.path_manifest}.{os.getpid()}.tmp"
+            with open(sementara, 'w') as f:
+                json.dump(data, f, indent=1)
+            os.replace(sementara, self.path_manifest)
+            for nama in dibuang:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(self.folder, nama))
+
+    def _tulis_snapshot(self, tahun, df, generasi):
+        """Menulis snapshot satu tahun (file baru, atomik) dan mengembalikan entri manifestnya."""
+        nama = f"{tahun}.g{generasi}.parquet"
+        path = os.path.join(self.folder, nama)
+        sementara = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(self.folder, exist_ok=True)
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), sementara, compression="zstd")
+        os.replace(sementara, path)
+        nominal = df[COL_NOMINAL].to_numpy()
+        mutasi = np.where(df['jenis'] == JENIS_PEMASUKAN, nominal, np.where(df['jenis'] == JENIS_PENGELUARAN, -nominal, 0))
+        per_akun = pd.Series(mutasi, index=df['akun'].astype(str)).groupby(level=0).sum()
+        return {
+            'file': nama, 'generasi': generasi, 'jumlah_baris': len(df), 'id_maks': int(df['id'].max()),
+            'tanggal_min': df['tanggal'].min().date().isoformat(), 'tanggal_maks': df['tanggal'].max().date().isoformat(),
+            'mutasi': {akun: int(nilai) for akun, nilai in per_akun.items()},
+        }
@@ -0,0 +1,279 @@
+# ===================================================================================
+# --- LAPISAN KUERI ANALITIK & INDEKS AGREGAT ---
+# ===================================================================================
+import functools
+import threading
+
+import numpy as np
+import pandas as pd
+
+from cashflow.konstanta import AMBANG_DUCKDB, COL_NOMINAL, JENIS_PEMASUKAN, JENIS_PENGELUARAN
+from cashflow.ledger.muat import _gabung_frame
+
+@functools.cache
+def _duckdb():
+    """Modul DuckDB (opsional), atau None jika tidak terpasang; lapisan kueri analitik lalu memakai pandas."""
+    try:
+        import duckdb
+    except ImportError:
+        return None
+    return duckdb
+
+class KueriLedger:
+    """
+    Lapisan kueri analitik di atas DataFrame ledger: agregasi dengan rentang tanggal, filter dimensi,
+    group-by, dan ukuran. Dijalankan oleh DuckDB (vektor & multi-thread, langsung memindai kolom
+    DataFrame tanpa salinan) bila tersedia dan data cukup besar; selain itu oleh pandas.
+    Kedua mesin menghasilkan frame yang identik: kolom `kelompok` lalu `ukuran`, terurut per kelompok.
+    """
+    # Dimensi -> ekspresi SQL. jenis/kategori/akun dikembalikan dengan tipe kategori ledger.
+    DIMENSI = {
+        'hari': "CAST(tanggal AS DATE)", 'bulan': "month(tanggal)", 'tahun': "year(tanggal)",
+        'jenis': "jenis", 'kategori': "kategori", 'akun': "akun",
+    }
+    # Hanya kolom ini yang didaftarkan ke DuckDB; memindai kolom teks deskripsi membuat kueri jauh lebih lambat.
+    KOLOM = ['tanggal', 'jenis', 'kategori', 'akun', COL_NOMINAL]
+    # Ukuran: total nominal, banyak transaksi, rata-rata nominal, dan mutasi (Masuk positif, Keluar negatif).
+    UKURAN = ['total', 'jumlah', 'rata_rata', 'mutasi']
+
+    def __init__(self, df, mesin=None):
+        if mesin is None:
+            mesin = "duckdb" if _duckdb() is not None and len(df) >= AMBANG_DUCKDB else "pandas"
+        if mesin == "duckdb" and _duckdb() is None:
+            raise RuntimeError("DuckDB tidak terpasang; gunakan mesin 'pandas'.")
+        self.df = df
+        self.mesin = mesin
+        self._con = None
+        self._lock = threading.Lock()  # koneksi DuckDB tidak aman dipakai bersamaan
+
+    def agregasi(self, tgl_awal=None, tgl_akhir=None, saring=None, kelompok=(), ukuran=('total',)):
+        """
+        Parameter:
+        - tgl_awal, tgl_akhir: date/None, rentang inklusif.
+        - saring: {dimensi: daftar nilai} (mis. {'akun': ['BCA'], 'tahun': [2024]}).
+        - kelompok: daftar dimensi untuk group-by (kosong = satu baris total).
+        - ukuran: daftar ukuran dari KueriLedger.UKURAN.
+        """
+        saring, kelompok, ukuran = dict(saring or {}), list(kelompok), list(ukuran)
+        for dimensi in list(saring) + kelompok:
+            if dimensi not in self.DIMENSI:
+                raise ValueError(f"Dimensi tidak dikenal: {dimensi}")
+        for nama in ukuran:
+            if nama not in self.UKURAN:
+                raise ValueError(f"Ukuran tidak dikenal: {nama}")
+        if self.mesin == "duckdb":
+            hasil = self._agregasi_duckdb(tgl_awal, tgl_akhir, saring, kelompok, ukuran)
+        else:
+            hasil = self._agregasi_pandas(tgl_awal, tgl_akhir, saring, kelompok, ukuran)
+        return self._rapikan(hasil, kelompok, ukuran)
+
+    def _kolom(self, df, dimensi):
+        if dimensi == 'hari':
+            return df['tanggal'].to_numpy().astype('datetime64[D]')
+        if dimensi in ('bulan', 'tahun'):
+            return getattr(df['tanggal'].dt, 'month' if dimensi == 'bulan' else 'year').to_numpy()
+        return df[dimensi].array
+
+    def _agregasi_pandas(self, tgl_awal, tgl_akhir, saring, kelompok, ukuran):
+        df = self.df
+        mask = np.ones(len(df), dtype=bool)
+        if tgl_awal is not None:
+            mask &= (df['tanggal'] >= pd.Timestamp(tgl_awal)).to_numpy()
+        if tgl_akhir is not None:
+            mask &= (df['tanggal'] < pd.Timestamp(tgl_akhir) + pd.Timedelta(days=1)).to_numpy()
+        for dimensi, nilai in saring.items():
+            mask &= pd.Series(self._kolom(df, dimensi)).isin(list(nilai)).to_numpy()
+        df = df[mask]
+        nominal = df[COL_NOMINAL].to_numpy()
+        data = pd.DataFrame({dimensi: self._kolom(df, dimensi) for dimensi in kelompok}, index=pd.RangeIndex(len(df)))
+        data['jumlah'] = 1
+        if 'total' in ukuran or 'rata_rata' in ukuran:
+            data['total'] = nominal
+        if 'mutasi' in ukuran:
+            masuk, keluar = (df['jenis'] == JENIS_PEMASUKAN).to_numpy(), (df['jenis'] == JENIS_PENGELUARAN).to_numpy()
+            data['mutasi'] = np.where(masuk, nominal, np.where(keluar, -nominal, 0))
+        if not kelompok:
+            return data.sum().to_frame().T
+        return data.groupby(kelompok, sort=False, observed=True).sum().reset_index()
+
+    def _agregasi_duckdb(self, tgl_awal, tgl_akhir, saring, kelompok, ukuran):
+        pilih, parameter = [f"{self.DIMENSI[d]} AS {d}" for d in kelompok] + ["COUNT(*) AS jumlah"], []
+        nominal = f'"{COL_NOMINAL}"'
+        if 'total' in ukuran or 'rata_rata' in ukuran:
+            pilih.append(f"CAST(COALESCE(SUM({nominal}), 0) AS BIGINT) AS total")
+        if 'mutasi' in ukuran:
+            pilih.append(f"CAST(COALESCE(SUM(CASE jenis WHEN ? THEN {nominal} WHEN ? THEN -{nominal} ELSE 0 END), 0) AS BIGINT) AS mutasi")
+            parameter.extend([JENIS_PEMASUKAN, JENIS_PENGELUARAN])
+        syarat = []
+        if tgl_awal is not None:
+            syarat.append("tanggal >= ?")
+            parameter.append(pd.Timestamp(tgl_awal).to_pydatetime())
+        if tgl_akhir is not None:
+            syarat.append("tanggal < ?")
+            parameter.append((pd.Timestamp(tgl_akhir) + pd.Timedelta(days=1)).to_pydatetime())
+        for dimensi, nilai in saring.items():
+            nilai = list(nilai)
+            if nilai:
+                syarat.append(f"{self.DIMENSI[dimensi]} IN ?")  # satu parameter list: jauh lebih cepat pada kolom ENUM
+                parameter.append(nilai)
+            else:
+                syarat.append("FALSE")
+        sql = f"SELECT {', '.join(pilih)} FROM ledger"
+        if syarat:
+            sql += " WHERE " + " AND ".join(syarat)
+        if kelompok:
+            sql += " GROUP BY " + ", ".join(kelompok)
+        with self._lock:
+            if self._con is None:
+                self._con = _duckdb().connect()
+                self._con.register("ledger", self.df[self.KOLOM])
+            return self._con.execute(sql, parameter).df()
+
+    def _rapikan(self, hasil, kelompok, ukuran):
+        """Menyamakan tipe & urutan hasil kedua mesin."""
+        hasil = hasil[hasil['jumlah'] > 0] if kelompok else hasil
+        hasil = hasil.copy()
+        for dimensi in kelompok:
+            if dimensi == 'hari':
+                hasil[dimensi] = hasil[dimensi].astype('datetime64[s]')
+            elif dimensi in ('bulan', 'tahun'):
+                hasil[dimensi] = hasil[dimensi].astype('int64')
+            else:
+                hasil[dimensi] = hasil[dimensi].astype(self.df[dimensi].dtype)
+        for nama in ['total', 'jumlah', 'mutasi']:
+            if nama in hasil:
+                hasil[nama] = hasil[nama].astype('int64')
+        if 'rata_rata' in ukuran:
+            hasil['rata_rata'] = hasil['total'] / hasil['jumlah'].where(hasil['jumlah'] > 0)
+        if kelompok:
+            hasil = hasil.sort_values(kelompok, kind='stable')
+        return hasil[kelompok + ukuran].reset_index(drop=True)
+
+class SaldoIndex:
+    """
+    Indeks saldo berjalan per akun untuk query saldo per tanggal.
+    Untuk setiap akun disimpan array tanggal unik (terurut), jumlah transaksi per tanggal, dan saldo
+    kumulatif sampai akhir tanggal tersebut. Saldo per tanggal cukup dicari dengan binary search.
+    Perubahan data diterapkan hanya pada akun dan tanggal yang tersentuh.
+    """
+
+    def __init__(self):
+        self._seri = {}  # akun -> (tanggal datetime64[D], jumlah_transaksi, saldo_kumulatif)
+
+    @staticmethod
+    def _harian(df):
+        """Mengelompokkan mutasi (Masuk positif, Keluar negatif) per akun dan per tanggal."""
+        if df.empty:
+            return pd.DataFrame(columns=['akun', 'hari', 'mutasi', 'jumlah'])
+        return KueriLedger(df).agregasi(
+            saring={'jenis': [JENIS_PEMASUKAN, JENIS_PENGELUARAN]}, kelompok=['akun', 'hari'], ukuran=['mutasi', 'jumlah'],
+        )
+
+    def bangun(self, df):
+        harian = self._harian(df)
+        self._seri = {
+            akun: (grup['hari'].to_numpy(), grup['jumlah'].to_numpy(), grup['mutasi'].to_numpy().cumsum())
+            for akun, grup in harian.groupby('akun', sort=False, observed=True)
+        }
+
+    def terapkan(self, dihapus, ditambah):
+        harian_lama, harian_baru = self._harian(dihapus), self._harian(ditambah)
+        harian_lama[['mutasi', 'jumlah']] *= -1
+        delta = pd.concat([harian_lama, harian_baru], ignore_index=True)
+        seri = dict(self._seri)
+        for akun, grup in delta.groupby('akun', sort=False, observed=True):
+            hari, jumlah, kumulatif = seri.get(akun, (np.array([], dtype='datetime64[D]'), np.array([], dtype=int), np.array([])))
+            mutasi = np.diff(kumulatif, prepend=0) if len(kumulatif) else kumulatif
+            gabungan = (
+                pd.concat([
+                    pd.DataFrame({'hari': hari, 'mutasi': mutasi, 'jumlah': jumlah}),
+                    grup[['hari', 'mutasi', 'jumlah']],
+                ], ignore_index=True)
+                .groupby('hari', sort=True).sum()
+            )
+            gabungan = gabungan[gabungan['jumlah'] > 0]
+            if gabungan.empty:
+                seri.pop(akun, None)
+            else:
+                seri[akun] = (gabungan.index.to_numpy().astype('datetime64[D]'), gabungan['jumlah'].to_numpy(),
+                              gabungan['mutasi'].to_numpy().cumsum())
+        self._seri = seri  # ditukar sekaligus agar pembaca tidak melihat keadaan setengah jadi
+
+    def saldo_per(self, tanggal):
+        """Mengembalikan {akun: saldo} untuk semua transaksi sampai dengan `tanggal` (inklusif)."""
+        batas = np.datetime64(tanggal, 'D')
+        saldo = {}
+        for akun, (hari, _, kumulatif) in self._seri.items():
+            posisi = np.searchsorted(hari, batas, side='right')
+            if posisi:
+                saldo[akun] = kumulatif[posisi - 1]
+        return saldo
+
+class RollupCube:
+    """
+    Ringkasan (jumlah nominal dan banyak transaksi) pada granularitas hari x jenis x kategori x akun.
+    Query rentang tanggal cukup menjumlahkan potongan kecil cube (terurut per hari), sehingga biaya
+    dashboard bergantung pada jumlah hari dan kategori, bukan jumlah transaksi.
+    """
+    DIMENSI = ['hari', 'jenis', 'kategori', 'akun']
+
+    def __init__(self):
+        self._cube = (pd.DataFrame(columns=self.DIMENSI + ['total', 'jumlah']), np.array([], dtype='datetime64[D]'))
+
+    @classmethod
+    def _agregasi(cls, df):
+        if df.empty:
+            return pd.DataFrame(columns=cls.DIMENSI + ['total', 'jumlah'])
+        return KueriLedger(df).agregasi(kelompok=cls.DIMENSI, ukuran=['total', 'jumlah'])
+
+    def _pasang(self, cube):
+        cube = cube[cube['jumlah'] > 0].sort_values('hari', kind='stable').reset_index(drop=True)
+        self._cube = (cube, cube['hari'].to_numpy().astype('datetime64[D]'))  # ditukar sekaligus
+
+    def bangun(self, df):
+        self._pasang(self._agregasi(df))
+
+    def terapkan(self, dihapus, ditambah):
+        lama, baru = self._agregasi(dihapus), self._agregasi(ditambah)
+        lama[['total', 'jumlah']] *= -1
+        potongan = [c for c in (self._cube[0], lama, baru) if not c.empty]
+        if not potongan:
+            return
+        gabungan = pd.concat(potongan, ignore_index=True)
+        self._pasang(gabungan.groupby(self.DIMENSI, sort=False, observed=True).sum().reset_index())
+
+    def rentang_tanggal(self):
+        """Mengembalikan (tanggal_pertama, tanggal_terakhir) dari data, atau None jika kosong."""
+        hari = self._cube[1]
+        if not len(hari):
+            return None
+        return pd.Timestamp(hari[0]).date(), pd.Timestamp(hari[-1]).date()
+
+    def potong(self, tgl_awal, tgl_akhir):
+        """Mengembalikan baris cube untuk rentang tanggal [tgl_awal, tgl_akhir] lewat binary search."""
+        cube, hari = self._cube
+        awal = np.searchsorted(hari, np.datetime64(tgl_awal, 'D'), side='left')
+        akhir = np.searchsorted(hari, np.datetime64(tgl_akhir, 'D'), side='right')
+        return cube.iloc[awal:akhir]
+
+    def total_per_kategori(self, tgl_awal, tgl_akhir, jenis, kecuali_kategori=()):
+        """Total nominal per kategori (terurut menurun) untuk satu jenis transaksi pada rentang tanggal."""
+        potongan = self.potong(tgl_awal, tgl_akhir)
+        potongan = potongan[(potongan['jenis'] == jenis) & ~potongan['kategori'].isin(kecuali_kategori)]
+        return potongan.groupby('kategori', observed=True)['total'].sum().sort_values(ascending=False)
+
+    def mutasi_per_akun(self, tgl_awal, tgl_akhir):
+        """{akun: mutasi bersih} (Masuk positif, Keluar negatif) pada rentang tanggal."""
+        potongan = self.potong(tgl_awal, tgl_akhir)
+        tanda = np.where(potongan['jenis'] == JENIS_PEMASUKAN, 1, np.where(potongan['jenis'] == JENIS_PENGELUARAN, -1, 0))
+        mutasi = (potongan['total'] * tanda).groupby(potongan['akun'], observed=True).sum()
+        return {akun: int(nilai) for akun, nilai in mutasi.items() if nilai}
+
+    @classmethod
+    def gabung(cls, cubes):
+        """Cube baru dari beberapa cube dengan hari yang tidak beririsan (mis. partisi tahun yang berbeda)."""
+        gabungan = cls()
+        frames = [cube._cube[0] for cube in cubes if not cube._cube[0].empty]
+        if frames:
+            gabungan._pasang(_gabung_frame(frames))
+        return gabungan
@@ -0,0 +1,209 @@
+# ===================================================================================
+# --- MIRROR LOKAL LEDGER (ARROW IPC) ---
+# ===================================================================================
+import contextlib
+import json
+import logging
+import os
+import time
+import zlib
+try:
+    import fcntl  # Tidak ada di Windows: mirror tetap dipakai, tetapi tanpa kunci antar proses.
+except ImportError:
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from cashflow.konstanta import COL_NOMINAL, KOLOM_WAJIB, MIRROR_PATH, MIRROR_SCHEMA_VERSION, MIRROR_UMUR_MAKS
+
+logger = logging.getLogger(__name__)
+
+@contextlib.contextmanager
+def _kunci_file(path, eksklusif=False):
+    """Kunci antar proses (flock pada `path.lock`): eksklusif untuk menulis, bersama untuk membaca."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.lock", 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX if eksklusif else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def _identitas_file(path):
+    """Penanda murah (inode, mtime, ukuran) yang berubah setiap kali file ditulis ulang, atau None."""
+    try:
+        st_file = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st_file.st_ino, st_file.st_mtime_ns, st_file.st_size)
+
+class LedgerMirror:
+    """
+    Salinan tabel Cashflow yang sudah bersih di disk (format Arrow IPC), dibaca secara memory-mapped.
+    Metadata skema menyimpan versi format, watermark sinkronisasi, jumlah baris, dan waktu simpan;
+    checksum CRC32 seluruh file disimpan terpisah (`.crc32`). Dengan begitu mirror yang rusak
+    atau basi bisa dikenali lalu dibangun ulang dari database.
+
+    Mirror juga menjadi cache bersama antar proses Streamlit di satu mesin (letakkan di /dev/shm agar
+    berupa segmen shared memory). Setiap penulisan menaikkan `generasi` dan mencatat id yang berubah
+    (`riwayat`), sehingga proses lain cukup memeriksa identitas file (satu stat) tiap request lalu
+    menyusul dengan membaca baris yang berubah saja. Tulis dan baca dilindungi kunci file (flock).
+    """
+
+    def __init__(self, path=MIRROR_PATH, umur_maks=MIRROR_UMUR_MAKS):
+        self.path = path
+        self.umur_maks = umur_maks
+
+    def kunci(self, eksklusif=False):
+        """Kunci antar proses: eksklusif untuk menulis, bersama untuk membaca."""
+        return _kunci_file(self.path, eksklusif)
+
+    def identitas(self):
+        """Penanda murah (inode, mtime, ukuran) yang berubah setiap kali mirror ditulis ulang, atau None."""
+        return _identitas_file(self.path)
+
+    @staticmethod
+    def _urai_meta(metadata):
+        meta = {k.decode(): v.decode() for k, v in (metadata or {}).items()}
+        return {
+            **meta,
+            'max_id': int(meta['max_id']),
+            'max_updated_at': meta['max_updated_at'] or None,
+            'generasi': int(meta.get('generasi', 0)),
+            'riwayat': json.loads(meta.get('riwayat', "[]")),
+            'disinkron_pada': float(meta.get('disinkron_pada') or 0),
+        }
+
+    def muat(self):
+        """
+        Mengembalikan (df, meta) dari mirror, atau None jika tidak ada, berbeda versi, basi, atau rusak.
+        `meta` berisi max_id, max_updated_at, generasi, riwayat, disinkron_pada, dan identitas file.
+        Mirror yang tidak bisa dipakai langsung dihapus.
+        """
+        with self.kunci():
+            identitas = self.identitas()
+            if identitas is None:
+                return None
+            try:
+                with pa.memory_map(self.path) as source:
+                    if f"{zlib.crc32(source.read_buffer()):08x}" != self._baca_checksum():
+                        raise ValueError("checksum tidak cocok")
+                    table = pa.ipc.open_file(source).read_all()
+                table.validate(full=True)
+                meta = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+                masalah = self._periksa(table, meta)
+                if masalah is None:
+                    return table.to_pandas(), {**self._urai_meta(table.schema.metadata), 'identitas': identitas}
+            except (pa.ArrowException, OSError, KeyError, ValueError) as e:
+                masalah = f"tidak bisa dibaca ({e})"
+        logger.warning("Mirror %s diabaikan: %s", self.path, masalah)
+        with self.kunci(eksklusif=True):
+            if self.identitas() == identitas:  # jangan hapus mirror baru yang sempat ditulis proses lain
+                self.hapus()
+        return None
+
+    def baca_meta(self):
+        """Metadata mirror saat ini tanpa membaca isinya (hanya footer Arrow), atau None. Dipanggil dengan kunci."""
+        try:
+            with pa.memory_map(self.path) as source:
+                meta = self._urai_meta(pa.ipc.open_file(source).schema.metadata)
+        except (pa.ArrowException, OSError, KeyError, ValueError):
+            return None
+        return meta if int(meta.get('schema_version', -1)) == MIRROR_SCHEMA_VERSION else None
+
+    def ambil_baris(self, ids=None):
+        """
+        Baris mirror untuk `ids` (semua baris jika None). Filter dijalankan langsung pada data memory-mapped,
+        jadi hanya baris terpilih yang dikonversi ke pandas. Dipanggil dengan kunci.
+        """
+        with pa.memory_map(self.path) as source:
+            table = pa.ipc.open_file(source).read_all()
+            if 'id' not in table.column_names:
+                return pd.DataFrame()
+            if ids is not None:
+                table = table.filter(pc.is_in(table['id'], value_set=pa.array(sorted(ids), pa.int64())))
+            return table.replace_schema_metadata(None).to_pandas()
+
+    def _periksa(self, table, meta):
+        """Mengembalikan alasan mirror tidak layak dipakai, atau None jika valid."""
+        if int(meta.get('schema_version', -1)) != MIRROR_SCHEMA_VERSION:
+            return f"versi skema {meta.get('schema_version')} != {MIRROR_SCHEMA_VERSION}"
+        if time.time() - float(meta['disimpan_pada']) > self.umur_maks:
+            return "mirror basi"
+        if table.num_rows != int(meta['jumlah_baris']):
+            return f"jumlah baris {table.num_rows} != {meta['jumlah_baris']}"
+        if table.num_rows and not set(KOLOM_WAJIB) <= set(table.column_names):
+            return "kolom wajib tidak lengkap"
+        if table.num_rows and not pa.types.is_timestamp(table.schema.field('tanggal').type):
+            return "tipe kolom tanggal tidak sesuai"
+        if table.num_rows and table.schema.field(COL_NOMINAL).type != pa.int64():
+            return "tipe kolom nominal tidak sesuai"
+        return None
+
+    def simpan(self, df, max_id, max_updated_at, generasi=0, riwayat=(), disinkron_pada=None):
+        """
+        Menulis mirror secara atomik (file sementara lalu os.replace). Dipanggil dengan kunci eksklusif.
+        Checksum file baru diganti lebih dulu, baru kemudian file datanya: jika proses mati di antara
+        keduanya, file lama bertemu checksum baru sehingga mirror ditolak saat dimuat dan dibangun ulang;
+        tidak ada urutan crash yang membuat file data tanpa checksum yang cocok dianggap valid.
+        """
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({
+            'schema_version': str(MIRROR_SCHEMA_VERSION),
+            'max_id': str(max_id),
+            'max_updated_at': max_updated_at or "",
+            'jumlah_baris': str(len(df)),
+            'disimpan_pada': str(time.time()),
+            'generasi': str(generasi),
+            'riwayat': json.dumps(list(riwayat)),
+            'disinkron_pada': str(disinkron_pada or ""),
+        })
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        sementara = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with pa.OSFile(sementara, 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            with pa.memory_map(sementara) as source:
+                checksum = f"{zlib.crc32(source.read_buffer()):08x}"
+            self._tulis_checksum(checksum)
+            os.replace(sementara, self.path)
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(sementara)
+
+    def _tulis_checksum(self, checksum):
+        """Mengganti file `.crc32` secara atomik, agar checksum tidak pernah terbaca setengah tertulis."""
+        sementara = f"{self.path}.crc32.{os.getpid()}.tmp"
+        with open(sementara, 'w') as f:
+            f.write(checksum)
+        os.replace(sementara, f"{self.path}.crc32")
+
+    def _baca_checksum(self):
+        try:
+            with open(f"{self.path}.crc32") as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def hapus(self):
+        for path in (self.path, f"{self.path}.crc32"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+def _sama_isi(a, b):
+    """True jika dua kumpulan baris berisi nilai KOLOM_WAJIB yang sama (urutan baris tidak berpengaruh)."""
+    if len(a) != len(b):
+        return False
+    if a.empty:
+        return True
+    a, b = a.sort_values('id'), b.sort_values('id')
+    return all(np.array_equal(a[kolom].to_numpy(), b[kolom].to_numpy()) for kolom in KOLOM_WAJIB)
@@ -0,0 +1,134 @@
+# ===================================================================================
+# --- PEMBERSIHAN & PENGAMBILAN DATA DARI SUPABASE ---
+# ===================================================================================
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from cashflow.konstanta import (
+    COL_NOMINAL,
+    JENIS_PEMASUKAN,
+    JENIS_PENGELUARAN,
+    JUMLAH_WORKER_FETCH,
+    KATEGORI_PEMASUKAN,
+    KATEGORI_PENGELUARAN,
+    PILIHAN_AKUN,
+    UKURAN_BATCH_ID,
+    UKURAN_HALAMAN_FETCH,
+)
+from cashflow.metrik import _eksekusi
+
+logger = logging.getLogger(__name__)
+
+# Tipe kategori dibangun dari konstanta agar kode kategori konsisten antar halaman, delta, dan mirror.
+# Nilai lama di database yang tidak ada di konstanta tetap dipertahankan (ditambahkan di belakang).
+KATEGORI_DASAR = {
+    'jenis': [JENIS_PEMASUKAN, JENIS_PENGELUARAN],
+    'kategori': sorted(set(KATEGORI_PEMASUKAN) | set(KATEGORI_PENGELUARAN)),
+    'akun': PILIHAN_AKUN,
+}
+
+def _tipe_kategori(kolom, nilai_lain=()):
+    """CategoricalDtype untuk kolom dimensi: kategori dasar dari konstanta + nilai lain yang ditemukan."""
+    dasar = KATEGORI_DASAR[kolom]
+    tambahan = sorted(set(nilai_lain) - set(dasar))
+    return pd.CategoricalDtype(dasar + tambahan)
+
+def _bersihkan_data(df):
+    """
+    Membersihkan dan mengonversi tipe data hasil query (dipakai untuk full reload maupun delta).
+    Skema ringkas: jenis/kategori/akun sebagai categorical, nominal sebagai int64 (rupiah utuh).
+    """
+    if df.empty:
+        return df
+    for col in KATEGORI_DASAR:
+        if col in df.columns:
+            nilai = df[col].str.strip()
+            df[col] = nilai.astype(_tipe_kategori(col, nilai.dropna().unique()))
+    df['tanggal'] = pd.to_datetime(df['tanggal'])
+    df[COL_NOMINAL] = pd.to_numeric(df[COL_NOMINAL]).round().astype('int64')
+    return df
+
+def _gabung_frame(frames):
+    """
+    Menggabungkan beberapa DataFrame ledger (mengabaikan yang kosong). Kolom categorical
+    disamakan dulu kategorinya agar hasil gabungan tetap categorical, bukan object.
+    """
+    frames = [f for f in frames if not f.empty]
+    if len(frames) <= 1:
+        return frames[0] if frames else pd.DataFrame()
+    for col in KATEGORI_DASAR:
+        tipe = [f[col].dtype for f in frames if col in f.columns]
+        if any(t != tipe[0] for t in tipe):
+            semua = set().union(*(f[col].dropna().unique() for f in frames if col in f.columns))
+            tipe_baru = _tipe_kategori(col, semua)
+            frames = [f.astype({col: tipe_baru}) if col in f.columns else f for f in frames]
+    return pd.concat(frames, ignore_index=True)
+
+def _ambil_tabel_berhalaman(buat_query, kolom="*", id_lebih_dari=None, id_maksimal=None, saring=None,
+                            ukuran_halaman=UKURAN_HALAMAN_FETCH, jumlah_worker=JUMLAH_WORKER_FETCH):
+    """
+    Mengambil tabel per halaman dengan keyset paging (`id > id_terakhir ORDER BY id LIMIT n`, bukan OFFSET).
+    `buat_query(kolom, **opsi)` mengembalikan query select (sudah tersaring ke partisi, jika ada).
+    - Request pertama mengambil hitungan baris dan id halaman pertama. Jika server mengembalikan lebih sedikit
+      dari `ukuran_halaman` padahal barisnya masih ada, batas max-rows server lebih kecil dan ukuran halaman
+      diturunkan ke batas itu, sehingga halaman pendek selalu berarti akhir data.
+    - Rentang [id_min, id_max] dibagi menjadi maksimal `jumlah_worker` jalur yang dibaca bersamaan. Setiap
+      jalur berjalan dengan keyset sampai menerima halaman pendek, jadi celah id yang lebar tidak
+      menghasilkan request kosong. Setiap halaman langsung diubah menjadi DataFrame (dan dibersihkan jika
+      `kolom` = "*") agar data mentah JSON tidak menumpuk di memori.
+    - Baris yang diterima bisa lebih sedikit dari hitungan awal jika ada baris yang dihapus selama pemuatan.
+      Hal ini hanya dicatat di log; sinkronisasi delta berikutnya membandingkan jumlah baris dengan server
+      dan merekonsiliasi selisihnya.
+    """
+    def query(pilih=kolom, **opsi):
+        q = buat_query(pilih, **opsi)
+        if id_lebih_dari is not None:
+            q = q.gt("id", id_lebih_dari)
+        if id_maksimal is not None:
+            q = q.lte("id", id_maksimal)
+        return saring(q) if saring else q
+
+    # 1. Hitungan baris, id terkecil, dan batas max-rows server yang sebenarnya.
+    awal = _eksekusi(query("id", count="exact").order("id").limit(ukuran_halaman), "select")
+    if not awal.data:
+        return pd.DataFrame()
+    if len(awal.data) < ukuran_halaman and awal.count is not None and len(awal.data) < awal.count:
+        logger.warning("ukuran_halaman %d melebihi batas max-rows server; memakai %d baris per halaman.",
+                       ukuran_halaman, len(awal.data))
+        ukuran_halaman = len(awal.data)
+    id_bawah = awal.data[0]['id']
+    id_atas = _eksekusi(query("id").order("id", desc=True).limit(1), "select").data[0]['id']
+
+    def ambil_jalur(setelah, sampai):
+        halaman = []
+        while True:
+            rows = _eksekusi(query().gt("id", setelah).lte("id", sampai).order("id").limit(ukuran_halaman), "select").data
+            if rows:
+                setelah = rows[-1]['id']
+                df = pd.DataFrame(rows)
+                halaman.append(_bersihkan_data(df) if kolom == "*" else df)
+            if len(rows) < ukuran_halaman or setelah >= sampai:
+                return _gabung_frame(halaman)
+
+    # 2. Jalur keyset paralel; tidak lebih banyak jalur daripada jumlah halaman yang diharapkan.
+    jumlah_jalur = max(1, min(jumlah_worker, -(-(awal.count or 1) // ukuran_halaman)))
+    lebar = -(-(id_atas - id_bawah + 1) // jumlah_jalur)
+    batas = [(id_bawah - 1 + i * lebar, min(id_bawah - 1 + (i + 1) * lebar, id_atas)) for i in range(jumlah_jalur)]
+    batas = [(bawah, atas) for bawah, atas in batas if bawah < atas]
+    with ThreadPoolExecutor(max_workers=len(batas)) as pool:
+        df = _gabung_frame(list(pool.map(lambda jalur: ambil_jalur(*jalur), batas)))
+
+    if awal.count is not None and len(df) < awal.count:
+        logger.warning("Hanya %d dari %d baris yang diterima (kemungkinan dihapus selama pemuatan); "
+                       "selisihnya direkonsiliasi pada sinkronisasi delta berikutnya.", len(df), awal.count)
+    return df
+
+def _ambil_berdasarkan_id(buat_query, ids):
+    """Mengambil baris tertentu berdasarkan id, dipecah per batch agar URL tetap pendek."""
+    ids = sorted(ids)
+    return _gabung_frame([
+        _bersihkan_data(pd.DataFrame(_eksekusi(buat_query("*").in_("id", ids[i:i + UKURAN_BATCH_ID]), "select").data))
+        for i in range(0, len(ids), UKURAN_BATCH_ID)
+    ])
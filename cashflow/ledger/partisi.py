@@ -0,0 +1,165 @@
+# ===================================================================================
+# --- PARTISI LEDGER PER PENGGUNA ---
+# ===================================================================================
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from cashflow.konstanta import BATAS_MEMORI_LEDGER, COL_PEMILIK
+from cashflow.metrik import metrik
+
+logger = logging.getLogger(__name__)
+
+def _saring_pemilik(query, pemilik):
+    """Membatasi query ke baris milik `pemilik`; tanpa pemilik (mode satu ledger) query tidak diubah."""
+    return query if pemilik is None else query.eq(COL_PEMILIK, pemilik)
+
+def _cap_pemilik(baris, pemilik):
+    """Menandai baris baru dengan pemilik partisi (hanya jika mode multi-pengguna aktif)."""
+    return baris if pemilik is None else [{**b, COL_PEMILIK: pemilik} for b in baris]
+
+def _sidik_pemilik(pemilik):
+    """Pengenal pendek pemilik untuk nama file mirror dan panel performa (tanpa menampilkan email)."""
+    return "bersama" if pemilik is None else hashlib.sha1(str(pemilik).encode()).hexdigest()[:12]
+
+class ManajerLedger:
+    """
+    Partisi LedgerSync per pemilik (rumah tangga). Setiap partisi punya data, mirror, indeks turunan, dan
+    cache per versinya sendiri, dan hanya memuat baris miliknya. Total byte semua partisi dibatasi
+    `batas_byte`: partisi yang paling lama tidak dipakai dikeluarkan (LRU) lalu dimuat ulang dari
+    mirror + delta saat dibutuhkan lagi. Mutasi hanya diterapkan ke partisi pemilik barisnya, sehingga
+    tulis dari satu pengguna tidak membatalkan cache pengguna lain.
+    Punya `terapkan_perubahan` dan `tandai_berubah` seperti LedgerSync, jadi antrean tulis bersama cukup
+    diberi manajer ini. Change feed berlangganan per pemilik lewat `sasaran_umpan(pemilik)`, sehingga feed
+    yang putus hanya mengembalikan partisi pemiliknya ke polling.
+    """
+
+    def __init__(self, buat_ledger, batas_byte=BATAS_MEMORI_LEDGER, kolom_pemilik=None):
+        self._buat_ledger = buat_ledger
+        self.batas_byte = batas_byte
+        self._kolom_pemilik = kolom_pemilik
+        self._lock = threading.Lock()
+        self._partisi = OrderedDict()  # pemilik -> LedgerSync, paling lama tidak dipakai di depan
+        self._tertunda = {}  # pemilik partisi yang dikeluarkan -> id yang berubah sejak itu
+        self._umpan_aktif = set()  # pemilik yang change feed-nya sedang tersambung
+        self.jumlah_dikeluarkan = 0
+
+    def ledger(self, pemilik=None):
+        """LedgerSync untuk `pemilik` (dibuat jika belum ada di memori), sekaligus menandainya baru dipakai."""
+        with self._lock:
+            ledger = self._partisi.get(pemilik)
+            if ledger is not None:
+                self._partisi.move_to_end(pemilik)
+                metrik.hitung("cache_total", lapisan="partisi", hasil="hit")
+                return ledger
+            metrik.hitung("cache_total", lapisan="partisi", hasil="miss")
+            ledger = self._buat_ledger(pemilik)
+            if pemilik in self._umpan_aktif:
+                ledger.atur_umpan(True)
+            if pemilik in self._tertunda:
+                ledger.tandai_berubah(self._tertunda.pop(pemilik))
+            self._partisi[pemilik] = ledger
+            return ledger
+
+    def intip(self, pemilik=None):
+        """LedgerSync untuk `pemilik` jika sedang di memori, tanpa membuatnya dan tanpa mengubah urutan LRU."""
+        return self._partisi.get(pemilik)
+
+    def tegakkan_batas(self, pemilik=None):
+        """
+        Mengeluarkan partisi yang paling lama tidak dipakai sampai total byte tidak melebihi batas.
+        Partisi `pemilik` (yang sedang melayani request) tidak pernah dikeluarkan.
+        """
+        with self._lock:
+            partisi = list(self._partisi.items())
+        ukuran = {p: ledger.ukuran_byte() for p, ledger in partisi}
+        total = sum(ukuran.values())
+        for p, ledger in partisi:
+            if total <= self.batas_byte:
+                break
+            if p == pemilik:
+                continue
+            with self._lock:
+                if self._partisi.get(p) is not ledger:
+                    continue
+                del self._partisi[p]
+                self._tertunda.setdefault(p, set())
+            total -= ukuran[p]
+            self.jumlah_dikeluarkan += 1
+            metrik.hitung("partisi_dikeluarkan_total")
+            logger.info("Partisi ledger %s (%d byte) dikeluarkan dari memori", _sidik_pemilik(p), ukuran[p])
+        if total > self.batas_byte:
+            logger.warning("Partisi ledger %s sendiri melebihi batas memori (%d > %d byte)", _sidik_pemilik(pemilik), total, self.batas_byte)
+        return total
+
+    def statistik(self):
+        """Byte, jumlah baris, dan versi setiap partisi di memori (paling lama tidak dipakai lebih dulu)."""
+        with self._lock:
+            partisi = list(self._partisi.items())
+        return [
+            {'pemilik': _sidik_pemilik(p), 'versi': ledger.snapshot()[0], 'baris': len(ledger.snapshot()[1]), 'byte': ledger.ukuran_byte()}
+            for p, ledger in partisi
+        ]
+
+    def terapkan_perubahan(self, baris=(), ids_dihapus=()):
+        """
+        Write-through yang diarahkan ke partisi pemilik setiap baris. Id baris milik partisi yang sudah
+        dikeluarkan dicatat dan diambil ulang saat partisi itu dimuat lagi. Event hapus umumnya hanya membawa id,
+        jadi diteruskan ke semua partisi; hanya partisi yang memuat id tersebut yang berubah versi.
+        """
+        per_pemilik = {}
+        for b in baris:
+            per_pemilik.setdefault(b.get(self._kolom_pemilik) if self._kolom_pemilik else None, []).append(b)
+        with self._lock:
+            partisi = dict(self._partisi)
+            for pemilik, kelompok in per_pemilik.items():
+                if pemilik not in partisi and pemilik in self._tertunda:
+                    self._tertunda[pemilik].update(b['id'] for b in kelompok)
+        for pemilik, kelompok in per_pemilik.items():
+            if pemilik in partisi:
+                partisi[pemilik].terapkan_perubahan(baris=kelompok)
+        if ids_dihapus:
+            for ledger in partisi.values():
+                ledger.terapkan_perubahan(ids_dihapus=ids_dihapus)
+
+    def tandai_berubah(self, ids=()):
+        with self._lock:
+            partisi = list(self._partisi.values())
+        for ledger in partisi:
+            ledger.tandai_berubah(ids)
+
+    def atur_umpan(self, aktif, pemilik=None):
+        """Status change feed milik `pemilik`; hanya partisi pemilik itu yang berhenti atau kembali polling."""
+        with self._lock:
+            if aktif:
+                self._umpan_aktif.add(pemilik)
+            else:
+                self._umpan_aktif.discard(pemilik)
+            ledger = self._partisi.get(pemilik)
+        if ledger is not None:
+            ledger.atur_umpan(aktif)
+
+    def sasaran_umpan(self, pemilik=None):
+        """Sasaran UmpanPerubahan untuk feed yang hanya membawa baris `pemilik` (lihat _SasaranUmpan)."""
+        return _SasaranUmpan(self, pemilik)
+
+class _SasaranUmpan:
+    """
+    Antarmuka LedgerSync untuk change feed satu pemilik: event tetap dirutekan lewat manajer (termasuk
+    pencatatan id untuk partisi yang sedang dikeluarkan), sedangkan status koneksi hanya berlaku untuk
+    partisi pemilik tersebut.
+    """
+
+    def __init__(self, manajer, pemilik):
+        self._manajer = manajer
+        self._pemilik = pemilik
+
+    def terapkan_perubahan(self, baris=(), ids_dihapus=()):
+        self._manajer.terapkan_perubahan(baris=baris, ids_dihapus=ids_dihapus)
+
+    def tandai_berubah(self, ids=()):
+        self._manajer.tandai_berubah(ids)
+
+    def atur_umpan(self, aktif):
+        self._manajer.atur_umpan(aktif, self._pemilik)
@@ -0,0 +1,677 @@
+# ===================================================================================
+# --- LEDGER TERSINKRON (DELTA SYNC) ---
+# ===================================================================================
+import itertools
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from cashflow.konstanta import (
+    BATAS_ID_RIWAYAT,
+    COL_PEMILIK,
+    COL_UPDATED_AT,
+    HARI_TENGGANG_TUTUP_BUKU,
+    INTERVAL_SINKRONISASI,
+    JUMLAH_TAHUN_DIMUAT,
+    JUMLAH_WORKER_FETCH,
+    KOLOM_WAJIB,
+    PANJANG_RIWAYAT_MIRROR,
+    TABEL_CASHFLOW,
+    UKURAN_CACHE_TAMPILAN,
+    UKURAN_HALAMAN_FETCH,
+)
+from cashflow.ledger.indeks import RollupCube
+from cashflow.ledger.muat import (
+    _ambil_berdasarkan_id,
+    _ambil_tabel_berhalaman,
+    _bersihkan_data,
+    _gabung_frame,
+)
+from cashflow.ledger.partisi import _saring_pemilik
+from cashflow.metrik import metrik, _eksekusi
+
+logger = logging.getLogger(__name__)
+
+# Nomor versi diambil dari satu penghitung untuk semua partisi, sehingga tetap unik meski partisi
+# dikeluarkan lalu dimuat ulang; cache yang dikunci dengan versi (mis. figur) tidak pernah tertukar.
+_VERSI_LEDGER = itertools.count(1)
+
+def _ukuran_byte(obj, terlihat=None):
+    """
+    Perkiraan byte yang ditempati `obj` beserta isinya (DataFrame/array/dict/atribut objek) di memori.
+    Objek yang sama hanya dihitung sekali, mis. DataFrame ledger yang juga dirujuk indeks turunan.
+    """
+    terlihat = set() if terlihat is None else terlihat
+    if id(obj) in terlihat:
+        return 0
+    terlihat.add(id(obj))
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(_ukuran_byte(k, terlihat) + _ukuran_byte(v, terlihat) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(_ukuran_byte(v, terlihat) for v in obj)
+    if hasattr(obj, '__dict__') and not isinstance(obj, type):
+        return sys.getsizeof(obj) + _ukuran_byte(vars(obj), terlihat)
+    return sys.getsizeof(obj)
+
+class LedgerSync:
+    """
+    Menyimpan salinan tabel Cashflow di memori dan menyinkronkannya secara inkremental.
+    - Baris baru diambil berdasarkan high-watermark `id` (hanya `id` > id terbesar yang sudah ada).
+    - Baris yang diedit diambil lewat kolom `updated_at` (jika ada) atau lewat id yang ditandai.
+    - Baris yang dihapus direkonsiliasi dengan membandingkan jumlah baris di server.
+    Full reload hanya dilakukan saat pertama kali (jika tidak ada mirror lokal yang valid) atau jika diminta.
+    Setiap perubahan data menaikkan `version`; DataFrame lama tidak pernah diubah di tempat.
+    Jika `pemilik` diisi, hanya baris milik rumah tangga tersebut yang diambil (satu partisi ManajerLedger).
+    Mirror dipakai sebagai cache bersama antar proses: perubahan diterbitkan ke mirror, dan setiap `get()`
+    menyusul generasi yang diterbitkan proses lain tanpa query ke database.
+    Dengan `arsip` (ArsipTahunan), tahun buku yang sudah ditutup dipindah ke snapshot per tahun: `snapshot()`
+    hanya berisi tahun yang masih terbuka, dan `lihat(tgl_awal, tgl_akhir)` memuat partisi tahun yang perlu saja.
+    """
+
+    def __init__(self, client, interval=INTERVAL_SINKRONISASI,
+                 ukuran_halaman=UKURAN_HALAMAN_FETCH, jumlah_worker=JUMLAH_WORKER_FETCH, mirror=None, pemilik=None,
+                 arsip=None):
+        self._client = client
+        self.pemilik = pemilik
+        self._mirror = mirror
+        self._arsip = arsip
+        self._tahun = OrderedDict()  # {tahun: (generasi, df, cube)} partisi tertutup yang dimuat (LRU)
+        self._id_arsip = {}  # {tahun: (generasi, id terurut)} untuk merutekan edit/hapus ke arsip
+        self._tampilan = OrderedDict()  # {(versi panas, ((tahun, generasi), ...)): (versi, df, cube)} (LRU)
+        self._interval = interval
+        self._ukuran_halaman = ukuran_halaman
+        self._jumlah_worker = jumlah_worker
+        self._lock = threading.Lock()
+        self._state = (0, pd.DataFrame())  # (version, df) ditukar sekaligus agar konsisten
+        self._max_id = None
+        self._max_updated_at = None
+        self._last_sync = None
+        self._ids_berubah = set()
+        self._perlu_sinkron = False
+        self._umpan_aktif = False
+        self._turunan = {}
+        self._cache_versi = {}
+        self._ukuran = (None, 0)  # (kunci keadaan, byte) hasil ukuran_byte() terakhir
+        self._generasi = 0  # generasi mirror yang sudah tercermin di ledger ini
+        self._identitas_mirror = None
+        self._disinkron_pada = None  # waktu (epoch) sinkronisasi database terakhir, oleh proses mana pun
+
+    def tambah_turunan(self, nama, indeks):
+        """
+        Mendaftarkan struktur turunan (mis. indeks saldo) yang dijaga tetap sinkron dengan ledger.
+        Objek harus punya `bangun(df)` dan `terapkan(baris_dihapus, baris_ditambah)`.
+        """
+        with self._lock:
+            if self._state[0]:
+                indeks.bangun(self._state[1])
+            self._turunan[nama] = indeks
+        return indeks
+
+    def turunan(self, nama):
+        return self._turunan[nama]
+
+    def per_versi(self, nama, versi, df, bangun):
+        """
+        Cache untuk struktur turunan yang dibangun malas: `bangun(versi, df)` hanya dipanggil ulang
+        jika versi data berubah, sehingga perubahan data hanya membatalkan cache versi lama.
+        """
+        tersimpan = self._cache_versi.get(nama)
+        if tersimpan is None or tersimpan[0] != versi:
+            metrik.hitung("cache_total", lapisan=f"per_versi:{nama}", hasil="miss")
+            with metrik.ukur("bangun_turunan_detik", nama=nama):
+                tersimpan = (versi, bangun(versi, df))
+            self._cache_versi[nama] = tersimpan
+        else:
+            metrik.hitung("cache_total", lapisan=f"per_versi:{nama}", hasil="hit")
+        return tersimpan[1]
+
+    def snapshot(self):
+        """Mengembalikan (version, df) terakhir tanpa menyentuh database."""
+        return self._state
+
+    def ukuran_byte(self):
+        """
+        Byte yang ditempati data, indeks turunan, dan cache per versi. Dihitung ulang hanya jika versi data
+        atau isi cache per versi berubah.
+        """
+        kunci = (self._state[0], tuple((nama, v[0]) for nama, v in self._cache_versi.items()),
+                 tuple((t, v[0]) for t, v in self._tahun.items()), tuple(v[0] for v in self._tampilan.values()))
+        if self._ukuran[0] != kunci:
+            terlihat = set()
+            byte = _ukuran_byte(self._state[1], terlihat) + _ukuran_byte(self._turunan, terlihat)
+            byte += sum(_ukuran_byte(v[1], terlihat) for v in list(self._cache_versi.values()))
+            byte += sum(_ukuran_byte(v[1:], terlihat) for v in list(self._tahun.values()) + list(self._tampilan.values()))
+            byte += sum(v[1].nbytes for v in list(self._id_arsip.values()))
+            self._ukuran = (kunci, byte)
+        return self._ukuran[1]
+
+    def get(self):
+        """
+        Mengembalikan (version, df) terkini, melakukan sinkronisasi delta jika sudah waktunya.
+        Selama change feed tersambung, sinkronisasi berkala tidak dijalankan: perubahan sudah didorong oleh feed.
+        Perubahan yang diterbitkan proses lain ke mirror bersama disusul lebih dulu (tanpa query).
+        """
+        with self._lock:
+            if self._last_sync is None:
+                metrik.hitung("cache_total", lapisan="ledger", hasil="miss")
+                with metrik.ukur("ledger_detik", tahap="muat_awal"):
+                    self._muat_awal()
+                return self._state
+            self._ikuti_mirror()
+            if self._perlu_sinkron or (not self._umpan_aktif and time.monotonic() - self._last_sync >= self._interval):
+                metrik.hitung("cache_total", lapisan="ledger", hasil="sinkron")
+                with metrik.ukur("ledger_detik", tahap="sinkron"):
+                    self._sync()
+            else:
+                metrik.hitung("cache_total", lapisan="ledger", hasil="hit")
+        return self._state
+
+    def full_reload(self):
+        """Memuat ulang seluruh tabel dan membangun ulang mirror serta arsip (hanya dipanggil atas permintaan)."""
+        with self._lock:
+            self._full_reload(semua=True)
+
+    # --- Partisi tahunan ---
+    def tahun_arsip(self):
+        """Tahun buku yang sudah ditutup dan diarsipkan, terbaru lebih dulu."""
+        return sorted(self._arsip.manifest()['tahun'], reverse=True) if self._arsip is not None else []
+
+    def rentang_tanggal(self):
+        """(tanggal terawal, tanggal terakhir) seluruh ledger termasuk tahun yang diarsipkan, atau None jika kosong."""
+        df = self._state[1]
+        rentang = [(df['tanggal'].min().date(), df['tanggal'].max().date())] if not df.empty else []
+        if self._arsip is not None:
+            for entri in self._arsip.manifest()['tahun'].values():
+                rentang.append((datetime.fromisoformat(entri['tanggal_min']).date(), datetime.fromisoformat(entri['tanggal_maks']).date()))
+        if not rentang:
+            return None
+        return min(awal for awal, _ in rentang), max(akhir for _, akhir in rentang)
+
+    def lihat(self, tgl_awal=None, tgl_akhir=None):
+        """
+        (versi, df) yang mencakup rentang tanggal (None = tanpa batas). Partisi dipangkas berdasarkan rentang:
+        jika tidak ada tahun tertutup yang beririsan, hasilnya sama dengan `snapshot()`; selain itu hanya
+        partisi tahun yang beririsan yang dimuat lalu digabung dengan partisi panas (yang dilewati jika rentang
+        berakhir sebelum tahun terbuka). Gabungan disimpan per rentang dengan versinya sendiri.
+        """
+        with self._lock:
+            if self._arsip is None:
+                return self._state
+            versi, panas = self._state
+            manifest = self._arsip.manifest()
+            tahun = sorted((t for t in manifest['tahun']
+                            if (tgl_awal is None or t >= tgl_awal.year) and (tgl_akhir is None or t <= tgl_akhir.year)), reverse=True)
+            if not tahun:
+                return self._state
+            pakai_panas = tgl_akhir is None or manifest['batas'] is None or tgl_akhir.year >= manifest['batas']
+            kunci = (versi if pakai_panas else None, tuple((t, manifest['tahun'][t]['generasi']) for t in tahun))
+            tersimpan = self._tampilan.get(kunci)
+            if tersimpan is None:
+                metrik.hitung("cache_total", lapisan="tampilan", hasil="miss")
+                bagian = [self._partisi_tahun(t) for t in tahun]
+                frames = ([panas] if pakai_panas else []) + [df for df, _ in bagian]
+                cubes = ([self._turunan['rollup']] if pakai_panas and 'rollup' in self._turunan else []) + [cube for _, cube in bagian]
+                tersimpan = self._tampilan[kunci] = (next(_VERSI_LEDGER), _gabung_frame(frames), RollupCube.gabung(cubes))
+                while len(self._tampilan) > UKURAN_CACHE_TAMPILAN:
+                    self._tampilan.popitem(last=False)
+            else:
+                metrik.hitung("cache_total", lapisan="tampilan", hasil="hit")
+                self._tampilan.move_to_end(kunci)
+            return tersimpan[0], tersimpan[1]
+
+    def berlaku(self, versi):
+        """True jika `versi` (dari snapshot() atau lihat()) masih mencerminkan data terkini."""
+        if versi == self._state[0]:
+            return True
+        if self._arsip is None:
+            return False
+        manifest = self._arsip.manifest()
+        for (versi_panas, tahun), tersimpan in list(self._tampilan.items()):
+            if tersimpan[0] == versi:
+                return versi_panas in (None, self._state[0]) and all(
+                    manifest['tahun'].get(t, {}).get('generasi') == generasi for t, generasi in tahun
+                )
+        return False
+
+    def rollup(self, versi):
+        """RollupCube untuk `versi` dari snapshot() atau lihat(); turunan "rollup" harus terdaftar."""
+        for tersimpan in list(self._tampilan.values()):
+            if tersimpan[0] == versi:
+                return tersimpan[2]
+        return self._turunan['rollup']
+
+    def saldo_per(self, tanggal):
+        """
+        Saldo per akun pada akhir `tanggal`: saldo penutup tahun tertutup terakhir sebelum tanggal itu,
+        ditambah mutasi sesudahnya (indeks saldo partisi panas, atau cube satu partisi tahun jika
+        `tanggal` jatuh di tahun yang sudah ditutup). Turunan "saldo" harus terdaftar.
+        """
+        indeks = self._turunan['saldo']
+        if self._arsip is None or self._arsip.awal_panas() is None:
+            return indeks.saldo_per(tanggal)
+        with self._lock:
+            manifest = self._arsip.manifest()
+            saldo = self._arsip.saldo_penutup(tanggal.year - 1)
+            if tanggal.year >= manifest['batas']:
+                mutasi = indeks.saldo_per(tanggal)
+            elif tanggal.year in manifest['tahun']:
+                mutasi = self._partisi_tahun(tanggal.year)[1].mutasi_per_akun(datetime(tanggal.year, 1, 1).date(), tanggal)
+            else:
+                mutasi = {}
+        for akun, nilai in mutasi.items():
+            saldo[akun] = saldo.get(akun, 0) + nilai
+        return saldo
+
+    def terapkan_perubahan(self, baris=(), ids_dihapus=()):
+        """
+        Write-through: menerapkan mutasi yang baru saja berhasil ditulis ke database (baris hasil
+        insert/update, atau id yang dihapus) langsung ke ledger tanpa query ulang.
+        Versi data naik, indeks turunan diperbarui secara inkremental, dan cache sesi lain tidak tersentuh.
+        Id hapus yang tidak ada di ledger ini diabaikan, sehingga versinya tidak berubah tanpa alasan.
+        Perubahan pada tahun buku yang sudah ditutup diteruskan ke arsip.
+        """
+        upserts = _bersihkan_data(pd.DataFrame(list(baris)))
+        with self._lock:
+            if self._last_sync is None:
+                # Belum pernah dimuat: baris yang berubah diambil ulang saat pemuatan pertama (mis. dari mirror).
+                self._ids_berubah.update(upserts['id'] if not upserts.empty else ())
+                return
+            df = self._state[1]
+            if self._arsip is not None:
+                ids_dihapus = list(ids_dihapus)  # bisa ada di arsip; disaring oleh _pisah_arsip
+            elif ids_dihapus and not df.empty:
+                ids_dihapus = df['id'][df['id'].isin(list(ids_dihapus))].tolist()
+            else:
+                ids_dihapus = []
+            if upserts.empty and not ids_dihapus:
+                return
+            # Watermark id tidak dimajukan: baris dari perangkat lain dengan id lebih kecil tetap terambil.
+            self._merge(upserts, ids_dihapus, majukan_watermark=False)
+
+    def atur_umpan(self, aktif):
+        """
+        Dipanggil pelanggan change feed saat tersambung atau terputus. Setiap pergantian status memicu
+        satu sinkronisasi delta untuk menutup celah event yang terlewat; saat terputus, sinkronisasi
+        berkala (polling) kembali berjalan.
+        """
+        with self._lock:
+            self._umpan_aktif = aktif
+            self._perlu_sinkron = True
+
+    def tandai_berubah(self, ids=()):
+        """Menandai id yang baru diedit dan memaksa sinkronisasi pada pemanggilan `get()` berikutnya."""
+        with self._lock:
+            self._ids_berubah.update(ids)
+            self._perlu_sinkron = True
+
+    # --- Query ke database ---
+    def _query(self, kolom="*", **opsi):
+        q = self._client.table(TABEL_CASHFLOW).select(kolom, **opsi)
+        return _saring_pemilik(q, self.pemilik)
+
+    def _fetch(self, **opsi):
+        return _ambil_tabel_berhalaman(
+            self._query, ukuran_halaman=self._ukuran_halaman, jumlah_worker=self._jumlah_worker, **opsi
+        )
+
+    # --- Logika sinkronisasi (dipanggil dengan lock) ---
+    def _muat_awal(self):
+        """
+        Cold start: pakai mirror jika valid lalu ambil delta saja, selain itu full reload. Jika mirror baru
+        saja disinkronkan proses lain (kurang dari `interval`), proses ini langsung memakainya tanpa query.
+        """
+        tersimpan = self._mirror.muat() if self._mirror else None
+        if tersimpan is not None and self._arsip is not None and self._arsip.awal_panas() is None:
+            # Arsip belum ada (atau hilang/beda versi): mirror tidak memuat tahun tertutup, jadi dibangun ulang dari database.
+            tersimpan = None
+        if self._mirror:
+            metrik.hitung("cache_total", lapisan="mirror", hasil="miss" if tersimpan is None else "hit")
+        if tersimpan is None:
+            self._full_reload()
+            return
+        df, meta = tersimpan
+        self._max_id, self._max_updated_at = meta['max_id'], meta['max_updated_at']
+        self._generasi, self._identitas_mirror = meta['generasi'], meta['identitas']
+        self._replace(df, urutkan=False, simpan_mirror=False)  # mirror sudah tersimpan terurut
+        umur = time.time() - meta['disinkron_pada']
+        if umur < self._interval and not self._perlu_sinkron and not self._ids_berubah:
+            self._disinkron_pada = meta['disinkron_pada']
+            self._last_sync = time.monotonic() - umur
+            self._tutup_tahun()
+            return
+        # Jika sinkronisasi gagal (mis. offline), data mirror tetap dipakai dan sinkron dicoba lagi.
+        self._last_sync = time.monotonic()
+        self._perlu_sinkron = True
+        self._sync()
+
+    def _full_reload(self, semua=False):
+        """
+        Mengambil ulang seluruh partisi panas (baris sejak awal tahun terbuka). `semua=True` mengambil seluruh
+        tabel dan membangun ulang arsip; sebelum arsip pertama kali dibuat, seluruh tabel selalu diambil.
+        """
+        awal = None if semua or self._arsip is None else self._arsip.awal_panas()
+        df = self._fetch(saring=(lambda q: q.gte('tanggal', awal.isoformat())) if awal is not None else None)
+        self._ids_berubah.clear()
+        self._last_sync = time.monotonic()
+        self._disinkron_pada = time.time()
+        self._perlu_sinkron = False
+        if self._arsip is not None:
+            df, _ = self._pisah_tahun_tertutup(df, ganti=semua)
+        self._replace(df)
+
+    def _sync(self):
+        df = self._state[1]
+        if self._max_id is None:
+            self._full_reload()
+            return
+
+        # 1. Baris baru di atas high-watermark, ditambah baris yang ditandai berubah.
+        delta = [self._fetch(id_lebih_dari=self._max_id)]
+        if self._ids_berubah:
+            delta.append(_ambil_berdasarkan_id(self._query, self._ids_berubah))
+        # 2. Baris lama yang diedit dari perangkat lain (jika tabel punya kolom updated_at).
+        if self._max_updated_at is not None:
+            watermark = self._max_updated_at
+            delta.append(self._fetch(id_maksimal=self._max_id, saring=lambda q: q.gt(COL_UPDATED_AT, watermark)))
+        upserts = _gabung_frame(delta)
+        if not upserts.empty:
+            upserts = upserts.drop_duplicates('id', keep='last')
+
+        # 3. Rekonsiliasi hapus: cukup bandingkan jumlah baris, daftar id hanya diambil jika berbeda.
+        ids_dihapus = []
+        jumlah_lokal = len(df) + (self._arsip.jumlah_baris() if self._arsip is not None else 0)
+        if not upserts.empty:
+            baru = ~upserts['id'].isin(df['id'] if not df.empty else [])
+            if self._arsip is not None and baru.any():
+                baru &= ~upserts['id'].isin(list(self._lokasi_arsip(upserts['id'][baru])))
+            jumlah_lokal += int(baru.sum())
+        jumlah_server = _eksekusi(self._query("id", count="exact", head=True), "count").count
+        if jumlah_server is not None and jumlah_server != jumlah_lokal:
+            id_lokal = set(df['id']) if not df.empty else set()
+            if not upserts.empty:
+                id_lokal.update(upserts['id'])
+            for tahun in self.tahun_arsip():
+                id_lokal.update(self._id_tahun(tahun).tolist())
+            df_id = self._fetch(kolom="id")
+            id_server = set(df_id['id']) if not df_id.empty else set()
+            ids_dihapus = list(id_lokal - id_server)
+            ids_hilang = sorted(id_server - id_lokal)
+            if ids_hilang:
+                upserts = _gabung_frame([upserts, _ambil_berdasarkan_id(self._query, ids_hilang)])
+
+        self._ids_berubah.clear()
+        self._perlu_sinkron = False
+        self._last_sync = time.monotonic()
+        self._disinkron_pada = time.time()
+        if not upserts.empty or ids_dihapus:
+            self._merge(upserts, ids_dihapus)
+        self._tutup_tahun()
+
+    def _merge(self, upserts, ids_dihapus, majukan_watermark=True, simpan_mirror=True):
+        """
+        Menggabungkan baris baru/berubah dan membuang baris yang dihapus menjadi DataFrame baru.
+        Perubahan pada tahun tertutup lebih dulu dipindah ke arsip, kecuali perubahan yang disusul dari
+        mirror (`simpan_mirror=False`): proses penerbitnya sudah menulis arsip.
+        """
+        if simpan_mirror and self._arsip is not None:
+            upserts, ids_dihapus = self._pisah_arsip(upserts, ids_dihapus)
+            if upserts.empty and not ids_dihapus:
+                if majukan_watermark:
+                    self._max_id = max(self._max_id or 0, self._arsip.id_maks())
+                return
+        df = self._state[1]
+        buang = set(ids_dihapus)
+        if not upserts.empty:
+            buang.update(upserts['id'])
+        dihapus = pd.DataFrame()
+        if buang and not df.empty:
+            mask_buang = df['id'].isin(buang)
+            dihapus, df = df[mask_buang], df[~mask_buang]
+        df = _gabung_frame([df, upserts])
+        self._replace(df, perubahan=(dihapus, upserts), simpan_mirror=simpan_mirror, majukan_watermark=majukan_watermark)
+
+    def _replace(self, df, perubahan=None, urutkan=True, simpan_mirror=True, majukan_watermark=True):
+        """
+        Memasang DataFrame baru sebagai versi terkini dan memperbarui semua indeks turunan:
+        secara inkremental jika `perubahan` (baris_dihapus, baris_ditambah) diberikan, selain itu dibangun ulang.
+        """
+        if COL_PEMILIK in df.columns:
+            df = df.drop(columns=COL_PEMILIK)  # sama untuk semua baris partisi; tidak perlu disimpan
+        if urutkan and not df.empty:
+            df = df.sort_values(['tanggal', 'id'], ascending=False).reset_index(drop=True)
+        if majukan_watermark:
+            self._max_id = int(df['id'].max()) if not df.empty else 0
+            if self._arsip is not None:
+                self._max_id = max(self._max_id, self._arsip.id_maks())
+            if COL_UPDATED_AT in df.columns and df[COL_UPDATED_AT].notna().any():
+                self._max_updated_at = pd.to_datetime(df[COL_UPDATED_AT]).max().isoformat()
+        for indeks in self._turunan.values():
+            if perubahan is None:
+                indeks.bangun(df)
+            else:
+                indeks.terapkan(*perubahan)
+        self._state = (next(_VERSI_LEDGER), df)
+        if simpan_mirror:
+            self._terbitkan(perubahan)
+
+    # --- Partisi tahun tertutup (dipanggil dengan lock) ---
+    def _ambil_tahun(self, tahun):
+        """Mengambil seluruh baris satu tahun dari database (mis. jika snapshot arsipnya rusak)."""
+        return self._fetch(saring=lambda q: q.gte('tanggal', f"{tahun}-01-01").lt('tanggal', f"{tahun + 1}-01-01"))
+
+    def _partisi_tahun(self, tahun):
+        """(df, cube) satu tahun tertutup, dari memori (LRU) atau snapshot generasi terbaru."""
+        generasi = self._arsip.manifest()['tahun'][tahun]['generasi']
+        tersimpan = self._tahun.get(tahun)
+        if tersimpan is not None and tersimpan[0] == generasi:
+            metrik.hitung("cache_total", lapisan="arsip", hasil="hit")
+            self._tahun.move_to_end(tahun)
+            return tersimpan[1:]
+        metrik.hitung("cache_total", lapisan="arsip", hasil="miss")
+        df = self._arsip.muat(tahun)
+        if df is None:
+            # Snapshot hilang atau rusak: hanya tahun itu yang diambil ulang dari database lalu diarsipkan lagi.
+            self._arsip.perbarui({tahun: (self._ambil_tahun(tahun), ())}, ganti=True)
+            df = self._arsip.muat(tahun)
+            if df is None:
+                df = pd.DataFrame(columns=KOLOM_WAJIB)
+            generasi = self._arsip.manifest()['tahun'].get(tahun, {}).get('generasi')
+        cube = RollupCube()
+        cube.bangun(df)
+        self._tahun[tahun] = (generasi, df, cube)
+        while len(self._tahun) > JUMLAH_TAHUN_DIMUAT:
+            self._tahun.popitem(last=False)
+        return df, cube
+
+    def _id_tahun(self, tahun):
+        """Id terurut satu tahun tertutup; cukup kolom id yang dibaca dari snapshot."""
+        generasi = self._arsip.manifest()['tahun'][tahun]['generasi']
+        tersimpan = self._id_arsip.get(tahun)
+        if tersimpan is None or tersimpan[0] != generasi:
+            dimuat = self._tahun.get(tahun)
+            if dimuat is not None and dimuat[0] == generasi:
+                ids = dimuat[1]['id'].to_numpy()
+            else:
+                df = self._arsip.muat(tahun, kolom=['id'])
+                ids = (df if df is not None else self._partisi_tahun(tahun)[0])['id'].to_numpy()
+            tersimpan = self._id_arsip[tahun] = (generasi, np.sort(ids.astype('int64')))
+        return tersimpan[1]
+
+    def _lokasi_arsip(self, ids):
+        """{id: tahun} untuk `ids` yang tersimpan di arsip; tahun dengan id terbesar lebih kecil tidak dibaca."""
+        ids = np.asarray(list(ids), dtype='int64')
+        lokasi = {}
+        if len(ids) == 0:
+            return lokasi
+        for tahun, entri in self._arsip.manifest()['tahun'].items():
+            calon = ids[ids <= entri['id_maks']]
+            if len(calon):
+                ada = calon[np.isin(calon, self._id_tahun(tahun), assume_unique=True)]
+                lokasi.update(dict.fromkeys(ada.tolist(), tahun))
+        return lokasi
+
+    def _pisah_arsip(self, upserts, ids_dihapus):
+        """
+        Menulis bagian perubahan yang menyentuh tahun tertutup ke arsip (baris bertanggal tahun tertutup,
+        serta hapus/pindah tanggal baris yang tersimpan di arsip) dan mengembalikan sisanya untuk partisi panas.
+        """
+        awal = self._arsip.awal_panas()
+        if awal is None:
+            return upserts, ids_dihapus
+        awal = pd.Timestamp(awal)
+        df = self._state[1]
+        ke_arsip = upserts[upserts['tanggal'] < awal] if not upserts.empty else upserts
+        semua_id = set(ids_dihapus) | (set(upserts['id']) if not upserts.empty else set())
+        id_panas = set(df['id'][df['id'].isin(list(semua_id))]) if not df.empty and semua_id else set()
+        perubahan = {}
+        for id_baris, tahun in self._lokasi_arsip(semua_id - id_panas).items():
+            perubahan.setdefault(tahun, ([], set()))[1].add(id_baris)
+        if not ke_arsip.empty:
+            for tahun, kelompok in ke_arsip.groupby(ke_arsip['tanggal'].dt.year):
+                perubahan.setdefault(int(tahun), ([], set()))[0].append(kelompok)
+        if perubahan:
+            self._arsip.perbarui(
+                {t: (_gabung_frame(u) if u else upserts.iloc[:0], ids) for t, (u, ids) in perubahan.items()},
+                ambil_ulang=self._ambil_tahun,
+            )
+            metrik.hitung("arsip_ditulis_total", len(perubahan))
+        # Baris panas yang tanggalnya dipindah ke tahun tertutup ikut dibuang dari partisi panas.
+        pindah = set(ke_arsip['id']) if not ke_arsip.empty else set()
+        return upserts[upserts['tanggal'] >= awal] if not upserts.empty else upserts, sorted(id_panas & (set(ids_dihapus) | pindah))
+
+    def _pisah_tahun_tertutup(self, df, ganti=False):
+        """
+        Menutup tahun buku yang sudah lewat masa tenggang: baris `df` sebelum tahun terbuka dipindah ke arsip
+        (satu snapshot per tahun) dan batas tahun terbuka dimajukan. `ganti=True` (muat ulang penuh) mengganti
+        seluruh isi arsip dengan baris dari `df`. Mengembalikan (baris yang tetap panas, baris yang dipindah).
+        """
+        manifest = self._arsip.manifest()
+        batas = max((datetime.now() - timedelta(days=HARI_TENGGANG_TUTUP_BUKU)).year, manifest['batas'] or 0)
+        mask = (df['tanggal'] < pd.Timestamp(batas, 1, 1)).to_numpy() if not df.empty else np.zeros(0, dtype=bool)
+        if not ganti and not mask.any() and manifest['batas'] == batas:
+            return df, df.iloc[:0]
+        dipindah = df[mask]
+        perubahan = {int(t): (g, ()) for t, g in dipindah.groupby(dipindah['tanggal'].dt.year)} if not dipindah.empty else {}
+        if ganti:
+            for tahun in manifest['tahun']:
+                perubahan.setdefault(tahun, (df.iloc[:0], ()))
+        self._arsip.perbarui(perubahan, batas=batas, ganti=ganti, ambil_ulang=self._ambil_tahun)
+        if perubahan:
+            metrik.hitung("arsip_ditulis_total", len(perubahan))
+        return df[~mask].reset_index(drop=True), dipindah
+
+    def _tutup_tahun(self):
+        """Memindahkan baris partisi panas yang tahunnya baru ditutup ke arsip (sekali per pergantian tahun)."""
+        if self._arsip is None:
+            return
+        panas, dipindah = self._pisah_tahun_tertutup(self._state[1])
+        if not dipindah.empty:
+            self._replace(panas, perubahan=(dipindah, panas.iloc[:0]), urutkan=False)
+
+    # --- Cache bersama antar proses lewat mirror (dipanggil dengan lock) ---
+    def _ikuti_mirror(self):
+        """Jika identitas file mirror berubah (satu stat), susul generasi baru yang diterbitkan proses lain."""
+        if self._mirror is None or self._mirror.identitas() in (None, self._identitas_mirror):
+            return
+        try:
+            with self._mirror.kunci():
+                meta = self._mirror.baca_meta()
+                if meta is not None and meta['generasi'] > self._generasi:
+                    self._susul(meta)
+                self._identitas_mirror = self._mirror.identitas()
+        except (pa.ArrowException, OSError) as e:
+            logger.warning("Gagal membaca mirror bersama %s: %s", self._mirror.path, e)
+
+    def _susul(self, meta, kecuali=()):
+        """
+        Menerapkan generasi mirror yang belum diikuti. Jika semua generasi yang terlewat tercatat di riwayat,
+        hanya baris yang berubah yang dibaca dari mirror; selain itu seluruh mirror dimuat ulang.
+        Id di `kecuali` (perubahan lokal yang akan diterbitkan) tidak ditimpa.
+        Mengembalikan id yang diubah proses lain, atau None jika mirror dimuat ulang seluruhnya.
+        """
+        terlewat = [ids for generasi, ids in meta['riwayat'] if generasi > self._generasi]
+        if len(terlewat) == meta['generasi'] - self._generasi and all(ids is not None for ids in terlewat):
+            diubah = set().union(*terlewat)
+            berubah = diubah - set(kecuali)
+            if berubah:
+                upserts = self._mirror.ambil_baris(berubah)
+                ada = set(upserts['id']) if not upserts.empty else set()
+                df = self._state[1]
+                ids_dihapus = df['id'][df['id'].isin(list(berubah - ada))].tolist() if not df.empty else []
+                if not upserts.empty or ids_dihapus:
+                    self._merge(upserts, ids_dihapus, majukan_watermark=False, simpan_mirror=False)
+            metrik.hitung("cache_total", lapisan="bersama", hasil="delta")
+        else:
+            diubah = None
+            self._replace(self._mirror.ambil_baris(), urutkan=False, simpan_mirror=False, majukan_watermark=False)
+            metrik.hitung("cache_total", lapisan="bersama", hasil="penuh")
+        self._generasi = meta['generasi']
+        self._max_id = max(self._max_id or 0, meta['max_id'])
+        if meta['max_updated_at'] and meta['max_updated_at'] > (self._max_updated_at or ""):
+            self._max_updated_at = meta['max_updated_at']
+        if meta['disinkron_pada'] > (self._disinkron_pada or 0):
+            # Proses lain sudah sinkron dengan database lebih baru; sinkronisasi berkala proses ini ikut mundur.
+            self._disinkron_pada = meta['disinkron_pada']
+            self._last_sync = max(self._last_sync, time.monotonic() - (time.time() - meta['disinkron_pada']))
+        return diubah
+
+    def _sudah_diterbitkan(self, ids):
+        """True jika baris `ids` di mirror sama persis dengan di ledger ini (termasuk yang sudah dihapus)."""
+        df = self._state[1]
+        lokal = df[df['id'].isin(list(ids))] if not df.empty else df
+        di_mirror = self._mirror.ambil_baris(ids)
+        if len(lokal) != len(di_mirror):
+            return False
+        if lokal.empty:
+            return True
+        urut = lambda d: d.sort_values('id')[KOLOM_WAJIB].reset_index(drop=True).astype(object)
+        return urut(lokal).equals(urut(di_mirror))
+
+    def _terbitkan(self, perubahan):
+        """
+        Menulis versi terkini ke mirror sebagai generasi baru dan mencatat id yang berubah di riwayat.
+        Generasi dari proses lain yang belum diikuti disusul dulu agar perubahannya tidak tertimpa; jika
+        perubahan ini ternyata sudah ada di mirror (mis. event change feed yang sama diterapkan di semua
+        proses), mirror tidak ditulis ulang. Mirror hanya akselerator; kegagalan tidak mengganggu aplikasi.
+        """
+        if self._mirror is None:
+            return
+        ids = None
+        if perubahan is not None:
+            ids = {int(i) for frame in perubahan if not frame.empty for i in frame['id']}
+        try:
+            with self._mirror.kunci(eksklusif=True):
+                meta = self._mirror.baca_meta()
+                if meta is not None and meta['generasi'] > self._generasi and ids is not None:
+                    if self._sudah_diterbitkan(ids):
+                        self._susul(meta, kecuali=ids)
+                        self._identitas_mirror = self._mirror.identitas()
+                        return
+                    diubah = self._susul(meta, kecuali=ids)
+                    if diubah is None or diubah & ids:
+                        # Bentrok dengan proses lain (atau dimuat ulang penuh): biarkan database yang menentukan.
+                        self._ids_berubah.update(ids if diubah is None else diubah & ids)
+                        self._perlu_sinkron = True
+                        if diubah is None:
+                            return
+                generasi = max(self._generasi, meta['generasi'] if meta else 0) + 1
+                entri = [generasi, sorted(ids) if ids is not None and len(ids) <= BATAS_ID_RIWAYAT else None]
+                riwayat = ((meta['riwayat'] if meta else []) + [entri])[-PANJANG_RIWAYAT_MIRROR:]
+                self._mirror.simpan(self._state[1], self._max_id, self._max_updated_at, generasi, riwayat, self._disinkron_pada)
+                self._generasi = generasi
+                self._identitas_mirror = self._mirror.identitas()
+        except (pa.ArrowException, OSError) as e:
+            logger.warning("Gagal menulis mirror %s: %s", self._mirror.path, e)
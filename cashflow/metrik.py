@@ -0,0 +1,150 @@
+# ===================================================================================
+# --- INSTRUMENTASI PERFORMA ---
+# ===================================================================================
+import bisect
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from cashflow.konstanta import BATAS_HISTOGRAM_DETIK, PREFIKS_METRIK, pengaturan
+
+class _Pengukur:
+    __slots__ = ('_metrik', '_kunci', '_mulai')
+
+    def __init__(self, metrik, kunci):
+        self._metrik, self._kunci = metrik, kunci
+
+    def __enter__(self):
+        self._mulai = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._metrik.amati(self._kunci, time.perf_counter() - self._mulai)
+        return False
+
+_TANPA_UKUR = contextlib.nullcontext()
+
+class Metrik:
+    """
+    Registry metrik untuk seluruh proses: histogram latensi (detik) dan penghitung (baris, byte payload,
+    hit/miss cache), masing-masing dengan label. Saat `aktif` bernilai False, `ukur()` hanya
+    mengembalikan context manager kosong dan `hitung()` langsung kembali, sehingga overhead nyaris nol.
+    """
+
+    def __init__(self, aktif=False):
+        self.aktif = aktif
+        self._lock = threading.Lock()
+        self._histogram = {}  # (nama, label) -> [jumlah per bucket (+Inf di akhir), total detik]
+        self._penghitung = {}  # (nama, label) -> nilai
+        self._mulai = datetime.now()
+
+    @staticmethod
+    def _kunci(nama, label):
+        return nama, tuple(sorted(label.items()))
+
+    def ukur(self, nama, /, **label):
+        """Context manager yang mencatat durasi blok ke histogram `nama`."""
+        if not self.aktif:
+            return _TANPA_UKUR
+        return _Pengukur(self, self._kunci(nama, label))
+
+    def amati(self, kunci, detik):
+        with self._lock:
+            histogram = self._histogram.setdefault(kunci, [[0] * (len(BATAS_HISTOGRAM_DETIK) + 1), 0.0])
+            histogram[0][bisect.bisect_left(BATAS_HISTOGRAM_DETIK, detik)] += 1
+            histogram[1] += detik
+
+    def hitung(self, nama, nilai=1, /, **label):
+        """Menambah penghitung `nama` (mis. baris, byte, hit/miss cache)."""
+        if not self.aktif:
+            return
+        kunci = self._kunci(nama, label)
+        with self._lock:
+            self._penghitung[kunci] = self._penghitung.get(kunci, 0) + nilai
+
+    def reset(self):
+        with self._lock:
+            self._histogram, self._penghitung, self._mulai = {}, {}, datetime.now()
+
+    def snapshot(self):
+        """Salinan semua metrik sebagai dict yang siap di-JSON-kan."""
+        with self._lock:
+            histogram = [
+                {'nama': nama, 'label': dict(label), 'batas_detik': list(BATAS_HISTOGRAM_DETIK),
+                 'jumlah_per_bucket': list(bucket), 'jumlah': sum(bucket), 'total_detik': total}
+                for (nama, label), (bucket, total) in sorted(self._histogram.items())
+            ]
+            penghitung = [{'nama': nama, 'label': dict(label), 'nilai': nilai} for (nama, label), nilai in sorted(self._penghitung.items())]
+        return {'sejak': self._mulai.isoformat(timespec='seconds'), 'histogram': histogram, 'penghitung': penghitung}
+
+    @staticmethod
+    def _label_prometheus(label, **tambahan):
+        pasangan = list(label.items()) + list(tambahan.items())
+        return "{" + ",".join(f'{k}="{v}"' for k, v in pasangan) + "}" if pasangan else ""
+
+    def prometheus(self):
+        """Snapshot dalam format teks eksposisi Prometheus."""
+        data = self.snapshot()
+        baris, sudah = [], set()
+        for h in data['histogram']:
+            nama = PREFIKS_METRIK + h['nama']
+            if nama not in sudah:
+                baris.append(f"# TYPE {nama} histogram")
+                sudah.add(nama)
+            kumulatif = 0
+            for batas, jumlah in zip(list(BATAS_HISTOGRAM_DETIK) + ["+Inf"], h['jumlah_per_bucket']):
+                kumulatif += jumlah
+                baris.append(f"{nama}_bucket{self._label_prometheus(h['label'], le=batas)} {kumulatif}")
+            baris.append(f"{nama}_sum{self._label_prometheus(h['label'])} {h['total_detik']:.6f}")
+            baris.append(f"{nama}_count{self._label_prometheus(h['label'])} {h['jumlah']}")
+        for p in data['penghitung']:
+            nama = PREFIKS_METRIK + p['nama']
+            if nama not in sudah:
+                baris.append(f"# TYPE {nama} counter")
+                sudah.add(nama)
+            baris.append(f"{nama}{self._label_prometheus(p['label'])} {p['nilai']}")
+        return "\n".join(baris) + "\n"
+
+def _persentil_histogram(h, q):
+    """Perkiraan persentil dari histogram: batas atas bucket tempat persentil ke-q jatuh."""
+    target, kumulatif = q * h['jumlah'], 0
+    for batas, jumlah in zip(list(h['batas_detik']) + [float("inf")], h['jumlah_per_bucket']):
+        kumulatif += jumlah
+        if kumulatif >= target:
+            return batas
+    return float("inf")
+
+# Satu registry untuk semua sesi dan rerun (modul hanya diimpor sekali per proses). Karena dipakai bersama,
+# instrumentasi hanya dinyalakan oleh operator: `instrumentasi = true` di [pengaturan] atau CASHFLOW_INSTRUMENTASI=1.
+metrik = Metrik(aktif=bool(pengaturan("instrumentasi", False)) or os.environ.get("CASHFLOW_INSTRUMENTASI", "0") not in ("", "0"))
+
+def terukur(nama, /, **label):
+    """Decorator: mencatat durasi setiap pemanggilan fungsi ke histogram `nama` (label `fungsi` = nama fungsi)."""
+    def hias(fungsi):
+        @functools.wraps(fungsi)
+        def pembungkus(*args, **kwargs):
+            if not metrik.aktif:
+                return fungsi(*args, **kwargs)
+            with metrik.ukur(nama, fungsi=fungsi.__name__, **label):
+                return fungsi(*args, **kwargs)
+        return pembungkus
+    return hias
+
+def _eksekusi(query, operasi):
+    """
+    Menjalankan query Supabase. Jika instrumentasi aktif, latensi round trip, jumlah baris, dan
+    perkiraan ukuran payload (JSON) dicatat per jenis operasi.
+    """
+    if not metrik.aktif:
+        return query.execute()
+    with metrik.ukur("supabase_request_detik", operasi=operasi):
+        respons = query.execute()
+    data = respons.data or []
+    metrik.hitung("supabase_request_total", operasi=operasi)
+    metrik.hitung("supabase_baris_total", len(data), operasi=operasi)
+    metrik.hitung("supabase_payload_byte_total", len(json.dumps(data, default=str)), operasi=operasi)
+    return respons
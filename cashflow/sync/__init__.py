@@ -0,0 +1,4 @@
+from cashflow.sync.jurnal import JurnalTulis, PenulisLatar
+from cashflow.sync.umpan import SumberRealtimeSupabase, UmpanPerubahan
+
+__all__ = ["JurnalTulis", "PenulisLatar", "SumberRealtimeSupabase", "UmpanPerubahan"]
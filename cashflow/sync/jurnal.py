@@ -0,0 +1,226 @@
+# ===================================================================================
+# --- ANTREAN TULIS (WRITE-BEHIND) ---
+# ===================================================================================
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from cashflow.konstanta import (
+    COL_KUNCI_IDEMPOTEN,
+    JEDA_AWAL_TULIS,
+    JEDA_MAKS_TULIS,
+    JURNAL_TULIS_PATH,
+    MAKS_PERCOBAAN_TULIS,
+    TABEL_CASHFLOW,
+    UKURAN_BATCH_TULIS,
+)
+from cashflow.ledger.partisi import _saring_pemilik
+from cashflow.metrik import metrik, _eksekusi
+
+logger = logging.getLogger(__name__)
+
+class JurnalTulis:
+    """
+    Jurnal lokal mutasi yang belum terkirim ke database (SQLite mode WAL, synchronous=FULL), sehingga
+    input pengguna tetap aman meski jaringan putus atau aplikasi restart. Setiap mutasi mendapat kunci
+    idempoten dan diproses berurutan (FIFO). Status: 'menunggu' (akan dikirim/dicoba ulang) atau
+    'gagal' (percobaan habis, menunggu tindakan pengguna). Mutasi yang berhasil dihapus dari jurnal.
+    Mutasi 'gagal' menahan semua mutasi berikutnya milik pemilik yang sama sampai diulang atau dibuang,
+    agar urutan tetap terjaga (mis. dua edit pada baris yang sama tidak saling mendahului).
+    """
+
+    def __init__(self, path=JURNAL_TULIS_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS mutasi (
+                urutan INTEGER PRIMARY KEY AUTOINCREMENT,
+                kunci TEXT NOT NULL UNIQUE,
+                operasi TEXT NOT NULL,
+                id_target INTEGER,
+                isi TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'menunggu',
+                percobaan INTEGER NOT NULL DEFAULT 0,
+                coba_lagi_pada REAL NOT NULL DEFAULT 0,
+                galat TEXT,
+                dibuat_pada REAL NOT NULL,
+                pemilik TEXT
+            )
+        """)
+        if 'pemilik' not in {b['name'] for b in self._db.execute("PRAGMA table_info(mutasi)")}:
+            self._db.execute("ALTER TABLE mutasi ADD COLUMN pemilik TEXT")  # jurnal dari sebelum partisi per pengguna
+
+    def tambah(self, operasi, isi, id_target=None, pemilik=None):
+        """Mencatat satu mutasi ('insert' berisi list baris, 'update' berisi dict kolom, 'delete') dan mengembalikan kuncinya."""
+        kunci = uuid.uuid4().hex
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO mutasi (kunci, operasi, id_target, isi, dibuat_pada, pemilik) VALUES (?, ?, ?, ?, ?, ?)",
+                (kunci, operasi, id_target, json.dumps(isi, default=str), time.time(), pemilik),
+            )
+        return kunci
+
+    def berikutnya(self, batas=UKURAN_BATCH_TULIS):
+        """
+        Mengembalikan (mutasi, detik_tunggu). `mutasi` adalah mutasi tertua yang berstatus 'menunggu' dan
+        tidak tertahan mutasi 'gagal' yang lebih tua milik pemilik yang sama, ditambah insert berikutnya yang
+        berurutan milik pemilik yang sama (maks. `batas`) agar terkirim dalam satu request.
+        Jika mutasi tertua masih dalam jeda coba ulang, hasilnya kosong beserta sisa jedanya.
+        """
+        with self._lock:
+            baris = self._db.execute("""
+                SELECT * FROM mutasi AS m
+                WHERE status = 'menunggu' AND NOT EXISTS (
+                    SELECT 1 FROM mutasi AS g WHERE g.status = 'gagal' AND g.pemilik IS m.pemilik AND g.urutan < m.urutan
+                )
+                ORDER BY urutan LIMIT ?
+            """, (batas,)).fetchall()
+        if not baris:
+            return [], None
+        tunggu = baris[0]['coba_lagi_pada'] - time.time()
+        if tunggu > 0:
+            return [], tunggu
+        mutasi = [dict(baris[0], isi=json.loads(baris[0]['isi']))]
+        if mutasi[0]['operasi'] == "insert":
+            for b in baris[1:]:
+                if b['operasi'] != "insert" or b['pemilik'] != baris[0]['pemilik'] or b['coba_lagi_pada'] > time.time():
+                    break
+                mutasi.append(dict(b, isi=json.loads(b['isi'])))
+        return mutasi, 0
+
+    def selesai(self, kunci):
+        with self._lock:
+            self._db.executemany("DELETE FROM mutasi WHERE kunci = ?", [(k,) for k in kunci])
+
+    def catat_gagal(self, kunci, galat, maks_percobaan=MAKS_PERCOBAAN_TULIS, jeda_awal=JEDA_AWAL_TULIS, jeda_maks=JEDA_MAKS_TULIS):
+        """Menaikkan hitungan percobaan dengan jeda eksponensial; setelah `maks_percobaan` status menjadi 'gagal'."""
+        with self._lock:
+            for k in kunci:
+                percobaan = self._db.execute("SELECT percobaan FROM mutasi WHERE kunci = ?", (k,)).fetchone()[0] + 1
+                self._db.execute(
+                    "UPDATE mutasi SET percobaan = ?, galat = ?, status = ?, coba_lagi_pada = ? WHERE kunci = ?",
+                    (percobaan, galat, "gagal" if percobaan >= maks_percobaan else "menunggu",
+                     time.time() + min(jeda_awal * 2 ** (percobaan - 1), jeda_maks), k),
+                )
+
+    # Operasi untuk UI di bawah ini dibatasi pada mutasi milik satu pemilik (None = mode satu ledger).
+    def ulangi(self, pemilik=None):
+        """Mengembalikan semua mutasi 'gagal' ke antrean untuk segera dicoba lagi."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE mutasi SET status = 'menunggu', percobaan = 0, coba_lagi_pada = 0 WHERE status = 'gagal' AND pemilik IS ?", (pemilik,)
+            )
+
+    def buang_gagal(self, pemilik=None):
+        with self._lock:
+            self._db.execute("DELETE FROM mutasi WHERE status = 'gagal' AND pemilik IS ?", (pemilik,))
+
+    def ringkasan(self, pemilik=None):
+        """Jumlah mutasi per status, mis. {'menunggu': 2, 'gagal': 0, 'ditahan': 0}; 'ditahan' adalah bagian dari 'menunggu'."""
+        with self._lock:
+            hitungan = dict(self._db.execute("SELECT status, COUNT(*) FROM mutasi WHERE pemilik IS ? GROUP BY status", (pemilik,)).fetchall())
+            ditahan = self._db.execute("""
+                SELECT COUNT(*) FROM mutasi WHERE status = 'menunggu' AND pemilik IS ?
+                AND urutan > (SELECT MIN(urutan) FROM mutasi WHERE status = 'gagal' AND pemilik IS ?)
+            """, (pemilik, pemilik)).fetchone()[0]
+        return {'menunggu': hitungan.get('menunggu', 0), 'gagal': hitungan.get('gagal', 0), 'ditahan': ditahan}
+
+    def daftar(self, status, pemilik=None):
+        with self._lock:
+            return [dict(b) for b in self._db.execute("SELECT * FROM mutasi WHERE status = ? AND pemilik IS ? ORDER BY urutan", (status, pemilik))]
+
+class PenulisLatar:
+    """
+    Worker latar yang mengirim isi JurnalTulis ke database, lalu menerapkannya ke ledger (write-through).
+    Insert dikirim sebagai upsert `ignore_duplicates` pada kolom kunci idempoten (satu kunci per baris),
+    sehingga pengiriman ulang setelah timeout tidak menggandakan transaksi; update dan delete per id
+    memang idempoten. Kegagalan dicoba ulang dengan jeda eksponensial tanpa mengubah urutan mutasi; mutasi
+    yang akhirnya 'gagal' menahan antrean pemiliknya (lihat JurnalTulis).
+    Dengan `klien_pemilik`, mutasi milik seorang pemilik dikirim lewat `klien_pemilik(pemilik)` (klien
+    dengan token rumah tangga tersebut, agar lolos RLS); tanpa itu semua mutasi memakai `client`.
+    """
+
+    def __init__(self, jurnal, client, ledger, maks_percobaan=MAKS_PERCOBAAN_TULIS, jeda_awal=JEDA_AWAL_TULIS, jeda_maks=JEDA_MAKS_TULIS,
+                 klien_pemilik=None):
+        self.jurnal = jurnal
+        self._client = client
+        self._klien_pemilik = klien_pemilik
+        self._ledger = ledger
+        self._opsi_gagal = dict(maks_percobaan=maks_percobaan, jeda_awal=jeda_awal, jeda_maks=jeda_maks)
+        self._bangun = threading.Event()
+        self._berhenti = threading.Event()
+        self._thread = None
+
+    def mulai(self):
+        self._thread = threading.Thread(target=self._jalankan, name="penulis-latar", daemon=True)
+        self._thread.start()
+        return self
+
+    def berhenti(self, timeout=None):
+        self._berhenti.set()
+        self._bangun.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def antre(self, operasi, isi, id_target=None, pemilik=None):
+        """Mencatat mutasi ke jurnal (tahan crash) lalu langsung kembali; pengiriman dilakukan di latar."""
+        kunci = self.jurnal.tambah(operasi, isi, id_target, pemilik)
+        self._bangun.set()
+        return kunci
+
+    def ulangi(self, pemilik=None):
+        self.jurnal.ulangi(pemilik)
+        self._bangun.set()
+
+    def _jalankan(self):
+        while not self._berhenti.is_set():
+            mutasi, tunggu = self.jurnal.berikutnya()
+            if not mutasi:
+                self._bangun.wait(tunggu)
+                self._bangun.clear()
+                continue
+            kunci = [m['kunci'] for m in mutasi]
+            try:
+                self._kirim(mutasi)
+            except Exception as e:
+                logger.warning("Gagal mengirim %d mutasi (%s), dicoba lagi nanti: %s", len(mutasi), mutasi[0]['operasi'], e)
+                self.jurnal.catat_gagal(kunci, str(e), **self._opsi_gagal)
+                metrik.hitung("antrean_tulis_total", len(mutasi), hasil="gagal")
+            else:
+                self.jurnal.selesai(kunci)
+                metrik.hitung("antrean_tulis_total", len(mutasi), hasil="terkirim")
+
+    def _kirim(self, mutasi):
+        m = mutasi[0]
+        klien = self._client if m['pemilik'] is None or self._klien_pemilik is None else self._klien_pemilik(m['pemilik'])
+        tabel = klien.table(TABEL_CASHFLOW)
+        if m['operasi'] == "insert":
+            baris = [
+                {**b, COL_KUNCI_IDEMPOTEN: f"{item['kunci']}:{i}"}
+                for item in mutasi for i, b in enumerate(item['isi'])
+            ]
+            tersimpan = _eksekusi(tabel.upsert(baris, on_conflict=COL_KUNCI_IDEMPOTEN, ignore_duplicates=True), "insert").data
+            self._ledger.terapkan_perubahan(baris=tersimpan)
+            if len(tersimpan) < len(baris):
+                self._ledger.tandai_berubah()  # sebagian sudah tersimpan pada percobaan sebelumnya
+        elif m['operasi'] == "update":
+            diupdate = _eksekusi(_saring_pemilik(tabel.update(m['isi']).eq("id", m['id_target']), m['pemilik']), "update").data
+            if diupdate:
+                self._ledger.terapkan_perubahan(baris=diupdate)
+            else:
+                self._ledger.tandai_berubah([m['id_target']])
+        elif m['operasi'] == "delete":
+            _eksekusi(_saring_pemilik(tabel.delete().eq("id", m['id_target']), m['pemilik']), "delete")
+            self._ledger.terapkan_perubahan(ids_dihapus=[m['id_target']])
+        else:
+            raise ValueError(f"Operasi tidak dikenal: {m['operasi']}")
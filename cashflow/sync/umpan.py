@@ -0,0 +1,146 @@
+# ===================================================================================
+# --- CHANGE FEED (SUPABASE REALTIME) ---
+# ===================================================================================
+import asyncio
+import logging
+import queue
+import threading
+
+from cashflow.konstanta import JEDA_ULANG_UMPAN, JENDELA_BATCH_UMPAN, TABEL_CASHFLOW
+from cashflow.metrik import metrik
+
+logger = logging.getLogger(__name__)
+
+class SumberRealtimeSupabase:
+    """
+    Sumber event insert/update/delete tabel Cashflow dari Supabase Realtime (postgres_changes).
+    Tabel harus termasuk publikasi `supabase_realtime`. Klien realtime Python hanya tersedia dalam
+    versi async, sehingga dijalankan di event loop milik thread pemanggil.
+    `filter` (mis. "pemilik=eq.rumah-a") membatasi langganan ke baris tertentu; `token` adalah fungsi yang
+    mengembalikan JWT pengguna, diminta ulang setiap kali tersambung agar kebijakan RLS berlaku untuk feed.
+    """
+
+    def __init__(self, url, key, tabel=TABEL_CASHFLOW, skema="public", filter=None, token=None):
+        self._url = url.rstrip("/")
+        self._key = key
+        self._tabel = tabel
+        self._skema = skema
+        self._filter = filter
+        self._token = token
+
+    def dengarkan(self, saat_event, saat_terhubung, berhenti):
+        """
+        Memblokir sampai `berhenti` di-set (kembali normal) atau koneksi putus (melempar exception).
+        Setiap event diteruskan sebagai `saat_event(jenis, baris)`; untuk DELETE, `baris` hanya berisi `id`.
+        """
+        asyncio.run(self._dengarkan(saat_event, saat_terhubung, berhenti))
+
+    async def _dengarkan(self, saat_event, saat_terhubung, berhenti):
+        from realtime import AsyncRealtimeClient, RealtimeSubscribeStates
+
+        klien = AsyncRealtimeClient(f"{self._url}/realtime/v1", self._key, auto_reconnect=False)
+        status = {'kanal': None}
+
+        def terima(payload):
+            data = payload['data']
+            jenis = str(getattr(data['type'], 'value', data['type']))
+            saat_event(jenis, data.get('old_record') if jenis == "DELETE" else data.get('record'))
+
+        def saat_status(kanal, error):
+            status['kanal'] = kanal
+            if kanal == RealtimeSubscribeStates.SUBSCRIBED:
+                saat_terhubung()
+
+        await klien.connect()
+        try:
+            if self._token is not None:
+                await klien.set_auth(self._token())
+            kanal = klien.channel(f"ledger-{self._tabel}")
+            kanal.on_postgres_changes("*", schema=self._skema, table=self._tabel, filter=self._filter, callback=terima)
+            await kanal.subscribe(saat_status)
+            while not berhenti.is_set():
+                if not klien.is_connected or status['kanal'] not in (None, RealtimeSubscribeStates.SUBSCRIBED):
+                    raise ConnectionError(f"change feed terputus (status kanal: {status['kanal']})")
+                await asyncio.sleep(0.2)
+        finally:
+            await klien.close()
+
+class UmpanPerubahan:
+    """
+    Pelanggan change feed di thread latar: event dari `sumber` diterapkan ke LedgerSync lewat
+    `terapkan_perubahan()`, sehingga perubahan dari perangkat lain terlihat dalam hitungan milidetik
+    tanpa query ke database. Event yang datang beruntun digabung menjadi satu merge per jendela batch.
+    Jika koneksi putus, ledger kembali ke sinkronisasi berkala sampai feed tersambung lagi.
+    `sumber` cukup punya `dengarkan(saat_event, saat_terhubung, berhenti)` (lihat SumberRealtimeSupabase).
+    """
+
+    def __init__(self, ledger, sumber, jeda_ulang=JEDA_ULANG_UMPAN, jendela_batch=JENDELA_BATCH_UMPAN):
+        self._ledger = ledger
+        self._sumber = sumber
+        self._jeda_ulang = jeda_ulang
+        self._jendela_batch = jendela_batch
+        self._antrean = queue.Queue()
+        self._berhenti = threading.Event()
+        self._thread = []
+        self.terhubung = False
+        self.jumlah_event = 0
+
+    def mulai(self):
+        for target, nama in ((self._jaga_koneksi, "umpan-koneksi"), (self._terapkan_event, "umpan-penerap")):
+            thread = threading.Thread(target=target, name=nama, daemon=True)
+            thread.start()
+            self._thread.append(thread)
+        return self
+
+    def berhenti(self, timeout=None):
+        self._berhenti.set()
+        for thread in self._thread:
+            thread.join(timeout)
+
+    def _jaga_koneksi(self):
+        while not self._berhenti.is_set():
+            try:
+                self._sumber.dengarkan(lambda jenis, baris: self._antrean.put((jenis, baris)), lambda: self._atur_terhubung(True), self._berhenti)
+            except Exception as e:
+                logger.warning("Change feed terputus, kembali ke polling: %s", e)
+            self._atur_terhubung(False)
+            self._berhenti.wait(self._jeda_ulang)
+
+    def _atur_terhubung(self, terhubung):
+        if terhubung != self.terhubung:
+            self.terhubung = terhubung
+            self._ledger.atur_umpan(terhubung)
+            metrik.hitung("umpan_status_total", status="terhubung" if terhubung else "terputus")
+
+    def _terapkan_event(self):
+        while not self._berhenti.is_set():
+            try:
+                event = [self._antrean.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            self._berhenti.wait(self._jendela_batch)
+            while True:
+                try:
+                    event.append(self._antrean.get_nowait())
+                except queue.Empty:
+                    break
+
+            # Gabungkan per id: event terakhir untuk suatu id yang menentukan (upsert atau hapus).
+            upserts, ids_dihapus = {}, set()
+            for jenis, baris in event:
+                if not baris or 'id' not in baris:
+                    continue
+                if jenis == "DELETE":
+                    upserts.pop(baris['id'], None)
+                    ids_dihapus.add(baris['id'])
+                else:
+                    upserts[baris['id']] = baris
+                    ids_dihapus.discard(baris['id'])
+            try:
+                with metrik.ukur("umpan_terapkan_detik"):
+                    self._ledger.terapkan_perubahan(baris=list(upserts.values()), ids_dihapus=list(ids_dihapus))
+                self.jumlah_event += len(event)
+                metrik.hitung("umpan_event_total", len(event))
+            except Exception as e:
+                logger.warning("Gagal menerapkan %d event change feed: %s", len(event), e)
+                self._ledger.tandai_berubah()  # ambil lewat sinkronisasi delta berikutnya
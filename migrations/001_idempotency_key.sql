@@ -0,0 +1,10 @@
+-- ===================================================================================
+-- --- KOLOM KUNCI IDEMPOTEN UNTUK ANTREAN TULIS (WRITE-BEHIND) ---
+-- ===================================================================================
+-- Wajib sebelum mengaktifkan `tulis_belakang = true` di bagian [pengaturan] secrets.toml.
+-- PenulisLatar mengirim insert sebagai upsert ON CONFLICT (idempotency_key) DO NOTHING, sehingga
+-- pengiriman ulang setelah timeout tidak menggandakan transaksi. Baris lama (dan baris yang disimpan
+-- tanpa antrean tulis) dibiarkan NULL; indeks unik mengizinkan banyak NULL.
+-- Jalankan sekali di SQL Editor Supabase; aman dijalankan ulang.
+ALTER TABLE "Cashflow" ADD COLUMN IF NOT EXISTS idempotency_key text;
+CREATE UNIQUE INDEX IF NOT EXISTS "Cashflow_idempotency_key_key" ON "Cashflow" (idempotency_key);
@@ -0,0 +1,21 @@
+-- ===================================================================================
+-- --- PEMISAHAN DATA PER RUMAH TANGGA (MODE MULTI-PENGGUNA) ---
+-- ===================================================================================
+-- Wajib sebelum mengaktifkan `multi_pengguna = true` di bagian [pengaturan] secrets.toml; jangan
+-- dijalankan untuk mode satu ledger (setelah RLS aktif, anon key tidak lagi bisa membaca tabel).
+-- Aplikasi membuat JWT per rumah tangga (role `authenticated`, klaim `pemilik`) yang ditandatangani
+-- dengan JWT secret proyek (isi `jwt_secret` di bagian [supabase]). Kebijakan di bawah membatasi
+-- select/insert/update/delete, dan juga change feed Realtime, ke baris dengan `pemilik` yang sama
+-- dengan klaim token tersebut.
+-- Baris lama masih NULL dan tidak terlihat oleh siapa pun sampai diisi, mis.:
+--   UPDATE "Cashflow" SET pemilik = 'rumah-a' WHERE pemilik IS NULL;
+-- Jalankan sekali di SQL Editor Supabase; aman dijalankan ulang.
+ALTER TABLE "Cashflow" ADD COLUMN IF NOT EXISTS pemilik text;
+CREATE INDEX IF NOT EXISTS "Cashflow_pemilik_id_idx" ON "Cashflow" (pemilik, id);
+
+ALTER TABLE "Cashflow" ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Cashflow_per_pemilik" ON "Cashflow";
+CREATE POLICY "Cashflow_per_pemilik" ON "Cashflow"
+    FOR ALL TO authenticated
+    USING (pemilik = (auth.jwt() ->> 'pemilik'))
+    WITH CHECK (pemilik = (auth.jwt() ->> 'pemilik'));
@@ -0,0 +1,27 @@
+# ===================================================================================
+# --- TITIK MASUK SERVER (ASGI) ---
+# ===================================================================================
+# Menjalankan app.py lewat st.App agar rute tambahan bisa dipasang di server yang sama:
+#   streamlit run server.py        (atau: uvicorn server:app --port 8501)
+# Rute `/ekspor/{token}` mengalirkan file ekspor CSV/Parquet langsung dari generator, tanpa
+# menampung seluruh file di memori seperti st.download_button. `streamlit run app.py` tetap
+# berfungsi; tombol ekspor lalu kembali memakai st.download_button.
+# Catatan: rute dipasang di akar server, jadi tidak mengikuti server.baseUrlPath.
+from contextlib import asynccontextmanager
+
+import streamlit as st
+from starlette.routing import Route
+
+from cashflow.ekspor import daftar_ekspor, unduh_ekspor
+from cashflow.konstanta import RUTE_EKSPOR
+
+@asynccontextmanager
+async def _siklus_hidup(_app):
+    """Menandai rute ekspor aktif selama server berjalan (dibaca tombol ekspor di app.py)."""
+    daftar_ekspor.rute_aktif = True
+    try:
+        yield
+    finally:
+        daftar_ekspor.rute_aktif = False
+
+app = st.App("app.py", routes=[Route(RUTE_EKSPOR + "/{token}", unduh_ekspor)], lifespan=_siklus_hidup)
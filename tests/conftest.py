@@ -0,0 +1,25 @@
+# ===================================================================================
+# --- FIXTURE BERSAMA ---
+# ===================================================================================
+# Semua test berjalan terhadap FakeSupabase (klien tiruan di memori dari benchmark.py),
+# tanpa proyek Supabase sungguhan dan tanpa mirror di folder .cache proyek.
+import pytest
+
+from benchmark import FakeSupabase, _buat_ledger_fake, buat_ledger_sintetis
+from cashflow.konstanta import TABEL_CASHFLOW
+
+@pytest.fixture
+def buat_klien():
+    """Pabrik FakeSupabase berisi `jumlah_baris` transaksi sintetis (opsi lain diteruskan ke FakeSupabase)."""
+    def buat(jumlah_baris=500, seed=0, **opsi):
+        return FakeSupabase(buat_ledger_sintetis(jumlah_baris, seed).to_dict('records'), **opsi)
+    return buat
+
+@pytest.fixture
+def buat_ledger():
+    """Pabrik LedgerSync (dengan SaldoIndex dan RollupCube) di atas klien tiruan."""
+    return _buat_ledger_fake
+
+def tabel_server(klien):
+    """DataFrame tabel Cashflow di sisi FakeSupabase."""
+    return klien._tabel[TABEL_CASHFLOW]
@@ -0,0 +1,89 @@
+import io
+
+import pyarrow.parquet as pq
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from benchmark import _ledger_bersih
+from cashflow import ekspor
+from cashflow.ekspor import DaftarEkspor, ekspor_csv, ekspor_parquet
+from cashflow.konstanta import KOLOM_EKSPOR, RUTE_EKSPOR
+
+@pytest.fixture(scope="module")
+def df():
+    return _ledger_bersih(2500)
+
+def _byte(generator):
+    return b"".join(generator)
+
+@pytest.mark.parametrize("fungsi", [ekspor_csv, ekspor_parquet])
+def test_byte_ekspor_sama_di_setiap_run_dan_urutan_baris(df, fungsi):
+    pertama = _byte(fungsi(df))
+    assert _byte(fungsi(df)) == pertama
+    assert _byte(fungsi(df.sample(frac=1, random_state=1))) == pertama
+
+def test_csv_sama_untuk_ukuran_chunk_berbeda(df):
+    acuan = _byte(ekspor_csv(df, ukuran_chunk=len(df)))
+    for ukuran_chunk in (1, 7, 1000, 10 * len(df)):
+        assert _byte(ekspor_csv(df, ukuran_chunk=ukuran_chunk)) == acuan
+    header, *baris = acuan.decode().splitlines()
+    assert header == ",".join(KOLOM_EKSPOR) and len(baris) == len(df)
+
+def test_parquet_sama_untuk_ukuran_chunk_berbeda(df):
+    # Byte Parquet berbeda antar ukuran chunk (satu row group per potongan), isi tabelnya tidak.
+    acuan = pq.read_table(io.BytesIO(_byte(ekspor_parquet(df, ukuran_chunk=len(df)))))
+    assert acuan.num_rows == len(df) and acuan.column_names == KOLOM_EKSPOR
+    for ukuran_chunk in (7, 1000):
+        berkas = pq.ParquetFile(io.BytesIO(_byte(ekspor_parquet(df, ukuran_chunk=ukuran_chunk))))
+        assert berkas.metadata.num_row_groups == -(-len(df) // ukuran_chunk)
+        assert berkas.read().equals(acuan)
+
+def test_isi_parquet_sama_dengan_csv(df):
+    tabel = pq.read_table(io.BytesIO(_byte(ekspor_parquet(df)))).to_pandas()
+    csv = tabel.to_csv(index=False, date_format="%Y-%m-%d", lineterminator="\n").encode()
+    assert csv == _byte(ekspor_csv(df))
+
+# --- Rute streaming /ekspor/{token} ---
+@pytest.fixture
+def klien_rute(monkeypatch):
+    daftar = DaftarEkspor(umur=60, batas=3)
+    monkeypatch.setattr(ekspor, "daftar_ekspor", daftar)
+    server = Starlette(routes=[Route(RUTE_EKSPOR + "/{token}", ekspor.unduh_ekspor)])
+    with TestClient(server) as klien:
+        yield klien, daftar
+
+def test_rute_mengalirkan_ekspor_per_potongan(df, klien_rute):
+    klien, daftar = klien_rute
+    token = daftar.daftarkan(df, "CSV", "transaksi")
+    with klien.stream("GET", f"{RUTE_EKSPOR}/{token}") as respons:
+        assert respons.status_code == 200
+        assert respons.headers["content-type"].startswith("text/csv")
+        assert respons.headers["content-disposition"] == 'attachment; filename="transaksi.csv"'
+        assert "content-length" not in respons.headers  # dikirim bertahap (chunked), bukan satu buffer
+        isi = b"".join(respons.iter_bytes())
+    assert isi == _byte(ekspor_csv(df))
+
+    token = daftar.daftarkan(df, "Parquet", "transaksi")
+    respons = klien.get(f"{RUTE_EKSPOR}/{token}")
+    assert respons.headers["content-disposition"].endswith('.parquet"')
+    assert respons.content == _byte(ekspor_parquet(df))
+
+def test_token_tidak_dikenal_ditolak(klien_rute):
+    klien, _ = klien_rute
+    assert klien.get(f"{RUTE_EKSPOR}/tidak-ada").status_code == 404
+
+def test_token_diganti_kedaluwarsa_dan_dibatasi(df, klien_rute, monkeypatch):
+    klien, daftar = klien_rute
+    lama = daftar.daftarkan(df, "CSV", "a")
+    baru = daftar.daftarkan(df, "CSV", "a", ganti=lama)
+    assert daftar.ambil(lama) is None and daftar.ambil(baru) is not None
+
+    tokens = [daftar.daftarkan(df, "CSV", f"b{i}") for i in range(3)]
+    assert daftar.ambil(baru) is None  # batas=3: entri terlama dibuang
+    assert all(daftar.ambil(t) is not None for t in tokens)
+
+    waktu = ekspor.time.monotonic()
+    monkeypatch.setattr(ekspor.time, "monotonic", lambda: waktu + 61)
+    assert klien.get(f"{RUTE_EKSPOR}/{tokens[-1]}").status_code == 404
@@ -0,0 +1,82 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+from cashflow.konstanta import COL_NOMINAL
+
+PETA = {
+    'mode_jenis': app.MODE_JENIS_KOLOM, 'format_tanggal': "DD/MM/YYYY", 'akun_default': "BCA",
+    'tanggal': "Tanggal", 'jenis': "Jenis", 'nominal': "Nominal", 'deskripsi': "Keterangan",
+    'kategori': None, 'akun': None,
+}
+
+def _csv(*baris):
+    return io.BytesIO(("Tanggal,Jenis,Nominal,Keterangan\n" + "\n".join(baris) + "\n").encode())
+
+def _impor(berkas, indeks=None, ukuran_chunk=2):
+    tersimpan = []
+    status = None
+    for status in app.impor_csv(berkas, PETA, indeks or app.IndeksDuplikat(pd.DataFrame()), simpan=tersimpan.extend, ukuran_chunk=ukuran_chunk):
+        pass
+    return tersimpan, status
+
+@pytest.mark.parametrize("teks, nilai", [
+    ("1.500.000", 1_500_000), ("Rp 1.500.000", 1_500_000), ("1.500.000,00", 1_500_000),
+    ("Rp1.500.000,00", 1_500_000), ("-Rp 25.000", -25_000), ("Rp -25.000", -25_000), ("2\xa0000", 2_000), ("", 0),
+])
+def test_parse_nominal_menerima_format_rupiah(teks, nilai):
+    assert app._parse_nominal(teks) == nilai
+
+@pytest.mark.parametrize("teks", ["1.500,50", "abc", "Rp", "1,500,000"])
+def test_parse_nominal_menolak_bukan_rupiah_penuh(teks):
+    with pytest.raises(ValueError):
+        app._parse_nominal(teks)
+
+def test_impor_menerima_rp_dan_koma_desimal_serta_melaporkan_baris_tidak_valid():
+    tersimpan, status = _impor(_csv(
+        '01/02/2024,Keluar,"Rp 1.500.000",Sewa',
+        '02/02/2024,Keluar,"1.500.000,00",Sewa gudang',
+        '03/02/2024,Keluar,"1.500,50",Parkir',
+        '31/02/2024,Masuk,10.000,Tanggal salah',
+        '04/02/2024,Masuk,20.000,Gaji',
+    ))
+    assert [b[COL_NOMINAL] for b in tersimpan] == [1_500_000, 1_500_000, 20_000]
+    assert status['tidak_valid'] == 2
+    assert [(b['baris'], b['Keterangan']) for b in status['contoh_tidak_valid']] == [(4, "Parkir"), (5, "Tanggal salah")]
+
+def test_indeks_duplikat_menghitung_kemunculan_lintas_chunk():
+    db = pd.DataFrame({
+        'tanggal': pd.to_datetime(["2024-01-01", "2024-01-01", "2024-01-02"]), 'jenis': "Keluar", 'akun': "BCA",
+        COL_NOMINAL: [5_000, 5_000, 7_000], 'deskripsi': ["Kopi", "Kopi", "Roti"],
+    })
+    indeks = app.IndeksDuplikat(db)
+    # Database punya dua "Kopi" kembar: salinan ketiga dari file (di chunk berikutnya) tetap baru.
+    assert indeks.saring_baru(db.iloc[[0, 2, 0]]).tolist() == [False, False, False]
+    assert indeks.saring_baru(db.iloc[[0, 2, 2]]).tolist() == [True, True, True]
+    assert indeks.saring_baru(db.iloc[[1]]).tolist() == [True]
+
+def test_indeks_duplikat_sama_dengan_hitungan_per_baris():
+    rng = np.random.default_rng(0)
+    pool = pd.DataFrame({
+        'tanggal': pd.to_datetime("2024-01-01") + pd.to_timedelta(rng.integers(0, 5, 40), unit="D"), 'jenis': "Keluar",
+        'akun': "Cash", COL_NOMINAL: rng.integers(1, 4, 40) * 1000, 'deskripsi': "x",
+    })
+    db, file = pool.sample(60, replace=True, random_state=1), pool.sample(500, replace=True, random_state=2)
+    indeks = app.IndeksDuplikat(db)
+    mask = np.concatenate([indeks.saring_baru(file.iloc[i:i + 37]) for i in range(0, len(file), 37)])
+
+    di_db = pd.Series(app._hash_baris(db)).value_counts()
+    h = pd.Series(app._hash_baris(file))
+    harapan = (h.groupby(h).cumcount() + 1 > h.map(di_db).fillna(0)).to_numpy()
+    assert (mask == harapan).all()
+
+def test_impor_ulang_file_yang_sama_tidak_menambah_baris():
+    berkas = lambda: _csv('01/02/2024,Keluar,5.000,Kopi', '01/02/2024,Keluar,5.000,Kopi', '02/02/2024,Masuk,9.000,Gaji')
+    tersimpan, _ = _impor(berkas())
+    assert len(tersimpan) == 3  # dua transaksi kembar yang sah tetap terimpor
+    db = pd.DataFrame(tersimpan).assign(tanggal=lambda d: pd.to_datetime(d['tanggal']))
+    tersimpan_lagi, status = _impor(berkas(), app.IndeksDuplikat(db))
+    assert tersimpan_lagi == [] and status['duplikat'] == 3
@@ -0,0 +1,134 @@
+import pandas as pd
+import pytest
+
+import app
+from cashflow.konstanta import COL_NOMINAL, KOLOM_WAJIB
+from cashflow.ledger.muat import _bersihkan_data
+
+def _ledger(*baris):
+    """Ledger kecil dari tuple (id, tanggal, jenis, kategori, akun, nominal, deskripsi), dibersihkan seperti hasil query."""
+    return _bersihkan_data(pd.DataFrame(baris, columns=KOLOM_WAJIB))
+
+TOP_UP_RAPI = [
+    (1, "2024-03-01", "Keluar", "Top Up", "BCA", 100_000, "Top Up ke GoPay"),
+    (2, "2024-03-01", "Masuk", "Top Up", "GoPay", 100_000, "Top Up dari BCA"),
+    (3, "2024-03-01", "Keluar", "Biaya Admin", "BCA", 1_000, "Biaya admin Top Up dari BCA ke GoPay"),
+]
+
+def _masalah(temuan):
+    return {(int(i), str(m)) for i, m in zip(temuan['id'], temuan['masalah'])}
+
+def test_ledger_rapi_tanpa_temuan():
+    temuan, statistik = app.periksa_integritas(_ledger(*TOP_UP_RAPI, (4, "2024-03-02", "Keluar", "Food & Grocery", "Cash", 25_000, "Bakso")))
+    assert temuan.empty
+    assert statistik == {'baris': 4, 'kaki_top_up': 2, 'top_up_berpasangan': 1, 'biaya_admin': 1}
+
+def test_ledger_kosong():
+    temuan, statistik = app.periksa_integritas(_ledger())
+    assert temuan.empty and list(temuan.columns) == app.KOLOM_EKSPOR + ['masalah', 'keterangan', 'grup']
+    assert statistik == {'baris': 0, 'kaki_top_up': 0, 'top_up_berpasangan': 0, 'biaya_admin': 0}
+
+def test_top_up_tanpa_pasangan():
+    temuan, statistik = app.periksa_integritas(_ledger(
+        (1, "2024-03-01", "Keluar", "Top Up", "BCA", 100_000, "Top Up ke GoPay"),
+        (2, "2024-03-05", "Masuk", "Top Up", "Jago", 40_000, "Top Up dari Cash"),
+    ))
+    assert _masalah(temuan) == {(1, app.MASALAH_TOP_UP_YATIM), (2, app.MASALAH_TOP_UP_YATIM)}
+    keterangan = dict(zip(temuan['id'], temuan['keterangan']))
+    assert keterangan == {1: "Tidak ada kaki Masuk yang cocok", 2: "Tidak ada kaki Keluar yang cocok"}
+    assert statistik['kaki_top_up'] == 2 and statistik['top_up_berpasangan'] == 0
+
+def test_top_up_tidak_seimbang_dipasangkan_dalam_satu_grup():
+    temuan, statistik = app.periksa_integritas(_ledger(
+        (1, "2024-03-01", "Keluar", "Top Up", "BCA", 100_000, "Top Up ke GoPay"),
+        (2, "2024-03-01", "Masuk", "Top Up", "GoPay", 90_000, "Top Up dari BCA"),
+    ))
+    assert _masalah(temuan) == {(1, app.MASALAH_TOP_UP_TIDAK_SEIMBANG), (2, app.MASALAH_TOP_UP_TIDAK_SEIMBANG)}
+    assert temuan['grup'].nunique() == 1
+    assert set(temuan['keterangan']) == {"Keluar Rp 100.000 vs Masuk Rp 90.000 (selisih Rp 10.000)"}
+    assert statistik['top_up_berpasangan'] == 0
+
+def test_top_up_dengan_deskripsi_diedit_dipasangkan_lewat_tanggal_dan_nominal():
+    df = _ledger(
+        (1, "2024-03-01", "Keluar", "Top Up", "BCA", 50_000, "isi saldo"),
+        (2, "2024-03-01", "Masuk", "Top Up", "GoPay", 50_000, "dari rekening"),
+        (3, "2024-03-02", "Keluar", "Top Up", "Cash", 20_000, "pindah"),
+        (4, "2024-03-02", "Masuk", "Top Up", "Cash", 20_000, "pindah juga"),  # akun sama: bukan Top Up
+    )
+    temuan, statistik = app.periksa_integritas(df)
+    assert _masalah(temuan) == {(3, app.MASALAH_TOP_UP_YATIM), (4, app.MASALAH_TOP_UP_YATIM)}
+    assert statistik['top_up_berpasangan'] == 1
+
+def test_biaya_admin_tanpa_top_up():
+    temuan, statistik = app.periksa_integritas(_ledger(
+        *TOP_UP_RAPI,
+        (4, "2024-03-09", "Keluar", "Biaya Admin", "BCA", 1_000, "Biaya admin Top Up dari BCA ke GoPay"),
+        (5, "2024-03-01", "Keluar", "Biaya Admin", "Jago", 1_000, "Biaya admin Top Up dari BCA ke GoPay"),  # akun lain
+    ))
+    assert _masalah(temuan) == {(4, app.MASALAH_BIAYA_ADMIN_YATIM), (5, app.MASALAH_BIAYA_ADMIN_YATIM)}
+    assert statistik['biaya_admin'] == 3
+
+def test_duplikat_persis_dikelompokkan():
+    temuan, _ = app.periksa_integritas(_ledger(
+        (1, "2024-03-01", "Keluar", "Food & Grocery", "Cash", 25_000, "Bakso"),
+        (2, "2024-03-01", "Keluar", "Food & Grocery", "Cash", 25_000, "Bakso "),  # spasi di tepi diabaikan
+        (3, "2024-03-01", "Keluar", "Food & Grocery", "Cash", 25_000, "Bakso"),
+        (4, "2024-03-01", "Keluar", "Food & Grocery", "Cash", 26_000, "Bakso"),  # nominal beda
+        (5, "2024-03-01", "Keluar", "Food & Grocery", "BCA", 25_000, "Bakso"),  # akun beda
+        (6, "2024-03-02", "Masuk", "Gaji", "BCA", 5_000_000, "Gaji"),
+        (7, "2024-03-02", "Masuk", "Gaji", "BCA", 5_000_000, "Gaji"),
+    ))
+    assert set(temuan['masalah']) == {app.MASALAH_DUPLIKAT}
+    grup = temuan.groupby('grup')['id'].apply(lambda ids: sorted(int(i) for i in ids)).tolist()
+    assert sorted(grup) == [[1, 2, 3], [6, 7]]
+    assert dict(zip(temuan['id'], temuan['keterangan']))[1] == "3 transaksi identik"
+
+def test_statistik_dan_urutan_temuan_gabungan():
+    temuan, statistik = app.periksa_integritas(_ledger(
+        *TOP_UP_RAPI,
+        (4, "2024-03-03", "Keluar", "Top Up", "Jago", 70_000, "Top Up ke e-Money"),
+        (5, "2024-03-04", "Keluar", "Top Up", "BCA", 100_000, "Top Up ke ShopeePay"),
+        (6, "2024-03-04", "Masuk", "Top Up", "ShopeePay", 99_000, "Top Up dari BCA"),
+        (7, "2024-03-06", "Keluar", "Biaya Admin", "Cash", 500, "Biaya admin Top Up dari Cash ke Jago"),
+        (8, "2024-03-07", "Keluar", "Internet", "BCA", 300_000, "Wifi"),
+        (9, "2024-03-07", "Keluar", "Internet", "BCA", 300_000, "Wifi"),
+    ))
+    assert statistik == {'baris': 9, 'kaki_top_up': 5, 'top_up_berpasangan': 1, 'biaya_admin': 2}
+    assert temuan['masalah'].astype(str).tolist() == [
+        app.MASALAH_TOP_UP_YATIM, app.MASALAH_TOP_UP_TIDAK_SEIMBANG, app.MASALAH_TOP_UP_TIDAK_SEIMBANG,
+        app.MASALAH_BIAYA_ADMIN_YATIM, app.MASALAH_DUPLIKAT, app.MASALAH_DUPLIKAT,
+    ]
+    assert temuan['id'].tolist()[0] == 4 and temuan['id'].tolist()[3] == 7
+
+# --- main_cli ---
+
+@pytest.fixture
+def file_ledger(tmp_path):
+    def tulis(baris, ekstensi="csv"):
+        path = tmp_path / f"transaksi.{ekstensi}"
+        df = pd.DataFrame(baris, columns=KOLOM_WAJIB)
+        df.to_csv(path, index=False) if ekstensi == "csv" else df.to_parquet(path, index=False)
+        return str(path)
+    return tulis
+
+def test_cli_ledger_rapi_exit_0(file_ledger, capsys):
+    assert app.main_cli(["periksa", "--file", file_ledger(TOP_UP_RAPI)]) == 0
+    keluaran = capsys.readouterr().out
+    assert "3 transaksi diperiksa" in keluaran and "1 Top Up berpasangan dari 2 kaki, 1 biaya admin" in keluaran
+
+@pytest.mark.parametrize("ekstensi", ["csv", "parquet"])
+def test_cli_temuan_exit_1_dan_disimpan(file_ledger, tmp_path, capsys, ekstensi):
+    path = file_ledger([
+        *TOP_UP_RAPI,
+        (4, "2024-03-03", "Keluar", "Top Up", "Jago", 70_000, "Top Up ke e-Money"),
+        (5, "2024-03-07", "Keluar", "Internet", "BCA", 300_000, "Wifi"),
+        (6, "2024-03-07", "Keluar", "Internet", "BCA", 300_000, "Wifi"),
+    ], ekstensi)
+    keluaran_csv = tmp_path / "temuan.csv"
+    assert app.main_cli(["periksa", "--file", path, "--output", str(keluaran_csv), "--tampilkan", "0"]) == 1
+    baris_ringkasan = dict(b.strip().rsplit(None, 1) for b in capsys.readouterr().out.splitlines() if b.startswith("  "))
+    assert baris_ringkasan[app.MASALAH_TOP_UP_YATIM] == "1" and baris_ringkasan[app.MASALAH_DUPLIKAT] == "2"
+    assert baris_ringkasan[app.MASALAH_TOP_UP_TIDAK_SEIMBANG] == "0"
+    temuan = pd.read_csv(keluaran_csv)
+    assert sorted(temuan['id']) == [4, 5, 6]
+    assert temuan.loc[temuan['id'] == 4, COL_NOMINAL].item() == 70_000
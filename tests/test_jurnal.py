@@ -0,0 +1,99 @@
+import time
+
+import pytest
+
+from benchmark import _tunggu, buat_ledger_sintetis
+from cashflow.sync import JurnalTulis, PenulisLatar
+from conftest import tabel_server
+
+@pytest.fixture
+def jurnal():
+    return JurnalTulis(":memory:")
+
+def _gagalkan(jurnal, kunci):
+    jurnal.catat_gagal([kunci], "timeout", maks_percobaan=1)
+
+def test_mutasi_gagal_menahan_mutasi_berikutnya_pemilik_sama(jurnal):
+    insert = jurnal.tambah("insert", [{'deskripsi': "a"}])
+    update = jurnal.tambah("update", {'deskripsi': "b"}, id_target=5)
+    lain = jurnal.tambah("delete", {}, id_target=9, pemilik="rumah-lain")
+    assert [m['kunci'] for m in jurnal.berikutnya()[0]] == [insert]
+
+    _gagalkan(jurnal, insert)
+    # Update milik pemilik yang sama tidak boleh mendahului insert yang gagal; pemilik lain tetap jalan.
+    assert [m['kunci'] for m in jurnal.berikutnya()[0]] == [lain]
+    jurnal.selesai([lain])
+    assert jurnal.berikutnya() == ([], None)
+    assert jurnal.ringkasan() == {'menunggu': 1, 'gagal': 1, 'ditahan': 1}
+
+    jurnal.ulangi()
+    assert [m['kunci'] for m in jurnal.berikutnya()[0]] == [insert]
+    _gagalkan(jurnal, insert)
+    jurnal.buang_gagal()
+    assert [m['kunci'] for m in jurnal.berikutnya()[0]] == [update]
+    assert jurnal.ringkasan() == {'menunggu': 1, 'gagal': 0, 'ditahan': 0}
+
+def test_batch_insert_berhenti_di_mutasi_lain(jurnal):
+    kunci = [jurnal.tambah("insert", [{'deskripsi': str(i)}]) for i in range(3)]
+    jurnal.tambah("update", {'deskripsi': "x"}, id_target=1)
+    jurnal.tambah("insert", [{'deskripsi': "sesudah update"}])
+    assert [m['kunci'] for m in jurnal.berikutnya()[0]] == kunci
+
+def test_batch_insert_tidak_mencampur_pemilik(jurnal):
+    a = [jurnal.tambah("insert", [{'deskripsi': str(i)}], pemilik="rumah-a") for i in range(2)]
+    b = jurnal.tambah("insert", [{'deskripsi': "b"}], pemilik="rumah-b")
+    assert [m['kunci'] for m in jurnal.berikutnya()[0]] == a
+    jurnal.selesai(a)
+    assert [m['kunci'] for m in jurnal.berikutnya()[0]] == [b]
+
+def test_penulis_latar_memakai_klien_pemilik(buat_klien, buat_ledger, jurnal):
+    klien = buat_klien(10)
+    ledger = buat_ledger(klien)
+    ledger.get()
+    dipakai = []
+
+    def klien_pemilik(pemilik):  # klien dengan token rumah tangga pada aplikasi
+        dipakai.append(pemilik)
+        return klien
+
+    baris = buat_ledger_sintetis(2, seed=1).drop(columns='id').to_dict('records')
+    penulis = PenulisLatar(jurnal, klien, ledger, klien_pemilik=klien_pemilik).mulai()
+    try:
+        penulis.antre("insert", [baris[0]])
+        penulis.antre("insert", [{**baris[1], 'pemilik': "rumah-a"}], pemilik="rumah-a")
+        penulis.antre("update", {'deskripsi': "b"}, id_target=3, pemilik="rumah-b")
+        _tunggu(lambda: not any(n for p in (None, "rumah-a", "rumah-b") for n in jurnal.ringkasan(p).values()))
+    finally:
+        penulis.berhenti(timeout=5)
+    assert dipakai == ["rumah-a", "rumah-b"]
+
+def test_penulis_latar_menjaga_urutan_edit_setelah_gagal(buat_klien, buat_ledger):
+    klien = buat_klien(50)
+    ledger = buat_ledger(klien)
+    ledger.get()
+    jurnal = JurnalTulis(":memory:")
+    kirim_asli, gagal = klien._jalankan, {'sisa': 1}
+
+    def jalankan(q):  # request tulis pertama gagal, berikutnya normal
+        if q._aksi != "select" and gagal['sisa']:
+            gagal['sisa'] -= 1
+            raise ConnectionError("koneksi terputus")
+        return kirim_asli(q)
+    klien._jalankan = jalankan
+
+    penulis = PenulisLatar(jurnal, klien, ledger, maks_percobaan=1, jeda_awal=0.01).mulai()
+    try:
+        penulis.antre("update", {'deskripsi': "edit pertama"}, id_target=3)
+        penulis.antre("update", {'deskripsi': "edit kedua"}, id_target=3)
+        _tunggu(lambda: jurnal.ringkasan()['gagal'] == 1)
+        time.sleep(0.1)
+        # Edit kedua ditahan; tanpa penahanan ia terkirim lebih dulu lalu ditimpa edit pertama saat diulang.
+        assert jurnal.ringkasan() == {'menunggu': 1, 'gagal': 1, 'ditahan': 1}
+        penulis.ulangi()
+        _tunggu(lambda: not any(jurnal.ringkasan().values()))
+    finally:
+        penulis.berhenti(timeout=5)
+    server = tabel_server(klien)
+    assert server.loc[server['id'] == 3, 'deskripsi'].item() == "edit kedua"
+    df = ledger.snapshot()[1]
+    assert df.loc[df['id'] == 3, 'deskripsi'].item() == "edit kedua"
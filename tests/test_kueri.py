@@ -0,0 +1,124 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark import _kueri_contoh, _ledger_bersih
+from cashflow.konstanta import (
+    COL_NOMINAL,
+    JENIS_PEMASUKAN,
+    JENIS_PENGELUARAN,
+    KATEGORI_PEMASUKAN,
+    KATEGORI_PENGELUARAN,
+    KATEGORI_TOP_UP,
+    PILIHAN_AKUN,
+)
+from cashflow.ledger import KueriLedger
+from cashflow.ledger import indeks as modul_indeks
+
+@pytest.fixture(scope="module")
+def df():
+    return _ledger_bersih(4000)
+
+@pytest.fixture(scope="module", params=["pandas", "duckdb"])
+def kueri(request, df):
+    if request.param == "duckdb":
+        pytest.importorskip("duckdb")
+    return KueriLedger(df, request.param)
+
+def _rentang(df):
+    """(tanggal pertama, tanggal terakhir) ledger sintetis."""
+    return df['tanggal'].min().date(), df['tanggal'].max().date()
+
+def _kasus(df):
+    """Nama -> argumen agregasi(): rentang tanggal, filter dimensi, dan group-by yang dipakai halaman."""
+    awal, akhir = _rentang(df)
+    tengah = awal + (akhir - awal) / 2
+    tahun = akhir.year
+    return {
+        'total_semua': dict(ukuran=['total', 'jumlah', 'rata_rata', 'mutasi']),
+        'rentang_per_hari': dict(tgl_awal=tengah, tgl_akhir=akhir, kelompok=['hari'], ukuran=['total', 'jumlah']),
+        'rentang_satu_hari': dict(tgl_awal=tengah, tgl_akhir=tengah, kelompok=['akun'], ukuran=['total', 'jumlah']),
+        'hanya_tgl_awal': dict(tgl_awal=tengah, kelompok=['jenis'], ukuran=['total']),
+        'hanya_tgl_akhir': dict(tgl_akhir=tengah, kelompok=['akun'], ukuran=['mutasi']),
+        'di_luar_data': dict(tgl_awal=date(1990, 1, 1), tgl_akhir=date(1990, 12, 31), kelompok=['kategori'], ukuran=['total', 'jumlah']),
+        'di_luar_data_tanpa_kelompok': dict(tgl_akhir=date(1990, 12, 31), ukuran=['total', 'jumlah', 'rata_rata']),
+        'saring_kosong': dict(saring={'akun': []}, kelompok=['akun'], ukuran=['total']),
+        'filter_tahun_bulan_akun': dict(saring={'tahun': [tahun], 'bulan': [1, 6, 12], 'akun': PILIHAN_AKUN[:2]},
+                                        kelompok=['bulan'], ukuran=['total', 'jumlah', 'rata_rata']),
+        'saring_hari': dict(saring={'hari': [np.datetime64(tengah, 'D'), np.datetime64(akhir, 'D')]}, kelompok=['jenis', 'akun'], ukuran=['total']),
+        'pie_pengeluaran': dict(tgl_awal=tengah, tgl_akhir=akhir, saring={'jenis': [JENIS_PENGELUARAN]}, kelompok=['kategori'], ukuran=['total']),
+        'per_tahun_bulan': dict(kelompok=['tahun', 'bulan'], ukuran=['total', 'jumlah', 'mutasi']),
+        'rollup_cube': dict(kelompok=['hari', 'jenis', 'kategori', 'akun'], ukuran=['total', 'jumlah']),
+        **_kueri_contoh(df),
+    }
+
+def _acuan(df, tgl_awal=None, tgl_akhir=None, saring=None, kelompok=(), ukuran=('total',)):
+    """Agregasi yang sama ditulis langsung dengan filter mask + groupby pandas, tanpa KueriLedger."""
+    data = df.assign(
+        hari=df['tanggal'].dt.normalize().astype('datetime64[s]'), bulan=df['tanggal'].dt.month.astype('int64'),
+        tahun=df['tanggal'].dt.year.astype('int64'),
+        mutasi=np.where(df['jenis'] == JENIS_PEMASUKAN, df[COL_NOMINAL], np.where(df['jenis'] == JENIS_PENGELUARAN, -df[COL_NOMINAL], 0)),
+    )
+    if tgl_awal is not None:
+        data = data[data['tanggal'].dt.date >= tgl_awal]
+    if tgl_akhir is not None:
+        data = data[data['tanggal'].dt.date <= tgl_akhir]
+    for dimensi, nilai in (saring or {}).items():
+        data = data[data[dimensi].isin(list(nilai))]
+    kelompok, ukuran = list(kelompok), list(ukuran)
+    if kelompok:
+        hasil = data.groupby(kelompok, observed=True).agg(
+            total=(COL_NOMINAL, 'sum'), jumlah=(COL_NOMINAL, 'size'), mutasi=('mutasi', 'sum')).reset_index()
+    else:
+        hasil = pd.DataFrame({'total': [data[COL_NOMINAL].sum()], 'jumlah': [len(data)], 'mutasi': [data['mutasi'].sum()]})
+    hasil['rata_rata'] = hasil['total'] / hasil['jumlah'].where(hasil['jumlah'] > 0)
+    return hasil[kelompok + ukuran]
+
+def _nama_kasus():
+    return list(_kasus(_ledger_bersih(50)))
+
+@pytest.mark.parametrize("nama", _nama_kasus())
+def test_agregasi_sama_dengan_pandas_langsung(df, kueri, nama):
+    argumen = _kasus(df)[nama]
+    pd.testing.assert_frame_equal(kueri.agregasi(**argumen), _acuan(df, **argumen), check_dtype=False)
+
+@pytest.mark.parametrize("nama", _nama_kasus())
+def test_duckdb_identik_dengan_pandas(df, nama):
+    pytest.importorskip("duckdb")
+    argumen = _kasus(df)[nama]
+    pd.testing.assert_frame_equal(KueriLedger(df, "duckdb").agregasi(**argumen), KueriLedger(df, "pandas").agregasi(**argumen))
+
+def test_sama_dengan_agregasi_dashboard_dan_saldo_awal(df, kueri):
+    awal, akhir = _rentang(df)
+    tgl_awal = awal + (akhir - awal) / 3
+    mask_tanggal = (df['tanggal'].dt.date >= tgl_awal) & (df['tanggal'].dt.date <= akhir)
+    bukan_top_up = df['kategori'] != KATEGORI_TOP_UP
+    for jenis, kategori in [(JENIS_PENGELUARAN, KATEGORI_PENGELUARAN), (JENIS_PEMASUKAN, KATEGORI_PEMASUKAN)]:
+        # Pie chart dashboard sebelum lapisan kueri: filter mask lalu groupby kategori.
+        awal_pie = df[mask_tanggal & bukan_top_up & (df['jenis'] == jenis)].groupby('kategori', observed=True)[COL_NOMINAL].sum()
+        pie = kueri.agregasi(tgl_awal, akhir, saring={'jenis': [jenis], 'kategori': [k for k in kategori if k != KATEGORI_TOP_UP]},
+                             kelompok=['kategori'])
+        assert dict(zip(pie['kategori'], pie['total'])) == {k: v for k, v in awal_pie.items() if v}
+
+    # Saldo Akun sebelum SaldoIndex: groupby Masuk dan Keluar per akun, lalu concat.
+    per_tanggal = df[df['tanggal'].dt.date <= akhir]
+    masuk = per_tanggal[per_tanggal['jenis'] == JENIS_PEMASUKAN].groupby('akun', observed=True)[COL_NOMINAL].sum()
+    keluar = per_tanggal[per_tanggal['jenis'] == JENIS_PENGELUARAN].groupby('akun', observed=True)[COL_NOMINAL].sum()
+    saldo_awal = pd.concat([masuk, keluar], axis=1).fillna(0).pipe(lambda s: s.iloc[:, 0] - s.iloc[:, 1])
+    saldo = kueri.agregasi(tgl_akhir=akhir, saring={'jenis': [JENIS_PEMASUKAN, JENIS_PENGELUARAN]}, kelompok=['akun'], ukuran=['mutasi'])
+    assert dict(zip(saldo['akun'], saldo['mutasi'])) == {a: int(v) for a, v in saldo_awal.items()}
+
+def test_tanpa_duckdb_memakai_pandas(df, monkeypatch):
+    monkeypatch.setattr(modul_indeks, "_duckdb", lambda: None)
+    assert KueriLedger(df).mesin == "pandas"
+    with pytest.raises(RuntimeError):
+        KueriLedger(df, "duckdb")
+
+def test_dimensi_dan_ukuran_tidak_dikenal_ditolak(df):
+    kueri = KueriLedger(df, "pandas")
+    with pytest.raises(ValueError):
+        kueri.agregasi(kelompok=['deskripsi'])
+    with pytest.raises(ValueError):
+        kueri.agregasi(ukuran=['median'])
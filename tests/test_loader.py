@@ -0,0 +1,97 @@
+from benchmark import FakeSupabase, buat_ledger_sintetis
+from cashflow.konstanta import COL_NOMINAL, TABEL_CASHFLOW
+from cashflow.ledger.muat import _ambil_berdasarkan_id, _ambil_tabel_berhalaman
+
+def _buat_query(klien):
+    return lambda kolom="*", **opsi: klien.table(TABEL_CASHFLOW).select(kolom, **opsi)
+
+def _klien_dengan_id(ids, max_rows=100):
+    baris = buat_ledger_sintetis(len(ids)).assign(id=ids)
+    return FakeSupabase(baris.to_dict('records'), max_rows=max_rows)
+
+def test_halaman_dibatasi_max_rows(buat_klien):
+    klien = buat_klien(1050, max_rows=100)
+    df = _ambil_tabel_berhalaman(_buat_query(klien), ukuran_halaman=100, jumlah_worker=3)
+    assert df['id'].tolist() == list(range(1, 1051))
+    assert df[COL_NOMINAL].dtype == 'int64' and df['kategori'].dtype == 'category'  # sudah dibersihkan
+    # 2 request batas id/hitungan + 3 jalur x (3 halaman penuh + 1 halaman pendek yang mengakhiri jalur).
+    assert klien.jumlah_request == 2 + 3 * 4
+
+def test_id_jarang_dan_tidak_berurutan():
+    ids = [3, 4, 10, 250, 251, 999, 1000, 5000, 5001, 5002, 12_345]  # celah jauh lebih lebar dari satu halaman
+    klien = _klien_dengan_id(ids)
+    df = _ambil_tabel_berhalaman(_buat_query(klien), ukuran_halaman=100)
+    assert df['id'].tolist() == ids
+
+def test_rentang_delta_dan_saring(buat_klien):
+    klien = buat_klien(500, max_rows=100)
+    df = _ambil_tabel_berhalaman(
+        _buat_query(klien), id_lebih_dari=120, id_maksimal=430, ukuran_halaman=100,
+        saring=lambda q: q.eq('akun', "BCA"),
+    )
+    server = buat_ledger_sintetis(500)
+    harapan = server[(server['id'] > 120) & (server['id'] <= 430) & (server['akun'] == "BCA")]['id'].tolist()
+    assert df['id'].tolist() == harapan
+
+def test_kolom_id_saja_tidak_dibersihkan(buat_klien):
+    df = _ambil_tabel_berhalaman(_buat_query(buat_klien(250)), kolom="id", ukuran_halaman=100)
+    assert list(df.columns) == ['id'] and len(df) == 250
+
+def test_tabel_kosong():
+    assert _ambil_tabel_berhalaman(_buat_query(FakeSupabase()), ukuran_halaman=100).empty
+
+def test_id_jarang_tanpa_request_kosong():
+    # Keyset: celah id selebar apa pun tidak menghasilkan halaman kosong (dulu satu request per rentang 100 id).
+    ids = list(range(1, 51)) + list(range(1_000_000, 1_000_050))
+    klien = _klien_dengan_id(ids)
+    df = _ambil_tabel_berhalaman(_buat_query(klien), ukuran_halaman=100, jumlah_worker=1)
+    assert df['id'].tolist() == ids
+    assert klien.jumlah_request == 2 + 1
+
+def test_ukuran_halaman_diturunkan_ke_max_rows(buat_klien, caplog):
+    # ukuran_halaman melebihi max-rows server: halaman 100 baris bukan akhir data, jadi tidak ada yang terlewat.
+    klien = buat_klien(900, max_rows=100)
+    df = _ambil_tabel_berhalaman(_buat_query(klien), ukuran_halaman=300)
+    assert df['id'].tolist() == list(range(1, 901))
+    assert "max-rows" in caplog.text
+
+def test_hapus_bersamaan_tidak_menggagalkan_pemuatan(buat_klien, caplog):
+    klien = buat_klien(600, max_rows=100)
+    jalankan = klien._jalankan
+
+    def hapus_setelah_hitungan(q):
+        respons = jalankan(q)
+        if q._count:  # baris dihapus perangkat lain setelah hitungan awal diambil
+            klien.table(TABEL_CASHFLOW).delete().in_('id', [50, 51, 400]).execute()
+        return respons
+    klien._jalankan = hapus_setelah_hitungan
+
+    df = _ambil_tabel_berhalaman(_buat_query(klien), ukuran_halaman=100)
+    assert df['id'].tolist() == [i for i in range(1, 601) if i not in (50, 51, 400)]
+    assert "597 dari 600 baris" in caplog.text
+
+def test_pemuatan_kurang_direkonsiliasi_sinkron_delta(buat_klien, buat_ledger):
+    klien = buat_klien(500, max_rows=100)
+    ledger = buat_ledger(klien, interval=0)
+    jalankan = klien._jalankan
+
+    def sembunyikan_halaman(q):
+        respons = jalankan(q)
+        if q._kolom == "*" and respons.data and respons.data[0]['id'] > 200:
+            respons.data = []  # satu jalur berhenti lebih awal: pemuatan kurang dari hitungan server
+        return respons
+    klien._jalankan = sembunyikan_halaman
+    _, df = ledger.get()
+    assert len(df) < 500
+
+    klien._jalankan = jalankan
+    _, df = ledger.get()
+    assert sorted(df['id']) == list(range(1, 501))
+
+def test_ambil_berdasarkan_id_per_batch(buat_klien, monkeypatch):
+    monkeypatch.setattr("cashflow.ledger.muat.UKURAN_BATCH_ID", 7)
+    klien = buat_klien(100)
+    ids = [90, 2, 55, 13, 77, 1, 8, 34, 21, 5]
+    df = _ambil_berdasarkan_id(_buat_query(klien), ids)
+    assert df['id'].tolist() == sorted(ids)
+    assert klien.jumlah_request == 2
@@ -0,0 +1,80 @@
+import ast
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from cashflow.metrik import Metrik, metrik
+
+PATH_APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+@pytest.fixture
+def metrik_aktif():
+    """Registry bersama dinyalakan seperti oleh operator (`instrumentasi = true`), lalu dipulihkan."""
+    semula = metrik.aktif
+    metrik.aktif = True
+    yield metrik
+    metrik.aktif = semula
+
+def _jalankan_app(pengaturan=None, menu="Catat Transaksi"):
+    at = AppTest.from_file(PATH_APP, default_timeout=60)
+    at.secrets["supabase"] = {"url": "http://127.0.0.1:9", "key": "bukan.kunci.asli"}
+    at.secrets["pengaturan"] = {"mirror_path": "", **(pengaturan or {})}
+    at.session_state["menu"] = menu  # default: halaman tanpa query ke database
+    return at.run()
+
+def _toggle_panel(at):
+    return [t for t in at.sidebar.toggle if t.key == "panel_performa"]
+
+def test_metrik_mati_hanya_pengecekan_boolean():
+    m = Metrik(aktif=False)
+    with m.ukur("contoh_detik"):
+        m.hitung("contoh_total")
+    assert m.snapshot()['histogram'] == [] and m.snapshot()['penghitung'] == []
+
+def test_toggle_sesi_tidak_mematikan_registry_bersama(metrik_aktif):
+    at = _jalankan_app()
+    assert not at.exception
+    at.sidebar.toggle(key="panel_performa").set_value(True).run()
+    assert any(e.label == "🩺 Panel Performa" for e in at.expander)
+    at.sidebar.toggle(key="panel_performa").set_value(False).run()
+    assert not any(e.label == "🩺 Panel Performa" for e in at.expander)
+    assert metrik_aktif.aktif  # sesi lain tetap terukur
+
+def test_panel_tidak_muncul_tanpa_instrumentasi():
+    semula, metrik.aktif = metrik.aktif, False
+    try:
+        assert not _toggle_panel(_jalankan_app())
+    finally:
+        metrik.aktif = semula
+
+def test_panel_hanya_untuk_admin(metrik_aktif):
+    # Ada daftar admin tetapi sesi ini belum login: toggle tidak ditampilkan sama sekali.
+    assert not _toggle_panel(_jalankan_app({"admin": ["admin@contoh.id"]}))
+    # Mode multi-pengguna tanpa daftar admin: tidak ada sesi yang boleh melihat metrik semua rumah tangga.
+    at = _jalankan_app({"multi_pengguna": True})
+    assert not _toggle_panel(at)
+
+def _dekorator(fungsi):
+    """Dekorator sebuah FunctionDef sebagai teks sumber, mis. ['st.fragment', "terukur('halaman_detik')"]."""
+    return [ast.unparse(d) for d in fungsi.decorator_list]
+
+def test_setiap_halaman_router_adalah_fragmen_terukur():
+    with open(PATH_APP) as f:
+        modul = ast.parse(f.read())
+    fungsi = {n.name: n for n in modul.body if isinstance(n, ast.FunctionDef)}
+    halaman = {
+        n.func.id for n in ast.walk(fungsi['main'])
+        if isinstance(n, ast.Call) and isinstance(n.func, ast.Name) and n.func.id.startswith("halaman_")
+    }
+    assert len(halaman) == 6
+    for nama in halaman:
+        assert _dekorator(fungsi[nama]) == ["st.fragment", "terukur('halaman_detik')"], nama
+    # Histogram halaman hanya berisi halaman router, bukan helper di dalamnya.
+    assert {n for n, f in fungsi.items() if "terukur('halaman_detik')" in _dekorator(f)} == halaman
+
+def test_halaman_impor_tercatat_di_histogram_halaman(metrik_aktif):
+    at = _jalankan_app(menu="Impor Transaksi")
+    assert not at.exception
+    fungsi = {h['label'].get('fungsi') for h in metrik_aktif.snapshot()['histogram'] if h['nama'] == "halaman_detik"}
+    assert "halaman_impor_transaksi" in fungsi and "_tampilkan_baris_tidak_valid" not in fungsi
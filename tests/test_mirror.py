@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from benchmark import buat_ledger_sintetis
+from cashflow.konstanta import TABEL_CASHFLOW
+from cashflow.ledger import LedgerMirror
+from cashflow.ledger import mirror as modul_mirror
+from conftest import tabel_server
+
+@pytest.fixture
+def mirror(tmp_path):
+    return LedgerMirror(str(tmp_path / "ledger.arrow"))
+
+def _isi_mirror(buat_klien, buat_ledger, mirror):
+    """Ledger yang sudah dimuat dari klien tiruan dan menyimpan mirror yang valid."""
+    klien = buat_klien(300)
+    ledger = buat_ledger(klien, mirror=mirror)
+    ledger.get()
+    assert mirror.muat() is not None
+    return klien
+
+def _muat_ulang(klien, buat_ledger, mirror):
+    """(ledger baru di atas mirror yang sama, jumlah request saat memuatnya)."""
+    awal = klien.jumlah_request
+    ledger = buat_ledger(klien, mirror=mirror)
+    ledger.get()
+    return ledger, klien.jumlah_request - awal
+
+def _rusak(path, ubah):
+    with open(path, 'rb') as f:
+        isi = f.read()
+    with open(path, 'wb') as f:
+        f.write(ubah(isi))
+
+@pytest.mark.parametrize("berkas, ubah", [
+    ("", lambda isi: isi[:100] + bytes([isi[100] ^ 0xFF]) + isi[101:]),  # satu byte data berubah
+    ("", lambda isi: isi[:len(isi) // 2]),  # file terpotong
+    (".crc32", lambda isi: b"deadbeef"),
+    (".crc32", lambda isi: isi[:3]),
+    (".crc32", lambda isi: b""),
+])
+def test_mirror_rusak_ditolak_lalu_dibangun_ulang(buat_klien, buat_ledger, mirror, berkas, ubah):
+    klien = _isi_mirror(buat_klien, buat_ledger, mirror)
+    _, request_mirror_sehat = _muat_ulang(klien, buat_ledger, mirror)
+    _rusak(mirror.path + berkas, ubah)
+
+    assert mirror.muat() is None
+    assert not os.path.exists(mirror.path) and not os.path.exists(mirror.path + ".crc32")
+    ledger, request = _muat_ulang(klien, buat_ledger, mirror)
+    assert request > request_mirror_sehat  # muat penuh dari database, bukan dari mirror
+    assert sorted(ledger.snapshot()[1]['id']) == sorted(tabel_server(klien)['id'])
+    assert mirror.muat() is not None  # mirror yang baru kembali valid
+
+def test_checksum_hilang_ditolak(buat_klien, buat_ledger, mirror):
+    _isi_mirror(buat_klien, buat_ledger, mirror)
+    os.remove(mirror.path + ".crc32")
+    assert mirror.muat() is None
+
+def test_file_data_baru_dengan_checksum_lama_ditolak(buat_klien, buat_ledger, mirror, tmp_path):
+    _isi_mirror(buat_klien, buat_ledger, mirror)
+    lain = LedgerMirror(str(tmp_path / "lain.arrow"))
+    lain.simpan(buat_ledger_sintetis(10, seed=5), 10, None)
+    os.replace(lain.path, mirror.path)  # file Arrow yang valid, tetapi checksum-nya milik file lama
+    assert mirror.muat() is None
+
+def test_crash_di_antara_checksum_dan_file_data(buat_klien, buat_ledger, mirror, monkeypatch):
+    klien = _isi_mirror(buat_klien, buat_ledger, mirror)
+    ledger = buat_ledger(klien, mirror=mirror)
+    ledger.get()
+    klien.table(TABEL_CASHFLOW).insert(buat_ledger_sintetis(5, seed=9).drop(columns='id').to_dict('records')).execute()
+
+    replace_asli = os.replace
+
+    def mati_sebelum_file_data(sumber, tujuan):
+        if tujuan == mirror.path:
+            raise OSError("proses mati")
+        replace_asli(sumber, tujuan)
+    monkeypatch.setattr(modul_mirror.os, "replace", mati_sebelum_file_data)
+    ledger.full_reload()  # checksum baru sudah terpasang, file data lama tidak sempat diganti
+    monkeypatch.setattr(modul_mirror.os, "replace", replace_asli)
+
+    assert [f for f in os.listdir(os.path.dirname(mirror.path)) if f.endswith(".tmp")] == []
+    assert mirror.muat() is None
+    baru, _ = _muat_ulang(klien, buat_ledger, mirror)
+    assert sorted(baru.snapshot()[1]['id']) == sorted(tabel_server(klien)['id'])
+    assert mirror.muat() is not None
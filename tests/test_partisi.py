@@ -0,0 +1,43 @@
+import jwt
+
+import app
+from benchmark import FakeSupabase, buat_ledger_sintetis
+from cashflow.konstanta import COL_PEMILIK
+from cashflow.ledger import ManajerLedger
+
+def _manajer(buat_ledger):
+    mentah = buat_ledger_sintetis(90, seed=0)
+    mentah[COL_PEMILIK] = ["rumah-a", "rumah-b", "rumah-c"] * 30
+    klien = FakeSupabase(mentah.to_dict('records'))
+    return ManajerLedger(lambda p: buat_ledger(klien, interval=0, pemilik=p), batas_byte=float("inf"), kolom_pemilik=COL_PEMILIK)
+
+def test_status_feed_hanya_berlaku_untuk_partisi_pemiliknya(buat_ledger):
+    manajer = _manajer(buat_ledger)
+    a, b = manajer.ledger("rumah-a"), manajer.ledger("rumah-b")
+    manajer.sasaran_umpan("rumah-a").atur_umpan(True)
+    assert a._umpan_aktif and not b._umpan_aktif
+    # Partisi yang dimuat (ulang) setelah feed-nya tersambung langsung ikut berhenti polling.
+    assert manajer.ledger("rumah-c")._umpan_aktif is False
+    manajer.sasaran_umpan("rumah-c").atur_umpan(True)
+    manajer._partisi.pop("rumah-c")
+    assert manajer.ledger("rumah-c")._umpan_aktif
+
+    manajer.sasaran_umpan("rumah-a").atur_umpan(False)
+    assert not a._umpan_aktif and manajer.ledger("rumah-c")._umpan_aktif
+
+def test_event_feed_pemilik_dirutekan_ke_partisinya(buat_ledger):
+    manajer = _manajer(buat_ledger)
+    a, b = manajer.ledger("rumah-a"), manajer.ledger("rumah-b")
+    a.get(), b.get()
+    versi_b = b.snapshot()[0]
+    baris = {**buat_ledger_sintetis(1, seed=1).iloc[0].to_dict(), 'id': 10_000, 'tanggal': "2024-01-02", COL_PEMILIK: "rumah-a"}
+    manajer.sasaran_umpan("rumah-a").terapkan_perubahan(baris=[baris])
+    assert 10_000 in set(a.snapshot()[1]['id'])
+    assert b.snapshot()[0] == versi_b
+
+def test_token_pemilik_membawa_klaim_untuk_rls(monkeypatch):
+    monkeypatch.setattr(app.st, "secrets", {'supabase': {'jwt_secret': "rahasia-uji-" + "x" * 32}})
+    klaim = jwt.decode(app._token_pemilik("rumah-a"), "rahasia-uji-" + "x" * 32, algorithms=["HS256"], audience="authenticated")
+    assert klaim['role'] == "authenticated" and klaim[COL_PEMILIK] == "rumah-a"
+    assert "rumah-a" not in klaim['sub']  # email/nama rumah tangga tidak dipakai sebagai subjek
+    assert klaim['exp'] - klaim['iat'] == app.UMUR_TOKEN_PEMILIK
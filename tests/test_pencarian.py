@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from benchmark import _ledger_bersih
+from cashflow.cache import SearchIndex
+from cashflow.konstanta import COL_NOMINAL
+
+@pytest.fixture(scope="module")
+def df():
+    df = _ledger_bersih(3000).reset_index(drop=True)
+    df.loc[5, 'deskripsi'] = None
+    df.loc[6, 'deskripsi'] = "Makan Siang di KANTOR"
+    return df
+
+@pytest.fixture(scope="module")
+def indeks(df):
+    return SearchIndex(1, df)
+
+def _cari_langsung(df, kata_kunci, basis=None):
+    """Semua id yang cocok (tanpa batas), dihitung dengan memindai setiap baris."""
+    teks = {
+        'tanggal': df['tanggal'].dt.strftime('%Y-%m-%d %d/%m/%Y'), 'kategori': df['kategori'].astype(str),
+        'nominal': df[COL_NOMINAL].astype(str), 'deskripsi': df['deskripsi'].fillna("").astype(str),
+    }
+    cocok = np.ones(len(df), dtype=bool)
+    for kata in kata_kunci.lower().split():
+        kata = kata.replace('.', '') if kata.replace('.', '').isdigit() else kata
+        kata_ini = df['id'].astype(str).str.startswith(kata).to_numpy().copy() if kata.isdigit() else np.zeros(len(df), dtype=bool)
+        for kolom in teks.values():
+            kata_ini |= kolom.str.lower().str.contains(kata, regex=False).to_numpy()
+        cocok &= kata_ini
+    if basis is not None:
+        cocok &= np.isin(np.arange(len(df)), basis)
+    return set(df['id'][cocok])
+
+KATA_KUNCI = ["gaji", "TOP up", "top up gopay", "gopay", "makan siang", "kantor", "2024", "01/03", "2024-03",
+              "50.000", "50000", "12", "123", "1", "0", "ke bca", "tidak-ada-yang-cocok", "&"]
+
+@pytest.mark.parametrize("kata_kunci", KATA_KUNCI)
+def test_sama_dengan_pindai_semua_baris(df, indeks, kata_kunci):
+    semua = _cari_langsung(df, kata_kunci)
+    hasil = indeks.cari(kata_kunci, batas=len(df) + 1)
+    assert len(hasil) == len(set(hasil)) and set(hasil) == semua
+    harapan = sorted(semua, reverse=True)
+    if kata_kunci.isdigit() and int(kata_kunci) in semua:  # id yang sama persis paling atas
+        harapan = [int(kata_kunci)] + [i for i in harapan if i != int(kata_kunci)]
+    assert indeks.cari(kata_kunci, batas=20) == harapan[:20]
+
+def test_dibatasi_basis(df, indeks):
+    basis = np.flatnonzero((df['akun'] == "BCA").to_numpy())
+    hasil = indeks.cari("top up", basis=basis, batas=len(df))
+    assert set(hasil) == _cari_langsung(df, "top up", basis=basis)
+    assert set(indeks.cari("", basis=basis, batas=len(df))) == set(df['id'].iloc[basis])
+
+def test_kata_kunci_kosong_mengembalikan_terbaru(df, indeks):
+    assert indeks.cari("   ", batas=5) == sorted(df['id'], reverse=True)[:5]
+
+def test_id_persis_paling_atas(df, indeks):
+    assert indeks.cari("7")[0] == 7
+    assert indeks.cari("2999")[0] == 2999
+    assert indeks.posisi(2999) == int(np.flatnonzero(df['id'].to_numpy() == 2999)[0])
+
+def test_deskripsi_kosong_tetap_bisa_dicari(df, indeks):
+    id_kosong = int(df['id'].iloc[5])
+    assert indeks.cari(str(id_kosong))[0] == id_kosong
+    assert id_kosong not in indeks.cari("makan", batas=len(df))
@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+
+from benchmark import buat_ledger_sintetis
+from cashflow.konstanta import COL_NOMINAL, JENIS_PEMASUKAN, JENIS_PENGELUARAN, TABEL_CASHFLOW
+from cashflow.ledger import SaldoIndex
+from conftest import tabel_server
+
+def _saldo_awal(df, tanggal):
+    """Perhitungan saldo halaman Saldo Akun sebelum SaldoIndex: filter tanggal, groupby per jenis, lalu concat."""
+    saldo_akun = {}
+    if not df.empty:
+        df_per_tanggal = df[df['tanggal'].dt.date <= tanggal].copy()
+        if not df_per_tanggal.empty:
+            pemasukan = df_per_tanggal[df_per_tanggal['jenis'] == JENIS_PEMASUKAN].groupby('akun')[COL_NOMINAL].sum()
+            pengeluaran = df_per_tanggal[df_per_tanggal['jenis'] == JENIS_PENGELUARAN].groupby('akun')[COL_NOMINAL].sum()
+            saldo_df = pd.concat([pemasukan, pengeluaran], axis=1).fillna(0)
+            saldo_df.columns = ['pemasukan', 'pengeluaran']
+            saldo_df['saldo'] = saldo_df['pemasukan'] - saldo_df['pengeluaran']
+            saldo_akun = saldo_df['saldo'].to_dict()
+    return {akun: int(saldo) for akun, saldo in saldo_akun.items()}
+
+def _saldo_indeks(indeks, tanggal):
+    return {akun: int(saldo) for akun, saldo in indeks.saldo_per(tanggal).items()}
+
+def _tanggal_uji(df):
+    """Sebelum baris pertama, tepat di beberapa tanggal transaksi (termasuk pertama dan terakhir), dan sesudah baris terakhir."""
+    hari = sorted(df['tanggal'].dt.date.unique())
+    tepat = [hari[0], hari[1], hari[len(hari) // 3], hari[len(hari) // 2], hari[-2], hari[-1]]
+    return [hari[0] - timedelta(days=1)] + tepat + [hari[-1] + timedelta(days=1), hari[-1] + timedelta(days=400)]
+
+def _cocokkan(ledger):
+    _, df = ledger.snapshot()
+    indeks = ledger.turunan("saldo")
+    for tanggal in _tanggal_uji(df):
+        assert _saldo_indeks(indeks, tanggal) == _saldo_awal(df, tanggal), tanggal
+    return df
+
+@pytest.fixture
+def ledger(buat_klien, buat_ledger):
+    klien = buat_klien(1500)
+    ledger = buat_ledger(klien, interval=0)
+    ledger.get()
+    return ledger
+
+def test_sama_dengan_perhitungan_awal(ledger):
+    df = _cocokkan(ledger)
+    awal = df['tanggal'].min().date()
+    assert _saldo_indeks(ledger.turunan("saldo"), awal - timedelta(days=1)) == {}
+    assert _saldo_indeks(ledger.turunan("saldo"), awal) != {}
+
+def test_indeks_baru_sama_dengan_indeks_inkremental(ledger):
+    indeks = ledger.turunan("saldo")
+    ledger.terapkan_perubahan(ids_dihapus=[3, 4, 5])
+    _, df = ledger.snapshot()
+    dibangun = SaldoIndex()
+    dibangun.bangun(df)
+    for tanggal in _tanggal_uji(df):
+        assert _saldo_indeks(indeks, tanggal) == _saldo_indeks(dibangun, tanggal)
+
+def _baris(df, id_):
+    baris = df.loc[df['id'] == id_].iloc[0]
+    return {
+        'id': int(baris['id']), 'tanggal': baris['tanggal'].strftime('%Y-%m-%d'), 'jenis': baris['jenis'],
+        'kategori': baris['kategori'], 'akun': baris['akun'], COL_NOMINAL: int(baris[COL_NOMINAL]), 'deskripsi': baris['deskripsi'],
+    }
+
+def test_write_through_insert_update_hapus(ledger):
+    _, df = ledger.snapshot()
+    id_baru = int(df['id'].max()) + 1
+    awal, akhir = df['tanggal'].min().date(), df['tanggal'].max().date()
+    baru = buat_ledger_sintetis(3, seed=2).head(3).to_dict('records')
+    # Tanggal baru sebelum baris pertama, tepat di tanggal yang sudah ada, dan sesudah baris terakhir.
+    for baris, tanggal, id_ in zip(baru, [awal - timedelta(days=5), awal, akhir + timedelta(days=3)], range(id_baru, id_baru + 3)):
+        baris.update(id=id_, tanggal=tanggal.isoformat())
+    ledger.terapkan_perubahan(baris=baru)
+    _cocokkan(ledger)
+
+    # Update yang memindahkan baris ke akun, jenis, dan tanggal lain.
+    diubah = _baris(df, 10)
+    diubah.update(
+        akun=next(a for a in df['akun'].unique() if a != diubah['akun']),
+        jenis=JENIS_PEMASUKAN if diubah['jenis'] == JENIS_PENGELUARAN else JENIS_PENGELUARAN,
+        tanggal=(akhir - timedelta(days=1)).isoformat(), **{COL_NOMINAL: diubah[COL_NOMINAL] + 12_345},
+    )
+    ledger.terapkan_perubahan(baris=[diubah])
+    _cocokkan(ledger)
+
+    # Hapus, termasuk baris yang baru disisipkan dan satu tanggal transaksi secara utuh.
+    _, df = ledger.snapshot()
+    satu_hari = df.loc[df['tanggal'] == df['tanggal'].iloc[len(df) // 2], 'id'].tolist()
+    ledger.terapkan_perubahan(ids_dihapus=[id_baru, 20, 21] + satu_hari)
+    _cocokkan(ledger)
+
+def test_hapus_semua_transaksi_satu_akun(ledger):
+    _, df = ledger.snapshot()
+    akun = df['akun'].iloc[0]
+    ledger.terapkan_perubahan(ids_dihapus=df.loc[df['akun'] == akun, 'id'].tolist())
+    df = _cocokkan(ledger)
+    assert akun not in _saldo_indeks(ledger.turunan("saldo"), df['tanggal'].max().date())
+
+def test_sinkron_delta_insert_update_hapus(ledger):
+    klien = ledger._client
+    tabel = lambda: klien.table(TABEL_CASHFLOW)
+    server = tabel_server(klien)
+    tanggal_awal = server['tanggal'].min()
+
+    tabel().insert(buat_ledger_sintetis(4, seed=3).drop(columns='id').assign(tanggal=tanggal_awal).to_dict('records')).execute()
+    tabel().update({COL_NOMINAL: 999_999, 'jenis': JENIS_PEMASUKAN}).eq('id', 15).execute()
+    tabel().delete().eq('id', 16).execute()
+    ledger.tandai_berubah([15])
+    _, df = ledger.get()
+
+    assert sorted(df['id']) == sorted(tabel_server(klien)['id'])
+    _cocokkan(ledger)
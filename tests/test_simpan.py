@@ -0,0 +1,71 @@
+import datetime
+
+import pytest
+
+import app
+from benchmark import _buat_ledger_fake
+from cashflow.ledger import ManajerLedger
+from conftest import tabel_server
+
+FORM_TOP_UP = {
+    'jenis': "Keluar", 'kategori': "Top Up", 'dari_akun': "BCA", 'ke_akun': "GoPay", 'akun': "BCA",
+    'tanggal': datetime.date(2024, 3, 1), 'deskripsi': "", 'jumlah_input': "100.000", 'biaya_admin_input': "1.000",
+    'metode_biaya': app.METODE_BIAYA_SUMBER,
+}
+
+@pytest.fixture
+def app_palsu(buat_klien, monkeypatch):
+    """Form Catat Transaksi di atas FakeSupabase (mode satu ledger, tanpa antrean tulis); pesan UI dicatat."""
+    klien = buat_klien(50)
+    ledger = _buat_ledger_fake(klien)
+    ledger.get()
+    manajer = ManajerLedger(lambda pemilik: ledger)
+    pesan = []
+    monkeypatch.setattr(app, "init_connection", lambda: klien)
+    monkeypatch.setattr(app, "_get_manajer_ledger", lambda: manajer)
+    monkeypatch.setattr(app, "_get_penulis", lambda: None)
+    monkeypatch.setattr(app, "_pemilik_aktif", lambda: None)
+    for jenis in ("success", "error", "warning"):
+        monkeypatch.setattr(app.st, jenis, lambda teks, jenis=jenis: pesan.append((jenis, teks)))
+    monkeypatch.setattr(app.st, "rerun", lambda: pesan.append(("rerun", None)))
+    return klien, ledger, pesan
+
+def _catat_request_tulis(klien, gagal=False):
+    """Mencatat setiap request non-select ke klien; dengan `gagal`, request itu melempar seperti koneksi putus."""
+    kirim_asli, tulis = klien._jalankan, []
+
+    def jalankan(q):
+        if q._aksi != "select":
+            tulis.append((q._aksi, len(q._isi)))
+            if gagal:
+                raise ConnectionError("koneksi terputus")
+        return kirim_asli(q)
+    klien._jalankan = jalankan
+    return tulis
+
+def test_top_up_tiga_kaki_dikirim_dalam_satu_insert(app_palsu):
+    klien, ledger, pesan = app_palsu
+    ids_lama = set(tabel_server(klien)['id'])
+    tulis = _catat_request_tulis(klien)
+    app._handle_submission(True, FORM_TOP_UP)
+
+    assert tulis == [("insert", 3)]
+    ids_baru = set(tabel_server(klien)['id']) - ids_lama
+    assert len(ids_baru) == 3
+    df = ledger.snapshot()[1]
+    baru = df[df['id'].isin(ids_baru)]  # write-through: ketiga kaki langsung ada di ledger
+    assert sorted(zip(baru['kategori'].astype(str), baru['akun'].astype(str), baru['nominal_(Rp)'])) == [
+        ("Biaya Admin", "BCA", 1_000), ("Top Up", "BCA", 100_000), ("Top Up", "GoPay", 100_000)]
+    assert ("rerun", None) in pesan and pesan[0][0] == "success"
+
+def test_insert_gagal_tidak_menerapkan_baris_apa_pun(app_palsu):
+    klien, ledger, pesan = app_palsu
+    versi, df = ledger.snapshot()
+    sebelum = len(tabel_server(klien))
+    tulis = _catat_request_tulis(klien, gagal=True)
+    app._handle_submission(True, FORM_TOP_UP)
+
+    assert tulis == [("insert", 3)]  # tidak ada kaki yang dikirim terpisah atau dicoba ulang
+    assert len(tabel_server(klien)) == sebelum
+    assert ledger.snapshot()[0] == versi and len(ledger.snapshot()[1]) == len(df)
+    assert [jenis for jenis, _ in pesan] == ["error"]
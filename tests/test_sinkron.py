@@ -0,0 +1,33 @@
+from benchmark import buat_ledger_sintetis
+from cashflow.konstanta import TABEL_CASHFLOW
+from conftest import tabel_server
+
+def test_muat_awal_sama_dengan_server(buat_klien, buat_ledger):
+    klien = buat_klien(2500, max_rows=1000)
+    versi, df = buat_ledger(klien).get()
+    assert versi > 0
+    assert sorted(df['id']) == tabel_server(klien)['id'].tolist()
+
+def test_sinkron_delta_insert_update_hapus(buat_klien, buat_ledger):
+    klien = buat_klien(300)
+    ledger = buat_ledger(klien, interval=0)
+    versi_awal, _ = ledger.get()
+    tabel = lambda: klien.table(TABEL_CASHFLOW)
+
+    baru = tabel().insert(buat_ledger_sintetis(2, seed=1).drop(columns='id').to_dict('records')).execute().data
+    tabel().update({'deskripsi': "Diubah di perangkat lain"}).eq('id', 5).execute()
+    tabel().delete().eq('id', 7).execute()
+    ledger.tandai_berubah([5])  # tabel sintetis tidak punya updated_at, jadi edit ditandai manual
+    versi, df = ledger.get()
+
+    assert versi != versi_awal
+    assert {b['id'] for b in baru} <= set(df['id'])
+    assert 7 not in set(df['id'])
+    assert df.loc[df['id'] == 5, 'deskripsi'].item() == "Diubah di perangkat lain"
+    assert sorted(df['id']) == sorted(tabel_server(klien)['id'])
+
+def test_tanpa_perubahan_versi_tetap(buat_klien, buat_ledger):
+    klien = buat_klien(200)
+    ledger = buat_ledger(klien, interval=0)
+    versi, _ = ledger.get()
+    assert ledger.get()[0] == versi
@@ -0,0 +1,183 @@
+import enum
+import sys
+import threading
+import types
+
+import pytest
+
+from benchmark import SumberPerubahanPalsu, _tunggu, buat_ledger_sintetis
+from cashflow.konstanta import TABEL_CASHFLOW
+from cashflow.sync import SumberRealtimeSupabase, UmpanPerubahan
+from conftest import tabel_server
+
+@pytest.fixture
+def umpan_jalan(buat_klien, buat_ledger):
+    """(klien, ledger, sumber, umpan) dengan feed yang sudah tersambung; polling setiap get() saat feed putus."""
+    klien = buat_klien(200)
+    ledger = buat_ledger(klien, interval=0)
+    ledger.get()
+    sumber = SumberPerubahanPalsu()
+    umpan = UmpanPerubahan(ledger, sumber, jeda_ulang=0.05, jendela_batch=0.01).mulai()
+    _tunggu(lambda: umpan.terhubung)
+    ledger.get()  # sinkronisasi penutup celah saat feed tersambung
+    yield klien, ledger, sumber, umpan
+    umpan.berhenti(timeout=5)
+
+def _request_saat_get(klien, ledger):
+    awal = klien.jumlah_request
+    ledger.get()
+    return klien.jumlah_request - awal
+
+def _tunggu_event(umpan, jumlah):
+    _tunggu(lambda: umpan.jumlah_event >= jumlah)
+
+def test_event_insert_update_delete_masuk_ledger_tanpa_query(umpan_jalan):
+    klien, ledger, sumber, umpan = umpan_jalan
+    tabel = lambda: klien.table(TABEL_CASHFLOW)
+    baru = tabel().insert(buat_ledger_sintetis(1, seed=1).drop(columns='id').to_dict('records')).execute().data[0]
+    diubah = tabel().update({'deskripsi': "Diubah di ponsel"}).eq('id', 10).execute().data[0]
+    tabel().delete().eq('id', 20).execute()
+    awal = klien.jumlah_request
+
+    sumber.kirim("INSERT", baru)
+    sumber.kirim("UPDATE", diubah)
+    sumber.kirim("DELETE", {'id': 20})
+    _tunggu_event(umpan, 3)
+
+    df = ledger.get()[1]
+    assert klien.jumlah_request == awal  # event diterapkan langsung, tanpa sinkronisasi ke database
+    assert baru['id'] in set(df['id']) and 20 not in set(df['id'])
+    assert df.loc[df['id'] == 10, 'deskripsi'].item() == "Diubah di ponsel"
+    assert sorted(df['id']) == sorted(tabel_server(klien)['id'])
+
+def test_event_beruntun_digabung_per_id(umpan_jalan):
+    klien, ledger, sumber, umpan = umpan_jalan
+    baris = ledger.snapshot()[1].set_index('id').loc[5].to_dict()
+    sumber.kirim("UPDATE", {**baris, 'id': 5, 'tanggal': str(baris['tanggal'].date()), 'deskripsi': "pertama"})
+    sumber.kirim("UPDATE", {**baris, 'id': 5, 'tanggal': str(baris['tanggal'].date()), 'deskripsi': "terakhir"})
+    sumber.kirim("DELETE", {'id': 6})
+    sumber.kirim("DELETE", {})  # event tanpa id diabaikan
+    _tunggu_event(umpan, 4)
+    df = ledger.snapshot()[1]
+    assert df.loc[df['id'] == 5, 'deskripsi'].item() == "terakhir"
+    assert 6 not in set(df['id'])
+
+def test_putus_kembali_ke_polling_lalu_tersambung_lagi(umpan_jalan):
+    klien, ledger, sumber, umpan = umpan_jalan
+    assert _request_saat_get(klien, ledger) == 0  # feed tersambung: get() tidak menyentuh database
+
+    sumber.putuskan()
+    _tunggu(lambda: not umpan.terhubung)
+    # Perubahan selama feed putus tidak datang sebagai event; polling yang mengambilnya.
+    baru = klien.table(TABEL_CASHFLOW).insert(buat_ledger_sintetis(1, seed=2).drop(columns='id').to_dict('records')).execute().data[0]
+    assert _request_saat_get(klien, ledger) > 0
+    assert baru['id'] in set(ledger.snapshot()[1]['id'])
+    assert _request_saat_get(klien, ledger) > 0  # interval=0: setiap get() kembali polling
+
+    lagi = klien.table(TABEL_CASHFLOW).insert(buat_ledger_sintetis(1, seed=3).drop(columns='id').to_dict('records')).execute().data[0]
+    sumber.sambungkan()
+    _tunggu(lambda: umpan.terhubung)
+    assert sumber.jumlah_koneksi == 2
+    assert _request_saat_get(klien, ledger) > 0  # satu sinkronisasi penutup celah setelah tersambung lagi
+    assert lagi['id'] in set(ledger.snapshot()[1]['id'])
+    assert _request_saat_get(klien, ledger) == 0
+
+# --- SumberRealtimeSupabase dengan modul `realtime` palsu ---
+
+class _Status(enum.Enum):
+    SUBSCRIBED = "SUBSCRIBED"
+    CHANNEL_ERROR = "CHANNEL_ERROR"
+
+class _Jenis(enum.Enum):
+    INSERT = "INSERT"
+    UPDATE = "UPDATE"
+    DELETE = "DELETE"
+
+class _KlienRealtimePalsu:
+    """Meniru AsyncRealtimeClient: payload di `antrean` dikirim ke callback begitu kanal berlangganan."""
+
+    def __init__(self, antrean, putus_setelah_kirim):
+        self._antrean = antrean
+        self._putus_setelah_kirim = putus_setelah_kirim
+        self.is_connected = False
+        self.langganan = []
+        self.token = None
+        self.ditutup = False
+
+    async def connect(self):
+        self.is_connected = True
+
+    async def set_auth(self, token):
+        self.token = token
+
+    def channel(self, nama):
+        klien = self
+
+        class _Kanal:
+            def on_postgres_changes(self, event, callback, **opsi):
+                klien.langganan.append((event, opsi))
+                self._callback = callback
+
+            async def subscribe(self, saat_status):
+                saat_status(_Status.SUBSCRIBED, None)
+                for jenis, rekaman in klien._antrean:
+                    kunci = 'old_record' if jenis is _Jenis.DELETE else 'record'
+                    self._callback({'data': {'type': jenis, kunci: rekaman}})
+                klien.is_connected = not klien._putus_setelah_kirim
+
+        return _Kanal()
+
+    async def close(self):
+        self.ditutup = True
+
+@pytest.fixture
+def realtime_palsu(monkeypatch):
+    klien_dibuat = []
+
+    def pasang(antrean, putus_setelah_kirim=False):
+        def pabrik(url, key, auto_reconnect=True):
+            klien = _KlienRealtimePalsu(antrean, putus_setelah_kirim)
+            klien_dibuat.append((url, klien))
+            return klien
+        modul = types.SimpleNamespace(AsyncRealtimeClient=pabrik, RealtimeSubscribeStates=_Status)
+        monkeypatch.setitem(sys.modules, 'realtime', modul)
+        return klien_dibuat
+
+    return pasang
+
+def test_sumber_realtime_memetakan_payload_postgres_changes(realtime_palsu):
+    klien_dibuat = realtime_palsu([(_Jenis.INSERT, {'id': 1, 'nominal': 5}),
+                                   (_Jenis.UPDATE, {'id': 1, 'nominal': 7}),
+                                   (_Jenis.DELETE, {'id': 1})])
+    diterima, berhenti = [], threading.Event()
+
+    def saat_event(jenis, baris):
+        diterima.append((jenis, baris))
+        if len(diterima) == 3:
+            berhenti.set()
+
+    terhubung = []
+    SumberRealtimeSupabase("https://contoh.supabase.co/", "kunci").dengarkan(saat_event, lambda: terhubung.append(True), berhenti)
+
+    assert terhubung == [True]
+    assert diterima == [("INSERT", {'id': 1, 'nominal': 5}), ("UPDATE", {'id': 1, 'nominal': 7}), ("DELETE", {'id': 1})]
+    url, klien = klien_dibuat[0]
+    assert url == "https://contoh.supabase.co/realtime/v1"
+    assert klien.langganan[0][0] == "*" and klien.langganan[0][1]['table'] == TABEL_CASHFLOW
+    assert klien.ditutup
+
+def test_sumber_realtime_putus_melempar_agar_umpan_kembali_polling(realtime_palsu):
+    klien_dibuat = realtime_palsu([], putus_setelah_kirim=True)
+    with pytest.raises(ConnectionError):
+        SumberRealtimeSupabase("https://contoh.supabase.co", "kunci").dengarkan(lambda *a: None, lambda: None, threading.Event())
+    assert klien_dibuat[0][1].ditutup
+
+def test_sumber_realtime_per_pemilik_memakai_filter_dan_token_baru(realtime_palsu):
+    klien_dibuat = realtime_palsu([], putus_setelah_kirim=True)
+    token = iter(["token-1", "token-2"])
+    sumber = SumberRealtimeSupabase("https://contoh.supabase.co", "kunci", filter="pemilik=eq.rumah-a", token=lambda: next(token))
+    for _ in range(2):  # setiap sambungan ulang meminta token baru (token lama bisa sudah kedaluwarsa)
+        with pytest.raises(ConnectionError):
+            sumber.dengarkan(lambda *a: None, lambda: None, threading.Event())
+    assert [k.token for _, k in klien_dibuat] == ["token-1", "token-2"]
+    assert klien_dibuat[0][1].langganan[0][1]['filter'] == "pemilik=eq.rumah-a"